@@ -34,6 +34,7 @@ interface ElectronAPI {
   setConfig: (config: any) => Promise<{ ok: boolean; path?: string }>;
   startSimulation: (config?: any) => Promise<{ ok: boolean; wsUrl?: string; message?: string }>;
   stopSimulation: () => Promise<{ ok: boolean; message?: string }>;
+  reconfigureSimulation: (changes: any) => Promise<{ ok: boolean; changed?: string[]; message?: string }>;
   startCamera: (devicePath: string) => Promise<{ ok: boolean; wsUrl?: string; message?: string }>;
   openVideoWindow: (url: string) => Promise<void>;
   startRTSP: (url: string) => Promise<{ ok: boolean; wsUrl?: string; message?: string }>;
@@ -0,0 +1,35 @@
+import { PassThrough } from "stream";
+import { expect, test } from "vitest";
+import { VideoManager } from "./VideoManager";
+
+function managerWithStdin(stdin: PassThrough): VideoManager {
+  const vm = new VideoManager();
+  // Stand-in for the spawned process: only stdin is used to send commands.
+  (vm as any).pythonProcess = { stdin };
+  return vm;
+}
+
+test("a command larger than the stdin buffer is accepted and delivered whole", async () => {
+  const stdin = new PassThrough({ highWaterMark: 16 });
+  const vm = managerWithStdin(stdin);
+  const chunks: Buffer[] = [];
+  stdin.on("data", (chunk: Buffer) => chunks.push(chunk));
+  const ended = new Promise((resolve) => stdin.on("end", resolve));
+
+  const modelXml = "<mujoco/>".repeat(4096);
+  expect(vm.sendCommand({ command: "load_config", config: { env: { model_xml: modelXml } } })).toBe(true);
+  stdin.end();
+  await ended;
+
+  const line = Buffer.concat(chunks).toString();
+  expect(line.endsWith("\n")).toBe(true);
+  expect(JSON.parse(line).config.env.model_xml).toBe(modelXml);
+});
+
+test("commands are rejected once the process is gone", () => {
+  expect(new VideoManager().sendCommand({ command: "stop" })).toBe(false);
+
+  const stdin = new PassThrough();
+  stdin.destroy();
+  expect(managerWithStdin(stdin).sendCommand({ command: "stop" })).toBe(false);
+});
@@ -44,6 +44,10 @@ export class VideoManager extends EventEmitter {
       console.log('Python exited with:', code);
       this.emit('exit', code);
     });
+    // A write still queued when the process dies fails with EPIPE; 'exit' reports the death.
+    this.pythonProcess.stdin?.on('error', (err) => {
+      console.warn('Python stdin error:', err);
+    });
 
     // Parse stderr for command responses (prefixed with __CMD__:) and log the rest
     if (this.pythonProcess.stderr) {
@@ -73,15 +77,23 @@ export class VideoManager extends EventEmitter {
   /**
    * Send a JSON command to the Python simulation process via stdin.
    * Commands are newline-delimited JSON objects.
+   *
+   * Returns false only when the process or its stdin is gone. A command larger
+   * than the pipe's buffer (e.g. a config carrying model_xml inline) makes
+   * write() report backpressure, but it is still queued and delivered in full.
    */
   public sendCommand(cmd: SimulationCommand): boolean {
-    if (!this.pythonProcess || !this.pythonProcess.stdin || this.pythonProcess.stdin.destroyed) {
+    const stdin = this.pythonProcess?.stdin;
+    if (!stdin || stdin.destroyed || stdin.writableEnded) {
       console.warn('Cannot send command: Python process not running or stdin closed');
       return false;
     }
     try {
       const line = JSON.stringify(cmd) + '\n';
-      return this.pythonProcess.stdin.write(line);
+      if (!stdin.write(line)) {
+        console.debug(`Command '${cmd.command}' queued until the simulation's stdin drains`);
+      }
+      return true;
     } catch (e) {
       console.error('Failed to send command to Python process:', e);
       return false;
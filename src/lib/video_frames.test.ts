@@ -0,0 +1,56 @@
+import { expect, test } from "vitest";
+import { CODEC_JPEG, parseFrameBatch } from "./video_frames";
+
+function packFrameBatch(step: number, timestamp: number, frames: { name: string; width: number; height: number; data: number[] }[]): ArrayBuffer {
+  const encoder = new TextEncoder();
+  const names = frames.map((f) => encoder.encode(f.name));
+  const size = 20 + frames.reduce((acc, f, i) => acc + 1 + names[i].length + 8 + f.data.length, 0);
+  const bytes = new Uint8Array(size);
+  const view = new DataView(bytes.buffer);
+  bytes.set(encoder.encode("RTVF"), 0);
+  view.setUint8(4, 1);
+  view.setUint8(5, CODEC_JPEG);
+  view.setUint16(6, frames.length, true);
+  view.setUint32(8, step, true);
+  view.setFloat64(12, timestamp, true);
+  let offset = 20;
+  frames.forEach((f, i) => {
+    view.setUint8(offset, names[i].length);
+    bytes.set(names[i], offset + 1);
+    offset += 1 + names[i].length;
+    view.setUint16(offset, f.width, true);
+    view.setUint16(offset + 2, f.height, true);
+    view.setUint32(offset + 4, f.data.length, true);
+    bytes.set(f.data, offset + 8);
+    offset += 8 + f.data.length;
+  });
+  return bytes.buffer;
+}
+
+test("parses every camera of a batch", () => {
+  const buffer = packFrameBatch(7, 1.5, [
+    { name: "observation.images.front", width: 4, height: 2, data: [1, 2, 3] },
+    { name: "wrist", width: 8, height: 6, data: [9] },
+  ]);
+  const batch = parseFrameBatch(buffer);
+
+  expect(batch.step).toBe(7);
+  expect(batch.timestamp).toBe(1.5);
+  expect(batch.codec).toBe(CODEC_JPEG);
+  expect(batch.frames.map((f) => f.cameraName)).toEqual(["observation.images.front", "wrist"]);
+  expect(Array.from(batch.frames[0].data)).toEqual([1, 2, 3]);
+  expect(batch.frames[1].width).toBe(8);
+  expect(batch.frames[1].height).toBe(6);
+});
+
+test("accepts typed array views with an offset", () => {
+  const inner = new Uint8Array(packFrameBatch(1, 0, [{ name: "cam", width: 1, height: 1, data: [5] }]));
+  const padded = new Uint8Array(inner.length + 3);
+  padded.set(inner, 3);
+  const batch = parseFrameBatch(padded.subarray(3));
+  expect(Array.from(batch.frames[0].data)).toEqual([5]);
+});
+
+test("rejects payloads that are not frame batches", () => {
+  expect(() => parseFrameBatch(new Uint8Array(32))).toThrow();
+});
@@ -0,0 +1,70 @@
+// Parser for the binary 'video_frames' Socket.IO messages emitted by
+// src/python/gym_manipulator.py (packed by src/python/video_frames.py).
+//
+// Layout, little endian:
+//   header: magic "RTVF" | version u8 | codec u8 | num_frames u16 | step u32 | timestamp f64
+//   frame:  name_len u8 | name utf-8 | width u16 | height u16 | payload_len u32 | payload
+
+export const FRAME_BATCH_VERSION = 1;
+export const CODEC_JPEG = 0;
+
+const HEADER_SIZE = 20;
+
+export interface EncodedFrame {
+  cameraName: string;
+  width: number;
+  height: number;
+  data: Uint8Array;
+}
+
+export interface FrameBatch {
+  codec: number;
+  step: number;
+  timestamp: number;
+  frames: EncodedFrame[];
+}
+
+function toUint8Array(payload: ArrayBuffer | ArrayBufferView): Uint8Array {
+  if (payload instanceof Uint8Array) return payload;
+  if (ArrayBuffer.isView(payload)) {
+    return new Uint8Array(payload.buffer, payload.byteOffset, payload.byteLength);
+  }
+  return new Uint8Array(payload);
+}
+
+export function parseFrameBatch(payload: ArrayBuffer | ArrayBufferView): FrameBatch {
+  const bytes = toUint8Array(payload);
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  if (bytes.byteLength < HEADER_SIZE) {
+    throw new Error('Frame batch too short');
+  }
+  const magic = String.fromCharCode(bytes[0], bytes[1], bytes[2], bytes[3]);
+  if (magic !== 'RTVF') {
+    throw new Error('Not a video frame batch (bad magic)');
+  }
+  const version = view.getUint8(4);
+  if (version !== FRAME_BATCH_VERSION) {
+    throw new Error(`Unsupported video frame batch version ${version}`);
+  }
+  const codec = view.getUint8(5);
+  const count = view.getUint16(6, true);
+  const step = view.getUint32(8, true);
+  const timestamp = view.getFloat64(12, true);
+
+  const decoder = new TextDecoder();
+  const frames: EncodedFrame[] = [];
+  let offset = HEADER_SIZE;
+  for (let i = 0; i < count; i++) {
+    const nameLength = view.getUint8(offset);
+    offset += 1;
+    const cameraName = decoder.decode(bytes.subarray(offset, offset + nameLength));
+    offset += nameLength;
+    const width = view.getUint16(offset, true);
+    const height = view.getUint16(offset + 2, true);
+    const payloadLength = view.getUint32(offset + 4, true);
+    offset += 8;
+    frames.push({ cameraName, width, height, data: bytes.subarray(offset, offset + payloadLength) });
+    offset += payloadLength;
+  }
+  return { codec, step, timestamp, frames };
+}
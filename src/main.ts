@@ -805,167 +805,230 @@ const setupIpcHandlers = () => {
     return { running: false };
   });
 
-  // Start a simulation process (spawns Python simulator) and stream frames
-  ipcMain.handle('start-simulation', async (_event, config: any = {}) => {
-    try {
-      const id = 'simulation';
-      if (videoManagers.has(id)) {
-        return { ok: false, message: 'simulation already running' };
+  // The simulation runs in one long-lived Python worker (sim_server.py --worker).
+  // It keeps the Python runtime, compiled models, GL context and Socket.IO
+  // server alive between sessions; starting a session only sends it the config
+  // over stdin, so switching scenes or robots does not respawn Python.
+  let simulationWorker: { vm: VideoManager; wsUrl: string } | null = null;
+  let simulationWorkerStarting: Promise<{ vm: VideoManager; wsUrl: string }> | null = null;
+  let nextWorkerCommandId = 1;
+
+  const spawnSimulationWorker = async (): Promise<{ vm: VideoManager; wsUrl: string }> => {
+    // Build command/args based on user's system settings
+    // Prefer conda run -n robot_trainer if we have conda available
+    const condaExec: string | null = await resolveCondaExecutable();
+
+    // sim_server.py announces the Socket.IO server before importing the
+    // (slow) simulation runtime in gym_manipulator.py.
+    const simScriptPath = app.isPackaged
+      ? path.join(process.resourcesPath, 'python', 'sim_server.py')
+      : path.join(app.getAppPath(), 'src', 'python', 'sim_server.py');
+
+    let scriptArgs = [simScriptPath, '--worker'];
+
+    let command = 'python3';
+    let args: string[] = scriptArgs;
+    let env = { ...process.env }; // Clone existing environment
+
+    if (condaExec) {
+      // Instead of using 'conda run', resolve the python binary in the robot_trainer environment directly
+      // This avoids issues with signal handling and stdout/stderr buffering that 'conda run' introduces
+      let condaRoot = '';
+      if (process.platform === 'win32') {
+        // On Windows, condaExec is in condabin/ (conda.bat) or Scripts/ (conda.exe)
+        // We assume condaRoot is parallel or parent
+        // Actually resolveCondaExecutable logic suggests:
+        // .../Scripts/conda.exe or .../bin/conda
+        // For Windows Scripts/conda.exe -> dirname -> Scripts -> dirname -> Root
+        condaRoot = path.dirname(path.dirname(condaExec));
+      } else {
+        // On Linux/macOS: bin/conda -> dirname -> bin -> dirname -> Root
+        condaRoot = path.dirname(path.dirname(condaExec));
       }
 
-      // Write the config object to a temporary JSON file
-      const tempId = Date.now();
-      const tempConfigPath = path.join(app.getPath('temp'), `lerobot_config_${tempId}.json`);
-      await fs.writeFile(tempConfigPath, JSON.stringify(config, null, 2), 'utf8');
-
-      // Build command/args based on user's system settings and provided config
-      // Prefer conda run -n robot_trainer if we have conda available
-      const condaExec: string | null = await resolveCondaExecutable();
-
-      const simScriptPath = app.isPackaged
-        ? path.join(process.resourcesPath, 'python', 'gym_manipulator.py')
-        : path.join(app.getAppPath(), 'src', 'python', 'gym_manipulator.py');
+      const envName = 'robot_trainer';
+      let pythonPathInEnv: string;
+      let envBinDir: string;
+
+      if (process.platform === 'win32') {
+        envBinDir = path.join(condaRoot, 'envs', envName); // Windows python is in root of env usually, but let's check
+        // Actually on Windows default env structure:
+        // <root>/envs/<name>/python.exe
+        // <root>/envs/<name>/Scripts/
+        // <root>/envs/<name>/Library/bin
+        pythonPathInEnv = path.join(condaRoot, 'envs', envName, 'python.exe');
+      } else {
+        envBinDir = path.join(condaRoot, 'envs', envName, 'bin');
+        pythonPathInEnv = path.join(envBinDir, 'python');
+      }
 
-      let scriptArgs = [simScriptPath, '--config_path', tempConfigPath];
+      try {
+        await fs.access(pythonPathInEnv);
+        command = pythonPathInEnv;
+        args = ['-u', ...scriptArgs]; // -u for unbuffered output
 
-      let command = 'python3';
-      let args: string[] = scriptArgs;
-      let env = { ...process.env }; // Clone existing environment
+        // Update environment variables to simulate activation
+        const pathKey = Object.keys(env).find(k => k.match(/^path$/i)) || 'PATH';
+        const currentPath = env[pathKey] || '';
 
-      if (condaExec) {
-        // Instead of using 'conda run', resolve the python binary in the robot_trainer environment directly
-        // This avoids issues with signal handling and stdout/stderr buffering that 'conda run' introduces
-        let condaRoot = '';
         if (process.platform === 'win32') {
-          // On Windows, condaExec is in condabin/ (conda.bat) or Scripts/ (conda.exe)
-          // We assume condaRoot is parallel or parent
-          // Actually resolveCondaExecutable logic suggests:
-          // .../Scripts/conda.exe or .../bin/conda
-          // For Windows Scripts/conda.exe -> dirname -> Scripts -> dirname -> Root
-          condaRoot = path.dirname(path.dirname(condaExec));
+           // Windows activation paths are complex, usually:
+           // env; env/Library/mingw-w64/bin; env/Library/usr/bin; env/Library/bin; env/Scripts; env/bin; ...
+           const envPath = path.join(condaRoot, 'envs', envName);
+           const libraryBin = path.join(envPath, 'Library', 'bin');
+           const scripts = path.join(envPath, 'Scripts');
+           const bin = path.join(envPath, 'bin'); // sometimes exists
+           
+           // Prepend these to PATH
+           // But first verify they exist? Usually fine to just add.
+           const newPath = `${envPath}${path.delimiter}${libraryBin}${path.delimiter}${scripts}${path.delimiter}${bin}${path.delimiter}${currentPath}`;
+           env[pathKey] = newPath;
+           // Set CONDA_PREFIX
+           env.CONDA_PREFIX = envPath;
         } else {
-          // On Linux/macOS: bin/conda -> dirname -> bin -> dirname -> Root
-          condaRoot = path.dirname(path.dirname(condaExec));
+           // Linux/Mac: env/bin
+           const newPath = `${envBinDir}${path.delimiter}${currentPath}`;
+           env[pathKey] = newPath;
+           // Set CONDA_PREFIX
+           env.CONDA_PREFIX = path.join(condaRoot, 'envs', envName);
         }
+      } catch (e) {
+           console.warn(`Could not find python in ${pythonPathInEnv}, falling back to 'conda run'`, e);
+           // Fallback to conda run if direct python not found
+           command = condaExec;
+           args = ['run', '--no-capture-output', '-n', 'robot_trainer', 'python', '-u', ...scriptArgs];
+      }
+    } else {
+      // Maybe try fallback python
+      if (systemSettings && systemSettings.pythonPath) {
+         command = systemSettings.pythonPath;
+         args = scriptArgs;
+      }
+    }
 
-        const envName = 'robot_trainer';
-        let pythonPathInEnv: string;
-        let envBinDir: string;
+    const vm = new VideoManager();
 
-        if (process.platform === 'win32') {
-          envBinDir = path.join(condaRoot, 'envs', envName); // Windows python is in root of env usually, but let's check
-          // Actually on Windows default env structure:
-          // <root>/envs/<name>/python.exe
-          // <root>/envs/<name>/Scripts/
-          // <root>/envs/<name>/Library/bin
-          pythonPathInEnv = path.join(condaRoot, 'envs', envName, 'python.exe');
-        } else {
-          envBinDir = path.join(condaRoot, 'envs', envName, 'bin');
-          pythonPathInEnv = path.join(envBinDir, 'python');
-        }
+    // Prepare to capture the dynamic URL from the python process
+    const waitForUrl = new Promise<string>((resolve, reject) => {
+      const timeout = setTimeout(() => {
+        reject(new Error("Timeout waiting for simulation server URL"));
+      }, 15000); // 15s timeout
 
-        try {
-          await fs.access(pythonPathInEnv);
-          command = pythonPathInEnv;
-          args = ['-u', ...scriptArgs]; // -u for unbuffered output
-
-          // Update environment variables to simulate activation
-          const pathKey = Object.keys(env).find(k => k.match(/^path$/i)) || 'PATH';
-          const currentPath = env[pathKey] || '';
-
-          if (process.platform === 'win32') {
-             // Windows activation paths are complex, usually:
-             // env; env/Library/mingw-w64/bin; env/Library/usr/bin; env/Library/bin; env/Scripts; env/bin; ...
-             const envPath = path.join(condaRoot, 'envs', envName);
-             const libraryBin = path.join(envPath, 'Library', 'bin');
-             const scripts = path.join(envPath, 'Scripts');
-             const bin = path.join(envPath, 'bin'); // sometimes exists
-             
-             // Prepend these to PATH
-             // But first verify they exist? Usually fine to just add.
-             const newPath = `${envPath}${path.delimiter}${libraryBin}${path.delimiter}${scripts}${path.delimiter}${bin}${path.delimiter}${currentPath}`;
-             env[pathKey] = newPath;
-             // Set CONDA_PREFIX
-             env.CONDA_PREFIX = envPath;
-          } else {
-             // Linux/Mac: env/bin
-             const newPath = `${envBinDir}${path.delimiter}${currentPath}`;
-             env[pathKey] = newPath;
-             // Set CONDA_PREFIX
-             env.CONDA_PREFIX = path.join(condaRoot, 'envs', envName);
-          }
-        } catch (e) {
-             console.warn(`Could not find python in ${pythonPathInEnv}, falling back to 'conda run'`, e);
-             // Fallback to conda run if direct python not found
-             command = condaExec;
-             args = ['run', '--no-capture-output', '-n', 'robot_trainer', 'python', '-u', ...scriptArgs];
-        }
-      } else {
-        // Maybe try fallback python
-        if (systemSettings && systemSettings.pythonPath) {
-           command = systemSettings.pythonPath;
-           args = scriptArgs;
+      const onResponse = (response: any) => {
+        if (response.type === 'server-ready' && response.url) {
+          clearTimeout(timeout);
+          vm.off('simulation-response', onResponse);
+          resolve(response.url);
+        } else if (response.type === 'error') {
+          clearTimeout(timeout);
+          vm.off('simulation-response', onResponse);
+          reject(new Error(response.message || 'Simulation error'));
         }
+      };
+      vm.on('simulation-response', onResponse);
+
+      // Reject if the process exits during startup (ignored once resolved)
+      vm.once('exit', (code: number) => {
+        clearTimeout(timeout);
+        vm.off('simulation-response', onResponse);
+        reject(new Error(`Simulation process exited early with code ${code}`));
+      });
+    });
+
+    // Errors and timing published by running sessions, for the worker's whole life
+    vm.on('simulation-response', (response: any) => {
+      if (response.type === 'error') {
+        BrowserWindow.getAllWindows().forEach(w => w.webContents.send('simulation-error', response));
+      } else if (response.type === 'loop-stats' || response.type === 'loop-summary') {
+        // Control-loop timing (p50/p95/p99 per phase, overruns) published by gym_manipulator.py
+        BrowserWindow.getAllWindows().forEach(w => w.webContents.send('simulation-loop-stats', response));
+      } else if (response.type === 'startup-profile') {
+        console.log('Simulation startup profile (seconds since launch):', response.marks);
       }
+    });
 
-      const vm = new VideoManager();
-      // const recordingPath = path.join(app.getPath('userData'), `simulation_${Date.now()}.mp4`);
-
-      // Prepare to capture the dynamic URL from the python process
-      const waitForUrl = new Promise<string>((resolve, reject) => {
-        const timeout = setTimeout(() => {
-          reject(new Error("Timeout waiting for simulation server URL"));
-        }, 15000); // 15s timeout
-
-        const onResponse = (response: any) => {
-          if (response.type === 'server-ready' && response.url) {
-            clearTimeout(timeout);
-            vm.off('simulation-response', onResponse);
-            resolve(response.url);
-          } else if (response.type === 'error') {
-            clearTimeout(timeout);
-            vm.off('simulation-response', onResponse);
-            reject(new Error(response.message || 'Simulation error'));
-          }
-        };
-        vm.on('simulation-response', onResponse);
+    vm.once('exit', () => {
+      if (simulationWorker?.vm === vm) {
+        simulationWorker = null;
+      }
+      if (videoManagers.get('simulation') === vm) {
+        videoManagers.delete('simulation');
+        BrowserWindow.getAllWindows().forEach(w => w.webContents.send('simulation-state-changed', { running: false }));
+      }
+    });
 
-        // Also listen for errors that happen AFTER initialization
-        const onError = (response: any) => {
-          if (response.type === 'error') {
-            BrowserWindow.getAllWindows().forEach(w => w.webContents.send('simulation-error', response));
-          }
-        };
-        vm.on('simulation-response', onError);
+    await vm.startSimulation(command, args, env);
+    try {
+      const wsUrl = await waitForUrl;
+      vm.wsUrl = wsUrl;
+      return { vm, wsUrl };
+    } catch (e) {
+      // Don't leave a half-started worker behind
+      vm.stopAll();
+      throw e;
+    }
+  };
 
-        // Also reject if process exits early
-        const onExit = (code: number) => {
-          clearTimeout(timeout);
-          vm.off('simulation-response', onResponse);
-          // If we exit early (during startup), we reject.
-          // If we resolved already, this reject is ignored.
-          reject(new Error(`Simulation process exited early with code ${code}`));
-          // We can remove the error listener since the process is dead
-          vm.off('simulation-response', onError);
-        };
-        vm.once('exit', onExit);
-      });
+  const ensureSimulationWorker = async () => {
+    if (simulationWorker) return simulationWorker;
+    if (!simulationWorkerStarting) {
+      simulationWorkerStarting = spawnSimulationWorker()
+        .then(worker => (simulationWorker = worker))
+        .finally(() => { simulationWorkerStarting = null; });
+    }
+    return simulationWorkerStarting;
+  };
 
-      await vm.startSimulation(command, args, env);
-      videoManagers.set(id, vm);
+  // Send a command to the worker and wait for the response carrying its id.
+  const sendWorkerCommand = (vm: VideoManager, command: any, responseType: string, timeoutMs = 120000) => {
+    const id = nextWorkerCommandId++;
+    return new Promise<any>((resolve, reject) => {
+      const cleanup = () => {
+        clearTimeout(timeout);
+        vm.off('simulation-response', onResponse);
+        vm.off('exit', onExit);
+      };
+      const timeout = setTimeout(() => {
+        cleanup();
+        reject(new Error(`Timeout waiting for simulation worker (${command.command})`));
+      }, timeoutMs);
+      const onResponse = (response: any) => {
+        if (response.type === responseType && response.id === id) {
+          cleanup();
+          resolve(response);
+        }
+      };
+      const onExit = (code: number) => {
+        cleanup();
+        reject(new Error(`Simulation worker exited with code ${code}`));
+      };
+      vm.on('simulation-response', onResponse);
+      vm.once('exit', onExit);
+      // sendCommand only fails when the worker is gone; a large command that
+      // fills the pipe is still delivered, and its reply (or the timeout) settles this.
+      if (!vm.sendCommand({ ...command, id })) {
+        cleanup();
+        reject(new Error('Simulation worker is not running'));
+      }
+    });
+  };
 
-      let wsUrl = '';
-      try {
-        wsUrl = await waitForUrl;
-        vm.wsUrl = wsUrl;
-      } catch (e) {
-        console.warn('Failed to get dynamic URL from simulation, falling back cleanly or erroring:', e);
-        // If we fail to start properly, clean up the VM so we don't leave zombie processes or stuck listeners?
-        vm.stopAll();
-        videoManagers.delete(id);
-        throw e;
+  // Start a simulation session on the (warm) worker and stream frames
+  ipcMain.handle('start-simulation', async (_event, config: any = {}) => {
+    try {
+      const id = 'simulation';
+      if (videoManagers.has(id)) {
+        return { ok: false, message: 'simulation already running' };
       }
 
+      const { vm, wsUrl } = await ensureSimulationWorker();
+      const result = await sendWorkerCommand(vm, { command: 'load_config', config }, 'config-loaded');
+      if (!result.ok) {
+        throw new Error(result.message || 'Failed to load simulation config');
+      }
+      console.log('Simulation session loaded:', result.timings);
+      videoManagers.set(id, vm);
+
       BrowserWindow.getAllWindows().forEach(w => w.webContents.send('simulation-state-changed', { running: true, wsUrl }));
 
       return { ok: true, wsUrl };
@@ -975,12 +1038,32 @@ const setupIpcHandlers = () => {
     }
   });
 
+  // Apply live env changes (camera placement, timing, home pose) without restarting the session
+  ipcMain.handle('reconfigure-simulation', async (_event, changes: any = {}) => {
+    const vm = videoManagers.get('simulation');
+    if (!vm || simulationWorker?.vm !== vm) {
+      return { ok: false, message: 'simulation not running' };
+    }
+    return sendWorkerCommand(vm, { command: 'reconfigure', changes }, 'reconfigured', 10000);
+  });
+
   ipcMain.handle('stop-simulation', async () => {
     const id = 'simulation';
     const vm = videoManagers.get(id);
     if (vm) {
-      vm.stopAll();
       videoManagers.delete(id);
+      if (simulationWorker?.vm === vm) {
+        // End the session but keep the worker warm for the next one
+        try {
+          await sendWorkerCommand(vm, { command: 'stop' }, 'session-stopped', 30000);
+        } catch (e) {
+          console.warn('Simulation worker did not stop cleanly, restarting it', e);
+          vm.stopAll();
+          simulationWorker = null;
+        }
+      } else {
+        vm.stopAll();
+      }
     }
     BrowserWindow.getAllWindows().forEach(w => w.webContents.send('simulation-state-changed', { running: false }));
     return { ok: true };
@@ -50,6 +50,7 @@ contextBridge.exposeInMainWorld("electronAPI", {
   ,
   startSimulation: (config?: any) => ipcRenderer.invoke('start-simulation', config),
   stopSimulation: () => ipcRenderer.invoke('stop-simulation'),
+  reconfigureSimulation: (changes: any) => ipcRenderer.invoke('reconfigure-simulation', changes),
   startCamera: (devicePath: string) => ipcRenderer.invoke('start-camera', devicePath),
   openVideoWindow: (url: string) => ipcRenderer.invoke('open-video-window', url),
   startRTSP: (url: string) => ipcRenderer.invoke('start-rtsp', url),
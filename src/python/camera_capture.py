@@ -0,0 +1,114 @@
+import logging
+import threading
+import time
+from typing import Any
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Background camera capture with latest-frame slots
+# ---------------------------------------------------------------------------
+#
+# One thread per camera loops on the (blocking) ``camera.read()`` and stores
+# every frame in a preallocated double buffer together with its capture time.
+# Readers never wait for the camera: they copy whatever frame is newest and
+# get its age alongside, so slow USB cameras no longer cap the control rate.
+
+
+class LatestFrameSlot:
+    """Double-buffered holder for a camera's most recent frame and its timestamp."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffers: list[np.ndarray] | None = None
+        self._front = 0
+        self.timestamp: float | None = None    # time.perf_counter() at capture
+        self.sequence = 0
+        self._ready = threading.Event()
+
+    def write(self, frame: np.ndarray, timestamp: float | None = None) -> None:
+        """Store frame; only the buffer readers cannot see is written to."""
+        frame = np.asarray(frame)
+        if self._buffers is None or self._buffers[0].shape != frame.shape or self._buffers[0].dtype != frame.dtype:
+            with self._lock:
+                self._buffers = [np.empty_like(frame), np.empty_like(frame)]
+                self._front = 0
+        back = 1 - self._front
+        np.copyto(self._buffers[back], frame)
+        with self._lock:
+            self._front = back
+            self.timestamp = time.perf_counter() if timestamp is None else timestamp
+            self.sequence += 1
+        self._ready.set()
+
+    def read(self) -> tuple[np.ndarray | None, float | None, int]:
+        """Copy of the newest frame with its capture time and sequence number."""
+        with self._lock:
+            if self._buffers is None:
+                return None, None, 0
+            return self._buffers[self._front].copy(), self.timestamp, self.sequence
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        return self._ready.wait(timeout)
+
+
+class CameraCapture:
+    """Runs one capture thread per camera and serves their latest frames."""
+
+    def __init__(self, cameras: dict[str, Any], error_backoff_s: float = 0.1):
+        self._cameras = dict(cameras)
+        self._error_backoff_s = error_backoff_s
+        self._stop = threading.Event()
+        self.slots = {name: LatestFrameSlot() for name in self._cameras}
+        self.errors = {name: 0 for name in self._cameras}
+        self._threads = [
+            threading.Thread(target=self._capture_loop, args=(name,), name=f"camera-{name}", daemon=True)
+            for name in self._cameras
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _capture_loop(self, name: str) -> None:
+        camera = self._cameras[name]
+        slot = self.slots[name]
+        while not self._stop.is_set():
+            try:
+                frame = camera.read()
+                captured = time.perf_counter()
+            except Exception as e:
+                self.errors[name] += 1
+                if self.errors[name] == 1 or self.errors[name] % 100 == 0:
+                    logging.warning(f"Camera {name} read failed ({self.errors[name]} errors): {e}")
+                self._stop.wait(self._error_backoff_s)
+                continue
+            slot.write(frame, captured)
+
+    def wait_for_first_frames(self, timeout: float = 5.0) -> bool:
+        """Block until every camera delivered a frame; False if one timed out."""
+        deadline = time.perf_counter() + timeout
+        return all(slot.wait_ready(max(deadline - time.perf_counter(), 0.0)) for slot in self.slots.values())
+
+    def cameras_without_frames(self) -> list[str]:
+        """Names of the cameras that have not delivered a frame yet."""
+        return [name for name, slot in self.slots.items() if slot.sequence == 0]
+
+    def latest(self) -> tuple[dict[str, np.ndarray], dict[str, float]]:
+        """Newest frame of every camera and its age in seconds, without waiting.
+
+        Cameras without a frame yet are left out; wait_for_first_frames first.
+        """
+        now = time.perf_counter()
+        frames: dict[str, np.ndarray] = {}
+        ages: dict[str, float] = {}
+        for name, slot in self.slots.items():
+            frame, timestamp, _ = slot.read()
+            if frame is None:
+                continue
+            frames[name] = frame
+            ages[name] = now - timestamp
+        return frames, ages
+
+    def close(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
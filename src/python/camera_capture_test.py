@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+
+from camera_capture import CameraCapture, LatestFrameSlot
+
+
+class FakeCamera:
+    """Delivers a new frame every `period` seconds, filled with the frame number."""
+
+    def __init__(self, period: float):
+        self.period = period
+        self.count = 0
+
+    def read(self) -> np.ndarray:
+        time.sleep(self.period)
+        self.count += 1
+        return np.full((4, 6, 3), self.count % 256, dtype=np.uint8)
+
+
+class TestLatestFrameSlot:
+
+    def test_read_returns_copy_of_newest(self):
+        slot = LatestFrameSlot()
+        assert slot.read() == (None, None, 0)
+
+        slot.write(np.zeros((2, 2), dtype=np.uint8), timestamp=1.0)
+        slot.write(np.ones((2, 2), dtype=np.uint8), timestamp=2.0)
+        frame, timestamp, sequence = slot.read()
+        assert frame.max() == 1
+        assert (timestamp, sequence) == (2.0, 2)
+
+        # The copy is the caller's; later writes do not touch it.
+        slot.write(np.full((2, 2), 7, dtype=np.uint8))
+        assert frame.max() == 1
+
+
+class TestCameraCapture:
+
+    def test_latest_does_not_wait_for_slow_camera(self):
+        capture = CameraCapture({"front": FakeCamera(0.05)})
+        try:
+            assert capture.wait_for_first_frames(timeout=1.0)
+            start = time.perf_counter()
+            frames, ages = capture.latest()
+            assert time.perf_counter() - start < 0.01
+            assert frames["front"].shape == (4, 6, 3)
+            assert 0.0 <= ages["front"] < 0.1
+        finally:
+            capture.close()
+
+    def test_survives_read_errors(self):
+        camera = FakeCamera(0.0)
+        calls = {"n": 0}
+        read = camera.read
+
+        def flaky_read():
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise OSError("device busy")
+            return read()
+
+        camera.read = flaky_read
+        capture = CameraCapture({"wrist": camera}, error_backoff_s=0.01)
+        try:
+            assert capture.wait_for_first_frames(timeout=1.0)
+            assert capture.errors["wrist"] == 1
+        finally:
+            capture.close()
+
+    def test_reports_cameras_without_frames(self):
+        class DeadCamera:
+            def read(self):
+                raise OSError("no device")
+
+        capture = CameraCapture({"front": FakeCamera(0.0), "wrist": DeadCamera()}, error_backoff_s=0.01)
+        try:
+            assert not capture.wait_for_first_frames(timeout=0.2)
+            assert capture.cameras_without_frames() == ["wrist"]
+            assert set(capture.latest()[0]) == {"front"}
+        finally:
+            capture.close()
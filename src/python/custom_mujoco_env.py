@@ -16,6 +16,7 @@ import logging
 import os
 import glob
 import ctypes.util
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Any
 import re
@@ -26,6 +27,10 @@ import mujoco
 
 from lerobot.envs.configs import EnvConfig
 
+from mujoco_model_cache import load_model_cached
+from mujoco_rendering import CameraView, MultiCameraRenderer
+from mujoco_state import ResetDistribution, ResetSampler, StateRing, get_state, set_state
+
 # Detect if hardware acceleration is available (EGL) or not (OSMesa)
 # This needs to be set before mujoco is used for rendering in some contexts,
 # though often the main entry point handles it.
@@ -59,6 +64,32 @@ class CameraSpec:
 
 
 
+def camera_quat(cs: CameraSpec) -> np.ndarray | None:
+    """Orientation set by cs as a MuJoCo [w, x, y, z] quaternion, or None if it sets none.
+
+    Follows MJCF precedence and defaults: quat, then euler (degrees, 'xyz'),
+    then xyaxes, then zaxis.
+    """
+    quat = np.zeros(4)
+    if cs.quat is not None:
+        quat[:] = cs.quat
+        mujoco.mju_normalize4(quat)
+    elif cs.euler is not None:
+        mujoco.mju_euler2Quat(quat, np.deg2rad(np.asarray(cs.euler, dtype=np.float64)), "xyz")
+    elif cs.xyaxes is not None:
+        x = np.asarray(cs.xyaxes[:3], dtype=np.float64)
+        y = np.asarray(cs.xyaxes[3:], dtype=np.float64)
+        x = x / np.linalg.norm(x)
+        y = y - x * np.dot(x, y)
+        y = y / np.linalg.norm(y)
+        mujoco.mju_mat2Quat(quat, np.column_stack([x, y, np.cross(x, y)]).ravel())
+    elif cs.zaxis is not None:
+        mujoco.mju_quatZ2Vec(quat, np.asarray(cs.zaxis, dtype=np.float64))
+    else:
+        return None
+    return quat
+
+
 @dataclass
 class GripperConfig:
     use_gripper: bool = True
@@ -98,11 +129,37 @@ class CustomMujocoEnvConfig(EnvConfig):
     home_position: list[float] | None = None
     cartesian_bounds: list[list[float]] | None = None
     image_obs: bool = True
+    # Extra per-camera outputs rendered in the same pass as RGB.
+    render_depth: bool = False
+    render_segmentation: bool = False
+    # Camera rate. Render every n-th control step, or derive n from render_fps
+    # (which takes precedence); in-between steps reuse the last frames.
+    image_every_n_steps: int = 1
+    render_fps: float | None = None
     render_mode: str = "rgb_array"
     reward_type: str = "sparse"
     control_dt: float = 0.02
     physics_dt: float = 0.002
     seed: int = 0
+    # Reuse compiled models (MJB) across launches; see mujoco_model_cache.
+    use_model_cache: bool = True
+    # Number of MjData instances stepped in lockstep by make_robot_env. Values > 1
+    # build a VectorGenericMujocoEnv that shares a single compiled MjModel; such
+    # sessions run batched headless rollouts (gym_manipulator.batched_rollout).
+    num_envs: int = 1
+    # Worker threads used to step the batched instances (mj_step releases the GIL).
+    # 0 steps them sequentially on the calling thread.
+    num_threads: int = 0
+    # Worker processes for MujocoEnvPool. Values > 0 run one env per process and
+    # return observations through shared memory; takes precedence over num_envs.
+    # Like num_envs, such sessions run batched headless rollouts.
+    num_workers: int = 0
+    # Keep the last n simulation states (one per reset/step) so the env can
+    # rewind; 0 disables the ring. See GenericMujocoEnv.rewind.
+    snapshot_capacity: int = 0
+    # Randomized initial states (joint noise, keyframes, object poses); None
+    # always resets to the home pose.
+    reset_distribution: ResetDistribution | None = None
     processor: CustomMujocoProcessorConfig = field(default_factory=CustomMujocoProcessorConfig)
 
     @property
@@ -110,6 +167,75 @@ class CustomMujocoEnvConfig(EnvConfig):
         return {}
 
 
+def camera_specs_from_config(cfg: CustomMujocoEnvConfig) -> list[CameraSpec]:
+    """Build CameraSpec objects from config cameras, which may be dicts or dataclasses."""
+    return camera_specs(cfg.cameras)
+
+
+def camera_specs(cameras: list | None) -> list[CameraSpec]:
+    """Build CameraSpec objects from camera entries given as dicts or dataclasses."""
+
+    def get_val(obj, key, default=None):
+        if isinstance(obj, dict):
+            return obj.get(key, default)
+        return getattr(obj, key, default)
+
+    camera_specs = []
+    for i, c in enumerate(cameras or []):
+        camera_specs.append(
+            CameraSpec(
+                name=get_val(c, "name", f"cam_{i}"),
+                pos=get_val(c, "pos", None),
+                quat=get_val(c, "quat", None),
+                axis=get_val(c, "axis", None),
+                target=get_val(c, "target", None),
+                xyaxes=get_val(c, "xyaxes", None),
+                zaxis=get_val(c, "zaxis", None),
+                euler=get_val(c, "euler", None),
+                fovy=get_val(c, "fovy", None),
+                width=get_val(c, "width", 128),
+                height=get_val(c, "height", 128),
+            )
+        )
+    return camera_specs
+
+
+def generic_mujoco_env_kwargs(cfg: CustomMujocoEnvConfig) -> dict[str, Any]:
+    """Translate a CustomMujocoEnvConfig into GenericMujocoEnv constructor kwargs."""
+    camera_specs = camera_specs_from_config(cfg)
+    return dict(
+        model_xml=cfg.model_xml,
+        model_path=cfg.model_path,
+        scene_xml_path=cfg.scene_xml_path,
+        robot_xml_path=cfg.robot_xml_path,
+        model_format=cfg.model_format,
+        cameras=camera_specs,
+        seed=cfg.seed,
+        control_dt=cfg.control_dt,
+        physics_dt=cfg.physics_dt,
+        render_spec_height=camera_specs[0].height if camera_specs else 128,
+        render_spec_width=camera_specs[0].width if camera_specs else 128,
+        render_mode=cfg.render_mode,
+        image_obs=cfg.image_obs,
+        home_position=np.array(cfg.home_position) if cfg.home_position else None,
+        cartesian_bounds=np.array(cfg.cartesian_bounds) if cfg.cartesian_bounds else None,
+        use_model_cache=cfg.use_model_cache,
+        render_depth=cfg.render_depth,
+        render_segmentation=cfg.render_segmentation,
+        image_every_n_steps=cfg.image_every_n_steps,
+        render_fps=cfg.render_fps,
+        snapshot_capacity=cfg.snapshot_capacity,
+        reset_distribution=cfg.reset_distribution,
+    )
+
+
+def image_cadence(image_every_n_steps: int, render_fps: float | None, control_dt: float) -> int:
+    """Control steps per rendered frame; render_fps, when set, takes precedence."""
+    if render_fps:
+        return max(1, round(1.0 / (render_fps * control_dt)))
+    return max(1, int(image_every_n_steps))
+
+
 class GenericMujocoEnv(gym.Env):
     """Generic MuJoCo environment for any uploaded MJCF/URDF robot model.
 
@@ -138,6 +264,14 @@ class GenericMujocoEnv(gym.Env):
         image_obs: bool = True,
         home_position: np.ndarray | None = None,
         cartesian_bounds: np.ndarray | None = None,
+        use_model_cache: bool = True,
+        render_depth: bool = False,
+        render_segmentation: bool = False,
+        reuse_obs_buffers: bool = False,
+        image_every_n_steps: int = 1,
+        render_fps: float | None = None,
+        snapshot_capacity: int = 0,
+        reset_distribution: ResetDistribution | None = None,
     ):
         super().__init__()
 
@@ -146,6 +280,14 @@ class GenericMujocoEnv(gym.Env):
         self._render_mode = render_mode
         self._image_obs = image_obs
         self._cartesian_bounds = cartesian_bounds
+        self._use_model_cache = use_model_cache
+        # Cameras are rendered on reset and then every n-th step; steps in between
+        # return the last rendered frames while physics keeps running at control_dt.
+        # render_fps (if set) fixes the frame rate instead, so n follows control_dt.
+        self._render_fps = render_fps
+        self._image_every_n_steps = image_cadence(image_every_n_steps, render_fps, control_dt)
+        self._step_count = 0
+        self._last_frames: dict[str, np.ndarray] = {}
 
         # ----- load model -----
         if scene_xml_path and robot_xml_path:
@@ -155,16 +297,11 @@ class GenericMujocoEnv(gym.Env):
             merged_content = self._merge_xmls_via_include(scene_xml_path, robot_xml_path)
             print("Merged XML content:\n", merged_content)  # Debugging output
             scene_dir = os.path.dirname(os.path.abspath(scene_xml_path))
-            import tempfile
-            # Create a temp file in the same directory as the scene file
-            fd, temp_path = tempfile.mkstemp(suffix=".xml", dir=scene_dir, text=True)
-            try:
-                with os.fdopen(fd, 'w') as f:
-                    f.write(merged_content)
-                self._model = mujoco.MjModel.from_xml_path(temp_path)
-            finally:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
+            self._model = self._load_model(
+                merged_content,
+                lambda: self._compile_in_dir(merged_content, scene_dir),
+                base_dir=scene_dir,
+            )
 
         elif model_path:
             # Direct file path case
@@ -177,8 +314,14 @@ class GenericMujocoEnv(gym.Env):
                 if not xml_files:
                     raise ValueError(f"No .xml files found in {model_path}")
                 target_path = xml_files[0]
-            
-            self._model = mujoco.MjModel.from_xml_path(target_path)
+
+            with open(target_path, 'r', encoding='utf-8') as f:
+                model_content = f.read()
+            self._model = self._load_model(
+                model_content,
+                lambda: mujoco.MjModel.from_xml_path(target_path),
+                base_dir=os.path.dirname(os.path.abspath(target_path)),
+            )
         
         elif model_xml:
             # Direct XML string case
@@ -215,7 +358,11 @@ class GenericMujocoEnv(gym.Env):
                         # keep indentation consistent with existing <worldbody>
                         model_xml = model_xml[:insert_at] + "\n" + "\n".join(camera_nodes) + "\n" + model_xml[insert_at:]
 
-            self._model = mujoco.MjModel.from_xml_string(model_xml)
+            # MuJoCo resolves relative asset paths in an XML string against the
+            # working directory, so that is where the cache key looks for them too.
+            self._model = self._load_model(
+                model_xml, lambda: mujoco.MjModel.from_xml_string(model_xml), base_dir=os.getcwd()
+            )
             
         else:
             raise ValueError("No model configuration provided (need model_xml, model_path, or scene_xml_path + robot_xml_path).")
@@ -237,7 +384,10 @@ class GenericMujocoEnv(gym.Env):
             all_joints.append((jnt.name, jnt.id))
 
         self._joint_names = [n for n, _ in all_joints]
-        self._dof_ids = np.array([self._model.joint(n).qposadr[0] for n in self._joint_names], dtype=np.int32)
+        # qpos and qvel are addressed separately: free/ball joints have more qpos than dof entries.
+        joint_ids = [self._model.joint(n).id for n in self._joint_names]
+        self._qpos_ids = self._model.jnt_qposadr[joint_ids].astype(np.intp)
+        self._qvel_ids = self._model.jnt_dofadr[joint_ids].astype(np.intp)
 
         all_actuators = []
         for i in range(self._model.nu):
@@ -296,19 +446,64 @@ class GenericMujocoEnv(gym.Env):
                 # Use qpos of the first keyframe.
                 # Keyframes store full qpos (including free joints), so we need to map to our dofs.
                 key_qpos = self._model.key_qpos[0]
-                self._home_position = np.array([key_qpos[self._dof_ids[i]] for i in range(num_dofs)], dtype=np.float64)
+                self._home_position = key_qpos[self._qpos_ids].astype(np.float64)
             else:
                 self._home_position = np.zeros(num_dofs, dtype=np.float64)
 
+        # ----- reset distribution -----
+        self._reset_distribution = reset_distribution
+        self._reset_sampler = self._make_reset_sampler()
+
+        # ----- state snapshots -----
+        self._snapshots = StateRing(self._model, snapshot_capacity) if snapshot_capacity > 0 else None
+
         # ----- renderer -----
-        self._viewer: mujoco.Renderer | None = None
+        self._renderer: MultiCameraRenderer | None = None
         self._render_height = render_spec_height
         self._render_width = render_spec_width
+        self._render_depth = render_depth
+        self._render_segmentation = render_segmentation
+        # When True, observation frames are rendered in place into buffers owned by
+        # the renderer and are only valid until the next step. Consumers that copy
+        # every frame anyway (vector envs, pool workers) use this to skip allocations.
+        self._reuse_obs_buffers = reuse_obs_buffers
+        # The same goes for the state vector and the observation dict itself.
+        self._state_buffer = np.zeros(2 * len(self._qpos_ids) + int(self._has_gripper), dtype=np.float32)
+        self._obs: dict[str, Any] = {}
+        self._camera_views: list[CameraView] = []
+        self._camera_keys: list[str] = []
+        for i, cid in enumerate(self._camera_ids):
+            cs = self._cameras_spec[i] if i < len(self._cameras_spec) else None
+            self._camera_views.append(CameraView(
+                camera_id=cid,
+                height=cs.height if cs else self._render_height,
+                width=cs.width if cs else self._render_width,
+            ))
+            self._camera_keys.append(cs.name if cs else "free")
 
         # ----- spaces -----
         self._setup_observation_space()
         self._setup_action_space()
 
+    def _load_model(self, xml: str, compile_fn, base_dir: str | None = None) -> mujoco.MjModel:
+        """Compile xml via compile_fn, going through the compiled-model cache when enabled."""
+        if not self._use_model_cache:
+            return compile_fn()
+        return load_model_cached(xml, compile_fn, base_dir=base_dir)
+
+    @staticmethod
+    def _compile_in_dir(xml: str, directory: str) -> mujoco.MjModel:
+        """Compile xml from a temporary file in directory so relative assets resolve."""
+        import tempfile
+        fd, temp_path = tempfile.mkstemp(suffix=".xml", dir=directory, text=True)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(xml)
+            return mujoco.MjModel.from_xml_path(temp_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
     def _merge_xmls_via_include(self, scene_path: str, robot_path: str) -> str:
         """Merge robot XML into scene XML by injecting an <include> tag."""
         with open(scene_path, 'r', encoding='utf-8') as f:
@@ -381,6 +576,15 @@ class GenericMujocoEnv(gym.Env):
                 obs_spaces["observation.images.free"] = gym.spaces.Box(
                     low=0, high=255, shape=(self._render_height, self._render_width, 3), dtype=np.uint8
                 )
+            for key, view in zip(self._camera_keys, self._camera_views):
+                if self._render_depth:
+                    obs_spaces[f"observation.depth.{key}"] = gym.spaces.Box(
+                        low=0, high=np.inf, shape=(view.height, view.width), dtype=np.float32
+                    )
+                if self._render_segmentation:
+                    obs_spaces[f"observation.segmentation.{key}"] = gym.spaces.Box(
+                        low=-1, high=np.iinfo(np.int32).max, shape=(view.height, view.width, 2), dtype=np.int32
+                    )
 
         self.observation_space = gym.spaces.Dict(obs_spaces)
 
@@ -395,94 +599,281 @@ class GenericMujocoEnv(gym.Env):
     # ---- core gym methods ----
 
     def reset(self, *, seed=None, options=None):
+        """Reset to the home pose, or to options["state"] (a get_state() array) if given."""
         super().reset(seed=seed, options=options)
-        self._data.qpos[self._dof_ids] = self._home_position
-        self._data.qvel[:] = 0.0
-        self._data.ctrl[:] = 0.0
-        mujoco.mj_forward(self._model, self._data)
-        obs = self._get_observation()
+        if seed is not None:
+            self._seed(seed)
+        state = (options or {}).get("state")
+        if state is not None:
+            set_state(self._model, self._data, state)
+        else:
+            self._reset_data(self._data)
+        self._step_count = 0
+        if self._snapshots is not None:
+            self._snapshots.clear()
+            self._snapshots.push(self._data)
+        obs = self._get_observation(render_images=True)
         return obs, {}
 
     def step(self, action):
         # Apply action to actuators
         action = np.asarray(action, dtype=np.float64)
-        if len(self._ctrl_ids) > 0:
-            self._data.ctrl[self._ctrl_ids] = action[:len(self._ctrl_ids)]
-        else:
-            # No actuators defined — set qpos directly (limited usefulness)
-            num = min(len(action), len(self._dof_ids))
-            self._data.qpos[self._dof_ids[:num]] = action[:num]
+        self._apply_action(self._data, action)
 
         for _ in range(self._n_substeps):
             mujoco.mj_step(self._model, self._data)
+        if self._snapshots is not None:
+            self._snapshots.push(self._data)
 
-        obs = self._get_observation()
+        self._step_count += 1
+        render_images = self._step_count % self._image_every_n_steps == 0
+        obs = self._get_observation(render_images=render_images)
         reward = 0.0
         terminated = False
         truncated = False
-        return obs, reward, terminated, truncated, {}
-
-    def _get_observation(self) -> dict:
-        qpos = self._data.qpos[self._dof_ids].astype(np.float32)
-        qvel = self._data.qvel[self._dof_ids].astype(np.float32) if len(self._dof_ids) <= self._data.qvel.shape[0] else np.zeros_like(qpos)
-
-        parts = [qpos, qvel]
-        if self._has_gripper and self._gripper_ctrl_id is not None:
-            parts.append(np.array([self._data.ctrl[self._gripper_ctrl_id]], dtype=np.float32))
+        return obs, reward, terminated, truncated, {"images_updated": self._image_obs and render_images}
 
-        agent_pos = np.concatenate(parts)
-        obs: dict[str, Any] = {"observation.state": agent_pos}
+    def _get_observation(self, render_images: bool = True) -> dict:
+        if self._reuse_obs_buffers:
+            obs = self._obs
+            obs["observation.state"] = self._state_from_data(self._data, out=self._state_buffer)
+        else:
+            obs = {"observation.state": self._state_from_data(self._data)}
 
         if self._image_obs:
-            frames = self.render()
-            if isinstance(frames, list):
-                for i, frame in enumerate(frames):
-                    if i < len(self._cameras_spec):
-                        cam_name = self._cameras_spec[i].name
-                    else:
-                        cam_name = "free"
-                    obs[f"observation.images.{cam_name}"] = frame
-            elif frames is not None:
-                obs["observation.images.free"] = frames
+            if render_images or not self._last_frames:
+                self._last_frames = self._camera_frames(self._data)
+            obs.update(self._last_frames)
 
         return obs
 
+    def _state_from_data(self, data: mujoco.MjData, out: np.ndarray | None = None) -> np.ndarray:
+        """qpos and qvel of the controlled joints (plus gripper ctrl) as float32, gathered into out if given."""
+        if out is None:
+            out = np.empty_like(self._state_buffer)
+        n = len(self._qpos_ids)
+        # Indexed assignment casts into out directly; for these few joints it is
+        # faster than np.take(..., out=), whose float64 -> float32 cast is buffered.
+        out[:n] = data.qpos[self._qpos_ids]
+        out[n:2 * n] = data.qvel[self._qvel_ids]
+        if self._has_gripper and self._gripper_ctrl_id is not None:
+            out[2 * n] = data.ctrl[self._gripper_ctrl_id]
+        return out
+
+    def _apply_action(self, data: mujoco.MjData, action: np.ndarray) -> None:
+        if len(self._ctrl_ids) > 0:
+            data.ctrl[self._ctrl_ids] = action[:len(self._ctrl_ids)]
+        else:
+            # No actuators defined — set qpos directly (limited usefulness)
+            num = min(len(action), len(self._qpos_ids))
+            data.qpos[self._qpos_ids[:num]] = action[:num]
+
+    def _seed(self, seed: int) -> None:
+        self._random = np.random.RandomState(seed)
+        if self._reset_sampler is not None:
+            self._reset_sampler.clear()
+
+    def _make_reset_sampler(self) -> ResetSampler | None:
+        dist = self._reset_distribution
+        if dist is None:
+            return None
+        scratch = mujoco.MjData(self._model)
+        base_states = []
+        if dist.use_keyframes and self._model.nkey > 0:
+            for key in range(self._model.nkey):
+                mujoco.mj_resetDataKeyframe(self._model, scratch, key)
+                scratch.time = 0.0
+                base_states.append(get_state(self._model, scratch))
+        else:
+            if dist.use_keyframes:
+                logging.warning("Reset distribution asks for keyframes but the model has none; using the home pose")
+            mujoco.mj_resetData(self._model, scratch)
+            self._reset_to_home(scratch)
+            base_states.append(get_state(self._model, scratch))
+        joint_ids = np.array([self._model.joint(name).id for name in self._joint_names], dtype=np.int64)
+        return ResetSampler(self._model, np.stack(base_states), joint_ids, dist)
+
+    def _reset_data(self, data: mujoco.MjData) -> None:
+        if self._reset_sampler is not None:
+            set_state(self._model, data, self._reset_sampler.next(self._random))
+            return
+        self._reset_to_home(data)
+
+    def _reset_to_home(self, data: mujoco.MjData) -> None:
+        data.qpos[self._qpos_ids] = self._home_position
+        data.qvel[:] = 0.0
+        data.ctrl[:] = 0.0
+        data.time = 0.0
+        mujoco.mj_forward(self._model, data)
+
     def render(self):
-        if self._viewer is None:
-            self._viewer = mujoco.Renderer(
-                model=self._model,
-                height=self._render_height,
-                width=self._render_width,
+        return self._render_frames(self._data)
+
+    def _get_renderer(self) -> MultiCameraRenderer:
+        if self._renderer is None:
+            self._renderer = MultiCameraRenderer(
+                self._model,
+                self._camera_views,
+                depth=self._render_depth,
+                segmentation=self._render_segmentation,
             )
+        return self._renderer
+
+    def _render_frames(self, data: mujoco.MjData) -> list[np.ndarray]:
+        renderer = self._get_renderer()
+        if self._reuse_obs_buffers:
+            return renderer.render(data)
+        # Render straight into fresh arrays so callers may keep them; no extra copy.
+        return renderer.render(data, out=[np.empty_like(buf) for buf in renderer.rgb])
+
+    def _camera_frames(self, data: mujoco.MjData) -> dict[str, np.ndarray]:
+        """Render every camera for data, keyed like the observation space."""
+        frames = self._render_frames(data)
+        result = {f"observation.images.{key}": frame for key, frame in zip(self._camera_keys, frames)}
+        renderer = self._get_renderer()
+        for key, depth in zip(self._camera_keys, renderer.depth):
+            result[f"observation.depth.{key}"] = depth if self._reuse_obs_buffers else depth.copy()
+        for key, segmentation in zip(self._camera_keys, renderer.segmentation):
+            result[f"observation.segmentation.{key}"] = (
+                segmentation if self._reuse_obs_buffers else segmentation.copy()
+            )
+        return result
+
+    # ---- state snapshots ----
+
+    def get_state(self, out: np.ndarray | None = None) -> np.ndarray:
+        """The full simulation state as a flat array; pass it to set_state or reset(options={"state": ...})."""
+        return get_state(self._model, self._data, out)
+
+    def set_state(self, state: np.ndarray) -> dict:
+        """Continue from a state captured with get_state; returns the observation there."""
+        set_state(self._model, self._data, state)
+        self._last_frames = {}
+        return self._get_observation(render_images=True)
 
-        rendered_frames = []
-        for cam_id in self._camera_ids:
-            self._viewer.update_scene(self._data, camera=cam_id)
-            rendered_frames.append(self._viewer.render().copy())
-        return rendered_frames
+    @property
+    def snapshots(self) -> StateRing | None:
+        """The most recent states, oldest first (None unless snapshot_capacity > 0)."""
+        return self._snapshots
+
+    def rewind(self, steps: int = 1) -> dict:
+        """Go back ``steps`` steps using the snapshot ring; returns the observation there.
+
+        Rewound states are dropped from the ring, so stepping on from there
+        starts a new branch.
+        """
+        if self._snapshots is None:
+            raise RuntimeError("Rewind needs snapshots; create the env with snapshot_capacity > 0")
+        if not 0 <= steps < len(self._snapshots):
+            raise ValueError(f"Cannot rewind {steps} steps, {len(self._snapshots) - 1} are stored")
+        self._snapshots.discard_newest(steps)
+        return self.set_state(self._snapshots[-1])
+
+    # ---- live reconfiguration ----
+
+    def reconfigure(
+        self,
+        cameras: list[CameraSpec] | None = None,
+        home_position: np.ndarray | None = None,
+        control_dt: float | None = None,
+        physics_dt: float | None = None,
+    ) -> set[str]:
+        """Apply new settings to the loaded model in place, without recompiling it.
+
+        Camera pose, orientation, fovy and target go straight into
+        ``model.cam_*``; the cameras must already exist in the model (adding
+        one needs a new env). Only renderers and observation entries whose
+        resolution changed are rebuilt. Timing applies from the next step and
+        the home position from the next reset.
+
+        Returns the observation keys whose space changed.
+        """
+        # Validate everything before touching the model.
+        camera_ids: list[int] = []
+        if cameras is not None:
+            camera_ids = [mujoco.mj_name2id(self._model, mujoco.mjtObj.mjOBJ_CAMERA, cs.name) for cs in cameras]
+            missing = [cs.name for cs, cid in zip(cameras, camera_ids) if cid < 0]
+            if missing:
+                raise ValueError(f"Cameras not in the model, reload the environment to add them: {missing}")
+            for cs in cameras:
+                if cs.target is not None and mujoco.mj_name2id(self._model, mujoco.mjtObj.mjOBJ_BODY, cs.target) < 0:
+                    raise ValueError(f"Camera '{cs.name}' targets unknown body '{cs.target}'")
+        if home_position is not None:
+            home = np.array(home_position[:len(self._joint_names)], dtype=np.float64)
+            if home.shape != self._home_position.shape:
+                raise ValueError(f"home_position needs {self._home_position.shape[0]} values, got {home.shape[0]}")
+        for name, dt in (("control_dt", control_dt), ("physics_dt", physics_dt)):
+            if dt is not None and dt <= 0:
+                raise ValueError(f"{name} must be positive, got {dt}")
+
+        if cameras is not None:
+            for cs, cid in zip(cameras, camera_ids):
+                self._set_camera_pose(cid, cs)
+            # Refresh cam_xpos/cam_xmat so the next render sees the new poses.
+            mujoco.mj_camlight(self._model, self._data)
+
+            views = [CameraView(camera_id=cid, height=cs.height, width=cs.width) for cs, cid in zip(cameras, camera_ids)]
+            keys = [cs.name for cs in cameras]
+            if not views:
+                views = [CameraView(camera_id=-1, height=self._render_height, width=self._render_width)]
+                keys = ["free"]
+            if self._renderer is not None and views != self._camera_views:
+                self._renderer.set_views(views)
+            self._cameras_spec = list(cameras)
+            self._camera_ids = [view.camera_id for view in views]
+            self._camera_views = views
+            self._camera_keys = keys
+            self._last_frames = {}   # render the new views on the next observation
+            self._obs = {}
+
+        if physics_dt is not None:
+            self._model.opt.timestep = physics_dt
+        if control_dt is not None:
+            self._control_dt = control_dt
+            if self._render_fps:
+                self._image_every_n_steps = image_cadence(1, self._render_fps, control_dt)
+        if physics_dt is not None or control_dt is not None:
+            self._n_substeps = max(1, int(self._control_dt / self._model.opt.timestep))
+
+        if home_position is not None:
+            self._home_position = home
+            self._reset_sampler = self._make_reset_sampler()
+
+        old_spaces = self.observation_space.spaces
+        self._setup_observation_space()
+        new_spaces = self.observation_space.spaces
+        changed = {key for key in old_spaces.keys() | new_spaces.keys() if old_spaces.get(key) != new_spaces.get(key)}
+        # Unchanged entries keep their space objects.
+        self.observation_space = gym.spaces.Dict(
+            {key: space if key in changed else old_spaces[key] for key, space in new_spaces.items()}
+        )
+        return changed
+
+    def _set_camera_pose(self, cid: int, cs: CameraSpec) -> None:
+        if cs.pos is not None:
+            self._model.cam_pos[cid] = cs.pos
+        quat = camera_quat(cs)
+        if quat is not None:
+            self._model.cam_quat[cid] = quat
+        if cs.fovy is not None:
+            self._model.cam_fovy[cid] = cs.fovy
+        if cs.target is not None:
+            self._model.cam_targetbodyid[cid] = mujoco.mj_name2id(self._model, mujoco.mjtObj.mjOBJ_BODY, cs.target)
+            self._model.cam_mode[cid] = mujoco.mjtCamLight.mjCAMLIGHT_TARGETBODY
 
     def get_robot_state(self) -> np.ndarray:
-        qpos = self._data.qpos[self._dof_ids].astype(np.float32)
-        qvel = self._data.qvel[self._dof_ids].astype(np.float32) if len(self._dof_ids) <= self._data.qvel.shape[0] else np.zeros_like(qpos)
-        parts = [qpos, qvel]
-        if self._has_gripper and self._gripper_ctrl_id is not None:
-            parts.append(np.array([self._data.ctrl[self._gripper_ctrl_id]], dtype=np.float32))
-        return np.concatenate(parts)
+        return self._state_from_data(self._data)
 
     def get_raw_joint_positions(self) -> dict[str, float]:
         return {
-            f"{name}.pos": float(self._data.qpos[self._dof_ids[i]])
+            f"{name}.pos": float(self._data.qpos[self._qpos_ids[i]])
             for i, name in enumerate(self._joint_names)
         }
 
     def close(self) -> None:
-        if self._viewer is not None:
-            if hasattr(self._viewer, "close") and callable(self._viewer.close):
-                try:
-                    self._viewer.close()
-                except Exception:
-                    pass
-            self._viewer = None
+        if self._renderer is not None:
+            self._renderer.close()
+            self._renderer = None
 
     # Properties for compatibility
     @property
@@ -492,3 +883,127 @@ class GenericMujocoEnv(gym.Env):
     @property
     def data(self) -> mujoco.MjData:
         return self._data
+
+    @property
+    def step_dt(self) -> float:
+        """Simulated seconds advanced by one step()."""
+        return self._n_substeps * self._model.opt.timestep
+
+    @property
+    def sim_time(self) -> float:
+        """Simulated seconds since the last reset."""
+        return float(self._data.time)
+
+
+class VectorGenericMujocoEnv(gym.vector.VectorEnv):
+    """Batched GenericMujocoEnv: N MjData instances stepped in lockstep on one MjModel.
+
+    The model is compiled once by an internal GenericMujocoEnv, which also
+    provides joint/actuator discovery, cameras and rendering.  Actions are
+    ``(num_envs, act_dim)`` arrays and observations are stacked ``(num_envs, ...)``
+    arrays keyed like the single-instance env.
+    """
+
+    metadata = {"render_modes": ["rgb_array"], "autoreset_mode": gym.vector.AutoresetMode.NEXT_STEP}
+
+    def __init__(self, num_envs: int, num_threads: int = 0, **env_kwargs):
+        if num_envs < 1:
+            raise ValueError(f"num_envs must be >= 1, got {num_envs}")
+
+        # Frames are copied into the stacked arrays, so the inner env can reuse its buffers.
+        self._env = GenericMujocoEnv(**{**env_kwargs, "reuse_obs_buffers": True})
+        self._model = self._env.model
+        self._datas = [self._env.data] + [mujoco.MjData(self._model) for _ in range(num_envs - 1)]
+        # Names for dataset schemas, as on the single-instance env.
+        self._joint_names = self._env._joint_names
+        self._actuator_names = self._env._actuator_names
+        self._executor = ThreadPoolExecutor(max_workers=num_threads) if num_threads > 0 else None
+
+        self.num_envs = num_envs
+        self._step_count = 0
+        self._last_frames: dict[str, np.ndarray] = {}
+        self.render_mode = self._env._render_mode
+        self.single_observation_space = self._env.observation_space
+        self.single_action_space = self._env.action_space
+        self.observation_space = gym.vector.utils.batch_space(self.single_observation_space, num_envs)
+        self.action_space = gym.vector.utils.batch_space(self.single_action_space, num_envs)
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed, options=options)
+        if seed is not None:
+            self._env._seed(seed)
+        for data in self._datas:
+            self._env._reset_data(data)
+        self._step_count = 0
+        return self._get_observation(render_images=True), {}
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.float64).reshape(self.num_envs, -1)
+        for data, action in zip(self._datas, actions):
+            self._env._apply_action(data, action)
+
+        if self._executor is not None:
+            list(self._executor.map(self._step_physics, self._datas))
+        else:
+            for data in self._datas:
+                self._step_physics(data)
+
+        self._step_count += 1
+        render_images = self._step_count % self._env._image_every_n_steps == 0
+        obs = self._get_observation(render_images=render_images)
+        rewards = np.zeros(self.num_envs, dtype=np.float64)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        info = {"images_updated": np.full(self.num_envs, self._env._image_obs and render_images)}
+        return obs, rewards, terminated, truncated, info
+
+    def _step_physics(self, data: mujoco.MjData) -> None:
+        for _ in range(self._env._n_substeps):
+            mujoco.mj_step(self._model, data)
+
+    def _get_observation(self, render_images: bool = True) -> dict:
+        render_images = render_images or not self._last_frames
+        obs: dict[str, Any] = {}
+        for key, space in self.single_observation_space.spaces.items():
+            if key == "observation.state" or render_images:
+                obs[key] = np.empty((self.num_envs, *space.shape), dtype=space.dtype)
+            else:
+                obs[key] = self._last_frames[key]
+
+        state = obs["observation.state"]
+        for i, data in enumerate(self._datas):
+            self._env._state_from_data(data, out=state[i])
+            if self._env._image_obs and render_images:
+                for key, frame in self._env._camera_frames(data).items():
+                    obs[key][i] = frame
+        if render_images:
+            self._last_frames = {key: value for key, value in obs.items() if key != "observation.state"}
+        return obs
+
+    def render(self):
+        return [[frame.copy() for frame in self._env._render_frames(data)] for data in self._datas]
+
+    def get_robot_state(self) -> np.ndarray:
+        state = np.empty((self.num_envs, *self._env._state_buffer.shape), dtype=np.float32)
+        for i, data in enumerate(self._datas):
+            self._env._state_from_data(data, out=state[i])
+        return state
+
+    def close_extras(self, **kwargs) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._env.close()
+
+    @property
+    def model(self) -> mujoco.MjModel:
+        return self._model
+
+    @property
+    def datas(self) -> list[mujoco.MjData]:
+        return self._datas
+
+    @property
+    def step_dt(self) -> float:
+        """Simulated seconds advanced by one step()."""
+        return self._env.step_dt
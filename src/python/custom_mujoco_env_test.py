@@ -2,7 +2,8 @@ import pytest
 from unittest.mock import MagicMock, patch
 import numpy as np
 import gymnasium as gym
-from custom_mujoco_env import GenericMujocoEnv, CameraSpec
+from custom_mujoco_env import GenericMujocoEnv, CameraSpec, VectorGenericMujocoEnv
+from mujoco_state import ResetDistribution
 
 SIMPLE_MJCF = """
 <mujoco>
@@ -123,3 +124,189 @@ class TestCustomMujocoEnv:
         assert isinstance(frames, list)
         assert len(frames) == 1 # free camera
         assert frames[0].shape == (128, 128, 3) # default size
+
+    def test_image_every_n_steps(self, mock_mujoco_renderer):
+        env = GenericMujocoEnv(model_xml=SIMPLE_MJCF, image_every_n_steps=3)
+        obs, _ = env.reset()
+        renderer = mock_mujoco_renderer.return_value
+        assert renderer.render.call_count == 1
+
+        updates = []
+        for _ in range(6):
+            obs, _, _, _, info = env.step(np.zeros(1))
+            updates.append(info["images_updated"])
+            assert "observation.images.free" in obs
+
+        assert updates == [False, False, True, False, False, True]
+        assert renderer.render.call_count == 3
+
+
+    def test_sim_time_restarts_on_reset(self, mock_mujoco_renderer):
+        env = GenericMujocoEnv(model_xml=SIMPLE_MJCF, control_dt=0.02, physics_dt=0.002, use_model_cache=False)
+        assert env.step_dt == pytest.approx(0.02)
+        env.reset()
+        for _ in range(3):
+            env.step(np.zeros(env.action_space.shape))
+        assert env.sim_time == pytest.approx(0.06)
+        env.reset()
+        assert env.sim_time == 0.0
+
+    def test_reconfigure_cameras_in_place(self, mock_mujoco_renderer):
+        cameras = [CameraSpec(name="front", pos=[1, 0, 1], width=64, height=64),
+                   CameraSpec(name="side", pos=[0, 1, 1], width=64, height=64)]
+        env = GenericMujocoEnv(model_xml=SIMPLE_MJCF, cameras=cameras, use_model_cache=False)
+        env.reset()
+        model = env.model
+        side_space = env.observation_space["observation.images.side"]
+
+        changed = env.reconfigure(cameras=[
+            CameraSpec(name="front", pos=[2, 0, 1], euler=[0, 90, 0], fovy=60, width=96, height=72),
+            CameraSpec(name="side", pos=[0, 1, 1], width=64, height=64),
+        ])
+
+        assert env.model is model  # not recompiled
+        np.testing.assert_allclose(model.cam_pos[env._camera_ids[0]], [2, 0, 1])
+        np.testing.assert_allclose(env.data.cam_xpos[env._camera_ids[0]], [2, 0, 1])
+        assert model.cam_fovy[env._camera_ids[0]] == 60
+        assert changed == {"observation.images.front"}
+        assert env.observation_space["observation.images.front"].shape == (72, 96, 3)
+        assert env.observation_space["observation.images.side"] is side_space
+        obs, *_ = env.step(np.zeros(1))
+        assert obs["observation.images.front"].shape == (72, 96, 3)
+
+        with pytest.raises(ValueError, match="reload"):
+            env.reconfigure(cameras=[CameraSpec(name="top")])
+
+    def test_reconfigure_timing_and_home(self, mock_mujoco_renderer):
+        env = GenericMujocoEnv(model_xml=SIMPLE_MJCF, image_obs=False, use_model_cache=False)
+        assert env.reconfigure(control_dt=0.05, physics_dt=0.005, home_position=np.array([0.3])) == set()
+        assert env.model.opt.timestep == 0.005
+        assert env.step_dt == pytest.approx(0.05)
+        obs, _ = env.reset()
+        assert obs["observation.state"][0] == pytest.approx(0.3)
+        with pytest.raises(ValueError, match="home_position"):
+            env.reconfigure(home_position=np.zeros(0))
+
+    def test_reconfigure_control_dt_keeps_render_fps(self, mock_mujoco_renderer):
+        env = GenericMujocoEnv(model_xml=SIMPLE_MJCF, control_dt=0.02, render_fps=25, use_model_cache=False)
+        env.reset()
+        assert [env.step(np.zeros(1))[4]["images_updated"] for _ in range(4)] == [False, True] * 2
+
+        # 25 fps at the new 0.01 s control step is every 4th step.
+        env.reconfigure(control_dt=0.01)
+        env.reset()
+        updates = [env.step(np.zeros(1))[4]["images_updated"] for _ in range(8)]
+        assert updates == [False, False, False, True] * 2
+
+
+    def test_rewind_and_branch(self, mock_mujoco_renderer):
+        env = GenericMujocoEnv(model_xml=SIMPLE_MJCF, image_obs=False, snapshot_capacity=10, use_model_cache=False)
+        env.reset()
+        actions = [np.array([0.5])] * 3 + [np.array([-1.0])] * 3
+        states = [env.step(a)[0]["observation.state"] for a in actions]
+
+        obs = env.rewind(3)
+        np.testing.assert_array_equal(obs["observation.state"], states[2])
+        assert env.sim_time == pytest.approx(3 * env.step_dt)
+        replayed = [env.step(a)[0]["observation.state"] for a in actions[3:]]
+        np.testing.assert_array_equal(replayed, states[3:])
+
+        with pytest.raises(ValueError):
+            env.rewind(len(env.snapshots))
+
+    def test_reset_to_state(self, mock_mujoco_renderer):
+        env = GenericMujocoEnv(model_xml=SIMPLE_MJCF, image_obs=False, use_model_cache=False)
+        env.reset()
+        env.step(np.array([1.0]))
+        state = env.get_state()
+        expected = env.step(np.array([1.0]))[0]["observation.state"]
+
+        env.reset()
+        env.reset(options={"state": state})
+        assert env.sim_time == pytest.approx(env.step_dt)
+        np.testing.assert_array_equal(env.step(np.array([1.0]))[0]["observation.state"], expected)
+
+
+    def test_randomized_reset_is_seeded(self, mock_mujoco_renderer):
+        def first_positions(seed):
+            env = GenericMujocoEnv(
+                model_xml=SIMPLE_MJCF, image_obs=False, use_model_cache=False,
+                home_position=np.array([1.0]), reset_distribution=ResetDistribution(joint_noise=0.2, batch_size=4),
+            )
+            obs, _ = env.reset(seed=seed)
+            positions = [obs["observation.state"][0]]
+            positions += [env.reset()[0]["observation.state"][0] for _ in range(5)]
+            return positions
+
+        positions = first_positions(seed=3)
+        assert positions == first_positions(seed=3)
+        assert positions != first_positions(seed=4)
+        assert len(set(positions)) == 6
+        assert all(0.8 <= p <= 1.2 for p in positions)
+
+
+    def test_state_uses_dof_addresses_after_free_joint(self, mock_mujoco_renderer):
+        mjcf = SIMPLE_MJCF.replace("<worldbody>", """<worldbody>
+    <body name="cube" pos="1 0 0.1"><freejoint/><geom type="box" size="0.02 0.02 0.02"/></body>""")
+        env = GenericMujocoEnv(model_xml=mjcf, image_obs=False, use_model_cache=False)
+        env.reset()
+        env.data.qpos[7] = 0.25     # joint1: qpos address 7, dof address 6
+        env.data.qvel[6] = -0.5
+        np.testing.assert_allclose(env.get_robot_state(), [0.25, -0.5])
+
+    def test_reused_state_buffer(self, mock_mujoco_renderer):
+        env = GenericMujocoEnv(model_xml=SIMPLE_MJCF, image_obs=False, reuse_obs_buffers=True)
+        first, _ = env.reset()
+        second, *_ = env.step(np.array([1.0]))
+        assert second is first
+        assert second["observation.state"] is env._state_buffer
+        assert second["observation.state"].dtype == np.float32
+
+        copied = GenericMujocoEnv(model_xml=SIMPLE_MJCF, image_obs=False)
+        state = copied.reset()[0]["observation.state"]
+        assert copied.step(np.array([1.0]))[0]["observation.state"] is not state
+
+
+    def test_model_cache_tracks_assets_of_inline_xml(self, tmp_path, monkeypatch, mock_mujoco_renderer):
+        import mujoco_model_cache
+
+        monkeypatch.setenv(mujoco_model_cache.CACHE_DIR_ENV, str(tmp_path / "cache"))
+        monkeypatch.chdir(tmp_path)
+        mujoco_model_cache.clear_memory_cache()
+        part = tmp_path / "part.xml"
+        xml = '<mujoco><worldbody><body><joint name="a"/><geom size="0.1"/></body></worldbody>' \
+              '<include file="part.xml"/></mujoco>'
+        try:
+            part.write_text('<mujoco><worldbody><body><geom size="0.1"/></body></worldbody></mujoco>')
+            assert GenericMujocoEnv(model_xml=xml, image_obs=False).model.njnt == 1
+            part.write_text('<mujoco><worldbody><body><joint name="b"/><geom size="0.1"/></body></worldbody></mujoco>')
+            assert GenericMujocoEnv(model_xml=xml, image_obs=False).model.njnt == 2
+        finally:
+            mujoco_model_cache.clear_memory_cache()
+
+
+class TestVectorGenericMujocoEnv:
+
+    def test_batched_shapes(self, mock_mujoco_renderer):
+        envs = VectorGenericMujocoEnv(num_envs=3, model_xml=SIMPLE_MJCF)
+        obs, _ = envs.reset(seed=0)
+
+        assert obs["observation.state"].shape == (3, 2)
+        assert obs["observation.images.free"].shape == (3, 128, 128, 3)
+        assert envs.action_space.shape == (3, 1)
+
+        obs, rewards, terminated, truncated, _ = envs.step(np.zeros((3, 1)))
+        assert obs["observation.state"].shape == (3, 2)
+        assert rewards.shape == terminated.shape == truncated.shape == (3,)
+
+    def test_instances_step_independently(self, mock_mujoco_renderer):
+        envs = VectorGenericMujocoEnv(num_envs=2, num_threads=2, model_xml=SIMPLE_MJCF, image_obs=False)
+        envs.reset()
+        for _ in range(5):
+            obs, *_ = envs.step(np.array([[1.0], [0.0]]))
+
+        # Only the first instance was driven by its motor.
+        assert obs["observation.state"][0, 1] != 0.0
+        assert obs["observation.state"][1, 1] == 0.0
+        assert envs.datas[0] is not envs.datas[1]
+        envs.close()
@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from lerobot.datasets.dataset_metadata import LeRobotDatasetMetadata
+
+# ---------------------------------------------------------------------------
+# Episode -> frame range lookup for recorded datasets
+# ---------------------------------------------------------------------------
+#
+# The dataset's episode metadata already records where every episode lives
+# (data file plus [dataset_from_index, dataset_to_index) global frame range),
+# so replay can read just that slice of one parquet file instead of loading
+# the dataset and scanning it row by row.
+
+
+@dataclass(frozen=True)
+class EpisodeRange:
+    """Global frame range of one episode and the data file holding it."""
+    episode_index: int
+    from_index: int     # inclusive
+    to_index: int       # exclusive
+    data_path: Path
+
+    @property
+    def length(self) -> int:
+        return self.to_index - self.from_index
+
+
+class EpisodeIndex:
+    """Looks up episode frame ranges from dataset metadata and loads columns by episode."""
+
+    def __init__(self, meta: LeRobotDatasetMetadata):
+        self.meta = meta
+        self._by_episode: dict[int, int] | None = None
+
+    def _row(self, episode: int) -> dict:
+        episodes = self.meta.episodes
+        # Episodes are stored in order, so row i normally is episode i.
+        if 0 <= episode < len(episodes):
+            row = episodes[episode]
+            if row["episode_index"] == episode:
+                return row
+        if self._by_episode is None:
+            self._by_episode = {int(ep): i for i, ep in enumerate(episodes["episode_index"])}
+        if episode not in self._by_episode:
+            raise KeyError(f"Episode {episode} not found (dataset has {self.meta.total_episodes} episodes)")
+        return episodes[self._by_episode[episode]]
+
+    def __getitem__(self, episode: int) -> EpisodeRange:
+        row = self._row(episode)
+        return EpisodeRange(
+            episode_index=episode,
+            from_index=int(row["dataset_from_index"]),
+            to_index=int(row["dataset_to_index"]),
+            data_path=Path(self.meta.root) / self.meta.get_data_file_path(episode),
+        )
+
+    def load_column(self, episode: int, key: str) -> np.ndarray:
+        """The episode's values of ``key`` as one contiguous (length, *shape) array."""
+        span = self[episode]
+        table = pq.read_table(
+            span.data_path,
+            columns=[key, "index"],
+            filters=[("index", ">=", span.from_index), ("index", "<", span.to_index)],
+        )
+        if table.num_rows != span.length:
+            raise ValueError(
+                f"Episode {episode}: expected {span.length} frames in {span.data_path}, found {table.num_rows}"
+            )
+        index = table.column("index").to_numpy()
+        values = _column_to_numpy(table.column(key))
+        if np.any(np.diff(index) < 0):
+            values = values[np.argsort(index, kind="stable")]
+        return values
+
+
+def _column_to_numpy(column: pa.ChunkedArray) -> np.ndarray:
+    array = column.combine_chunks()
+    shape: list[int] = []
+    while pa.types.is_fixed_size_list(array.type):
+        shape.append(array.type.list_size)
+        array = array.flatten()
+    return array.to_numpy(zero_copy_only=False).reshape(len(column), *shape)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from lerobot.datasets.dataset_metadata import LeRobotDatasetMetadata
+from lerobot.datasets.lerobot_dataset import LeRobotDataset
+
+from episode_index import EpisodeIndex
+
+EPISODE_LENGTHS = [4, 5, 3]
+
+
+@pytest.fixture
+def dataset_root(tmp_path):
+    root = tmp_path / "dataset"
+    dataset = LeRobotDataset.create(
+        "test/episode_index",
+        fps=10,
+        root=root,
+        features={"action": {"dtype": "float32", "shape": (2,), "names": None}},
+        use_videos=False,
+    )
+    for episode, length in enumerate(EPISODE_LENGTHS):
+        for i in range(length):
+            dataset.add_frame({"action": np.array([episode, i], dtype=np.float32), "task": "replay"})
+        dataset.save_episode()
+    dataset.finalize()
+    return root
+
+
+class TestEpisodeIndex:
+
+    def test_ranges_follow_metadata(self, dataset_root):
+        index = EpisodeIndex(LeRobotDatasetMetadata("test/episode_index", root=dataset_root))
+        span = index[1]
+        assert (span.from_index, span.to_index, span.length) == (4, 9, 5)
+        assert span.data_path.is_file()
+        with pytest.raises(KeyError):
+            index[3]
+
+    def test_load_column_reads_only_the_episode(self, dataset_root):
+        index = EpisodeIndex(LeRobotDatasetMetadata("test/episode_index", root=dataset_root))
+        actions = index.load_column(2, "action")
+        assert actions.shape == (3, 2)
+        assert actions.dtype == np.float32
+        np.testing.assert_array_equal(actions, [[2, 0], [2, 1], [2, 2]])
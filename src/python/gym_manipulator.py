@@ -18,16 +18,16 @@
 
 import logging
 import time
-import socket
 import json
 import traceback
 import sys
 import os
 import ctypes.util
+from concurrent.futures import Future, ThreadPoolExecutor
 import shutil
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable
 
 # Detect if hardware acceleration is available (EGL) or not (OSMesa)
 if ctypes.util.find_library("EGL"):
@@ -38,18 +38,11 @@ else:
 import gymnasium as gym
 import numpy as np
 import torch
-import mujoco
 import re
-import tempfile
-import xml.etree.ElementTree as ET
-from dataclasses import dataclass, field
-from typing import Any
 
-from lerobot.cameras import opencv  # noqa: F401
+import draccus
 from lerobot.configs import parser
-from lerobot.datasets.lerobot_dataset import LeRobotDataset
 from lerobot.envs.configs import EnvConfig, HILSerlRobotEnvConfig
-from lerobot.model.kinematics import RobotKinematics
 from lerobot.processor import (
     AddBatchDimensionProcessorStep,
     AddTeleopActionAsComplimentaryDataStep,
@@ -73,40 +66,24 @@ from lerobot.processor import (
     create_transition,
 )
 from lerobot.processor.converters import identity_transition
-from lerobot.robots import (  # noqa: F401
-    RobotConfig,
-    make_robot_from_config,
-    so_follower,
-)
 from lerobot.robots.robot import Robot
-from lerobot.robots.so_follower.robot_kinematic_processor import (
-    EEBoundsAndSafety,
-    EEReferenceAndDelta,
-    ForwardKinematicsJointsToEEObservation,
-    GripperVelocityToJoint,
-    InverseKinematicsRLStep,
-)
-from lerobot.teleoperators import (
-    gamepad,  # noqa: F401
-    keyboard,  # noqa: F401
-    make_teleoperator_from_config,
-    so_leader,  # noqa: F401
-)
 from lerobot.teleoperators.teleoperator import Teleoperator
 from lerobot.teleoperators.utils import TeleopEvents
-from lerobot.teleoperators.keyboard.configuration_keyboard import KeyboardTeleopConfig
-from lerobot.teleoperators.gamepad.configuration_gamepad import GamepadTeleopConfig
 from lerobot.utils.constants import ACTION, DONE, OBS_IMAGES, OBS_STATE, REWARD
-from lerobot.utils.robot_utils import precise_sleep
 from lerobot.utils.utils import log_say
 
-from lerobot.rl.joint_observations_processor import JointVelocityProcessorStep, MotorCurrentProcessorStep
-
-import socketio
 import asyncio
-from aiohttp import web
-import base64
-import cv2
+
+from camera_capture import CameraCapture
+from loop_timing import LoopTimer, RateScheduler, RollingHistogram, timed
+from recording import AsyncDatasetWriter, EpisodeFrameAssembler
+from sim_server import StartupProfile, preview_encoder, send_command, serve, sio
+
+# Modules only some code paths need (datasets for record/replay, robot and
+# teleop drivers, kinematics) are imported where they are used, so a
+# custom_mujoco session does not pay for them at startup.
+if TYPE_CHECKING:
+    from lerobot.datasets.lerobot_dataset import LeRobotDataset
 
 
 # ---------------------------------------------------------------------------
@@ -114,30 +91,14 @@ import cv2
 # ---------------------------------------------------------------------------
 
 from custom_mujoco_env import (
-    CameraSpec,
-    CustomMujocoProcessorConfig,
     CustomMujocoEnvConfig,
     GenericMujocoEnv,
+    VectorGenericMujocoEnv,
+    camera_specs,
+    generic_mujoco_env_kwargs,
 )
 
 
-# ---------------------------------------------------------------------------
-# Socket.IO server setup
-# ---------------------------------------------------------------------------
-
-# Initialize the Socket.IO server
-sio = socketio.AsyncServer(async_mode='aiohttp', cors_allowed_origins='*')
-app = web.Application()
-sio.attach(app)
-
-@sio.event
-def connect(sid, environ):
-    logging.info(f"Client connected: {sid}")
-
-@sio.event
-def disconnect(sid):
-    logging.info(f"Client disconnected: {sid}")
-
 logging.basicConfig(level=logging.INFO)
 
 @dataclass
@@ -149,17 +110,61 @@ class DatasetConfig:
     root: str | None = None
     num_episodes_to_record: int = 5
     replay_episode: int | None = None
+    replay_episodes: list[int] | None = None  # replay several episodes in order; overrides replay_episode
+    replay_as_fast_as_possible: bool = False  # simulation only: step without pacing to env fps
     push_to_hub: bool = False
 
 
+@EnvConfig.register_subclass("real_robot")
+@dataclass
+class RealRobotEnvConfig(HILSerlRobotEnvConfig):
+    """Real robot environment (``gym_manipulator``) with this app's hardware I/O options."""
+
+    # Read the next step's observation while this step is processed and paced;
+    # step() then returns the observation taken right after the previous action.
+    pipeline_io: bool = False
+    # Capture camera frames on background threads; observations take the latest
+    # frame without waiting and step info reports each frame's age.
+    async_cameras: bool = False
+
+
 @dataclass
 class GymManipulatorConfig:
     """Main configuration for gym manipulator environment."""
 
     env: EnvConfig
     dataset: DatasetConfig
-    mode: str | None = None  # Either "record", "replay", None
+    mode: str | None = None  # Either "record", "replay", "benchmark", None
+    headless: bool = False  # simulation only: no web server, no preview, no wall-clock pacing
     device: str = "cpu"
+    loop_stats_interval_s: float = 1.0  # how often control-loop timing is published; 0 disables
+    pacing_policy: str = "skip"  # after an overrun: "skip" missed ticks or "catch_up" on them
+    pacing_spin_s: float = 0.0  # busy-wait this long before each deadline for sub-ms accuracy
+
+
+def is_headless(cfg: GymManipulatorConfig) -> bool:
+    """Benchmark runs are always headless."""
+    return cfg.headless or cfg.mode == "benchmark"
+
+
+def _headless_episode_steps(env: gym.Env, cfg: GymManipulatorConfig) -> int:
+    """Steps per episode for headless runs, from control_time_s in simulated time.
+
+    Headless runs step a simulated env with no wall clock, so recorded
+    timestamps (frame_index / fps) only match simulated time when one env
+    step advances the simulation by exactly 1 / fps.
+    """
+    sim = env.unwrapped
+    if not hasattr(sim, "step_dt"):
+        raise ValueError("Headless mode needs a simulated environment (env.type=custom_mujoco)")
+    if cfg.mode == "record" and abs(sim.step_dt * cfg.env.fps - 1.0) > 1e-6:
+        raise ValueError(
+            f"Headless recording needs one env step per frame: the env advances {sim.step_dt:.4f}s per step "
+            f"but env.fps={cfg.env.fps}; set control_dt to 1/fps"
+        )
+    reset_cfg = getattr(getattr(cfg.env, "processor", None), "reset", None)
+    control_time_s = reset_cfg.control_time_s if reset_cfg is not None else 15.0
+    return max(1, round(control_time_s / sim.step_dt))
 
 
 async def reset_follower_position(robot_arm: Robot, target_position: np.ndarray) -> None:
@@ -178,7 +183,16 @@ async def reset_follower_position(robot_arm: Robot, target_position: np.ndarray)
 
 
 class RobotEnv(gym.Env):
-    """Gym environment for robotic control with human intervention support."""
+    """Gym environment for robotic control with human intervention support.
+
+    Blocking hardware I/O (motor bus writes, bus and camera reads) runs on a
+    single dedicated thread so it never stalls the Socket.IO event loop; the
+    one thread also keeps bus access serialized.  With ``pipeline_io`` the
+    read for the next step is issued right after this step's write and runs
+    while the control loop processes and paces the step, at the cost of
+    ``step`` returning the observation captured just after the previous
+    action was sent.
+    """
 
     def __init__(
         self,
@@ -187,6 +201,8 @@ class RobotEnv(gym.Env):
         display_cameras: bool = False,
         reset_pose: list[float] | None = None,
         reset_time_s: float = 5.0,
+        pipeline_io: bool = False,
+        async_cameras: bool = False,
     ) -> None:
         """Initialize robot environment with configuration options.
 
@@ -196,11 +212,21 @@ class RobotEnv(gym.Env):
             display_cameras: Whether to show camera feeds during execution.
             reset_pose: Joint positions for environment reset.
             reset_time_s: Time to wait during reset.
+            pipeline_io: Overlap the next step's observation read with this step's processing.
+            async_cameras: Capture camera frames on background threads; observations take
+                the latest frame without waiting and step info reports each frame's age.
         """
         super().__init__()
 
         self.robot = robot
         self.display_cameras = display_cameras
+        self.pipeline_io = pipeline_io
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="robot-io")
+        self._pending_observation: Future | None = None
+        self._pending_write: Future | None = None
+        self._io_latency = {"send_action": RollingHistogram(), "get_observation": RollingHistogram()}
+        self._camera_capture: CameraCapture | None = None
+        self._frame_ages: dict[str, float] = {}
 
         # Connect to the robot if not already connected.
         if not self.robot.is_connected:
@@ -221,11 +247,25 @@ class RobotEnv(gym.Env):
         self._joint_names = list(self.robot.bus.motors.keys())
         self._raw_joint_positions = None
 
+        if async_cameras and self.robot.cameras:
+            self._camera_capture = CameraCapture(self.robot.cameras)
+            if not self._camera_capture.wait_for_first_frames():
+                # Observations need a frame from every camera, so fail now rather than on the first step.
+                missing = self._camera_capture.cameras_without_frames()
+                self.close()
+                raise RuntimeError(f"No frame from camera(s) {', '.join(missing)} before the startup timeout")
+
         self._setup_spaces()
 
     def _get_observation(self) -> RobotObservation:
         """Get current robot observation including joint positions and camera images."""
-        obs_dict = self.robot.get_observation()
+        if self._camera_capture is not None:
+            # Only the bus is read here; frames come from the capture threads' latest slots.
+            positions = self.robot.bus.sync_read("Present_Position")
+            frames, self._frame_ages = self._camera_capture.latest()
+            obs_dict = {**{f"{motor}.pos": value for motor, value in positions.items()}, **frames}
+        else:
+            obs_dict = self.robot.get_observation()
         raw_joint_joint_position = {f"{name}.pos": obs_dict[f"{name}.pos"] for name in self._joint_names}
         joint_positions = np.array([raw_joint_joint_position[f"{name}.pos"] for name in self._joint_names])
 
@@ -233,6 +273,29 @@ class RobotEnv(gym.Env):
 
         return {"agent_pos": joint_positions, "pixels": images, **raw_joint_joint_position}
 
+    # ---- hardware I/O thread ----
+
+    def _timed_io(self, name: str, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self._io_latency[name].add(time.perf_counter() - start)
+
+    def _submit_io(self, name: str, fn, *args) -> Future:
+        return self._io_executor.submit(self._timed_io, name, fn, *args)
+
+    async def _read_observation(self) -> RobotObservation:
+        """Read an observation on the I/O thread, or collect the one prefetched by the last step."""
+        future, self._pending_observation = self._pending_observation, None
+        if future is None:
+            future = self._submit_io("get_observation", self._get_observation)
+        return await asyncio.wrap_future(future)
+
+    def io_latency_stats(self) -> dict[str, dict[str, float]]:
+        """p50/p95/p99/max of the blocking hardware calls, in ms."""
+        return {name: histogram.summary() for name, histogram in self._io_latency.items()}
+
     def _setup_spaces(self) -> None:
         """Configure observation and action spaces based on robot capabilities."""
         current_observation = self._get_observation()
@@ -307,7 +370,11 @@ class RobotEnv(gym.Env):
         # Reset episode tracking variables.
         self.current_step = 0
         self.episode_data = None
-        obs = self._get_observation()
+        if self._pending_observation is not None:
+            # A prefetched read from the last episode predates the reset motion.
+            await asyncio.wrap_future(self._pending_observation)
+            self._pending_observation = None
+        obs = await self._read_observation()
         self._raw_joint_positions = {f"{key}.pos": obs[f"{key}.pos"] for key in self._joint_names}
         return obs, {TeleopEvents.IS_INTERVENTION: False}
 
@@ -316,50 +383,65 @@ class RobotEnv(gym.Env):
         logging.info(f"Received action: {action}")
         joint_targets_dict = {f"{key}.pos": action[i] for i, key in enumerate(self.robot.bus.motors.keys())}
 
-        self.robot.send_action(joint_targets_dict)
-
-        obs = self._get_observation()
+        if self.pipeline_io:
+            obs = await self._read_observation()
+            frame_ages = dict(self._frame_ages)
+            if self._pending_write is not None:
+                # Already finished (it ran before the read); surfaces a failed write.
+                self._pending_write.result()
+            # Queued behind each other on the I/O thread: write this action, then
+            # capture the observation the next step will return.
+            self._pending_write = self._submit_io("send_action", self.robot.send_action, joint_targets_dict)
+            self._pending_observation = self._submit_io("get_observation", self._get_observation)
+        else:
+            await asyncio.wrap_future(self._submit_io("send_action", self.robot.send_action, joint_targets_dict))
+            obs = await self._read_observation()
+            frame_ages = dict(self._frame_ages)
 
         self._raw_joint_positions = {f"{key}.pos": obs[f"{key}.pos"] for key in self._joint_names}
 
-        if self.display_cameras:
-            await self.render()
+        if self.display_cameras and preview_encoder.enabled:
+            await self.render(obs)
 
         self.current_step += 1
 
         reward = 0.0
         terminated = False
         truncated = False
+        info = {TeleopEvents.IS_INTERVENTION: False}
+        if self._camera_capture is not None:
+            # Seconds between each camera's capture and this observation being assembled.
+            info["frame_age_s"] = frame_ages
 
         return (
             obs,
             reward,
             terminated,
             truncated,
-            {TeleopEvents.IS_INTERVENTION: False},
+            info,
         )
 
-    async def render(self) -> None:
-        """Display robot camera feeds via Socket.IO."""
-        current_observation = self._get_observation()
-        logging.info("Rendering camera feeds...")
-        logging.info(f"Current observation keys: {list(current_observation.keys())}")
-        if current_observation is not None:
-            image_keys = [key for key in current_observation if "image" in key]
-
-            for key in image_keys:
-                frame_bgr = cv2.cvtColor(current_observation[key].numpy(), cv2.COLOR_RGB2BGR)
-                _, buffer = cv2.imencode('.jpg', frame_bgr)
-                jpg_as_text = base64.b64encode(buffer).decode('utf-8')
-                
-                # Emit the frame
-                await sio.emit('video_frame', {'image': jpg_as_text, 'camera_name': key})
-            
-            # Yield to asyncio loop
-            await sio.sleep(0)
+    async def render(self, observation: RobotObservation | None = None) -> None:
+        """Display robot camera feeds via Socket.IO.
+
+        Pass the observation the step already captured; reading a fresh one
+        here would double the camera and bus I/O of every step.
+        """
+        if observation is None:
+            observation = await self._read_observation()
+        images = {f"{OBS_IMAGES}.{key}": image for key, image in observation.get("pixels", {}).items()}
+        if images:
+            preview_encoder.submit(self.current_step, images)
+
+        # Yield to asyncio loop
+        await sio.sleep(0)
 
     def close(self) -> None:
         """Close environment and disconnect robot."""
+        # Let in-flight bus traffic finish and stop the capture threads before disconnecting.
+        self._io_executor.shutdown(wait=True)
+        if self._camera_capture is not None:
+            self._camera_capture.close()
         if self.robot.is_connected:
             self.robot.disconnect()
 
@@ -386,7 +468,23 @@ class AsyncGymWrapper(gym.Wrapper):
         return {}
 
 
+class AsyncVectorGymWrapper(gym.vector.VectorWrapper):
+    """Async interface for batched environments such as VectorGenericMujocoEnv."""
+
+    async def reset(self, **kwargs):
+        return self.env.reset(**kwargs)
+
+    async def step(self, actions):
+        return self.env.step(actions)
+
+    def get_raw_joint_positions(self) -> dict[str, float]:
+        return {}
+
+
 def _get_action_space_dim(env: gym.Env) -> int:
+    single_action_space = getattr(env, "single_action_space", None)
+    if single_action_space is not None and single_action_space.shape is not None:
+        return int(single_action_space.shape[0])
     if hasattr(env, "action_space") and hasattr(env.action_space, "shape") and env.action_space.shape is not None:
         return int(env.action_space.shape[0])
     if (
@@ -508,6 +606,38 @@ def _features_compatible(existing: dict[str, Any], desired: dict[str, Any]) -> t
     return True, ""
 
 
+def _recording_features(
+    observation_shapes: dict[str, tuple[int, ...]], action_features: dict[str, Any], use_gripper: bool
+) -> dict[str, Any]:
+    """Dataset features for a recording: action, reward, done, state and camera images."""
+    features = {
+        ACTION: action_features,
+        REWARD: {"dtype": "float32", "shape": (1,), "names": None},
+        DONE: {"dtype": "bool", "shape": (1,), "names": None},
+    }
+    if use_gripper:
+        features["complementary_info.discrete_penalty"] = {
+            "dtype": "float32",
+            "shape": (1,),
+            "names": ["discrete_penalty"],
+        }
+
+    for key, shape in observation_shapes.items():
+        if key == OBS_STATE:
+            features[key] = {
+                "dtype": "float32",
+                "shape": shape,
+                "names": None,
+            }
+        if "image" in key:
+            features[key] = {
+                "dtype": "video",
+                "shape": shape,
+                "names": ["channels", "height", "width"],
+            }
+    return features
+
+
 def _sanitize_dataset_name(repo_id: str) -> str:
     name = repo_id.split("/")[-1].strip()
     if not name:
@@ -559,7 +689,9 @@ def _has_valid_local_dataset(dataset_dir: Path) -> bool:
     return all(path.exists() for path in required_files)
 
 
-def _init_record_dataset(cfg: GymManipulatorConfig, features: dict[str, Any]) -> LeRobotDataset:
+def _init_record_dataset(cfg: GymManipulatorConfig, features: dict[str, Any]) -> "LeRobotDataset":
+    from lerobot.datasets.lerobot_dataset import LeRobotDataset
+
     local_repo_id, local_root, dataset_dir = _resolve_local_dataset_storage(cfg)
 
     if dataset_dir.exists() and not _has_valid_local_dataset(dataset_dir):
@@ -613,48 +745,21 @@ def make_robot_env(cfg: EnvConfig) -> tuple[gym.Env, Any]:
     if cfg.type == "custom_mujoco":
         assert isinstance(cfg, CustomMujocoEnvConfig)
         
-        camera_specs = []
-        if cfg.cameras:
-            for i, c in enumerate(cfg.cameras):
-                # Helper to get attribute or dict item
-                def get_val(obj, key, default=None):
-                    if isinstance(obj, dict):
-                        return obj.get(key, default)
-                    return getattr(obj, key, default)
-
-                camera_specs.append(
-                    CameraSpec(
-                        name=get_val(c, "name", f"cam_{i}"),
-                        pos=get_val(c, "pos", None),
-                        quat=get_val(c, "quat", None),
-                        axis=get_val(c, "axis", None),
-                        target=get_val(c, "target", None),
-                        xyaxes=get_val(c, "xyaxes", None),
-                        zaxis=get_val(c, "zaxis", None),
-                        euler=get_val(c, "euler", None),
-                        fovy=get_val(c, "fovy", None),
-                        width=get_val(c, "width", 128),
-                        height=get_val(c, "height", 128),
-                    )
-                )
+        if cfg.num_workers > 0:
+            from mujoco_env_pool import MujocoEnvPool
 
-        env = GenericMujocoEnv(
-            model_xml=cfg.model_xml,
-            model_path=cfg.model_path,
-            scene_xml_path=cfg.scene_xml_path,
-            robot_xml_path=cfg.robot_xml_path,
-            model_format=cfg.model_format,
-            cameras=camera_specs,
-            seed=cfg.seed,
-            control_dt=cfg.control_dt,
-            physics_dt=cfg.physics_dt,
-            render_spec_height=camera_specs[0].height if camera_specs else 128,
-            render_spec_width=camera_specs[0].width if camera_specs else 128,
-            render_mode=cfg.render_mode,
-            image_obs=cfg.image_obs,
-            home_position=np.array(cfg.home_position) if cfg.home_position else None,
-            cartesian_bounds=np.array(cfg.cartesian_bounds) if cfg.cartesian_bounds else None,
-        )
+            return AsyncVectorGymWrapper(MujocoEnvPool(cfg, num_workers=cfg.num_workers)), None
+
+        if cfg.num_envs > 1:
+            env = VectorGenericMujocoEnv(
+                num_envs=cfg.num_envs,
+                num_threads=cfg.num_threads,
+                **generic_mujoco_env_kwargs(cfg),
+            )
+            # Batched rollouts are driven programmatically, not by a teleoperator.
+            return AsyncVectorGymWrapper(env), None
+
+        env = GenericMujocoEnv(**generic_mujoco_env_kwargs(cfg))
         env = AsyncGymWrapper(env)
 
         # Initialize teleoperator if control mode is set
@@ -663,11 +768,17 @@ def make_robot_env(cfg: EnvConfig) -> tuple[gym.Env, Any]:
         if cfg.processor and cfg.processor.control_mode:
             control_mode = cfg.processor.control_mode
             if control_mode == "keyboard":
+                from lerobot.teleoperators import keyboard
+
                 teleop_config = keyboard.KeyboardTeleopConfig()
             elif control_mode == "gamepad":
+                from lerobot.teleoperators import gamepad
+
                 teleop_config = gamepad.GamepadTeleopConfig()
 
         if teleop_config:
+            from lerobot.teleoperators import make_teleoperator_from_config
+
             teleop = make_teleoperator_from_config(teleop_config)
             teleop.connect()
 
@@ -696,6 +807,8 @@ def make_robot_env(cfg: EnvConfig) -> tuple[gym.Env, Any]:
     # Real robot environment
     assert cfg.robot is not None, "Robot config must be provided for real robot environment"
     assert cfg.teleop is not None, "Teleop config must be provided for real robot environment"
+    from lerobot.robots import make_robot_from_config
+    from lerobot.teleoperators import make_teleoperator_from_config
 
     robot = make_robot_from_config(cfg.robot)
     teleop_device = make_teleoperator_from_config(cfg.teleop)
@@ -713,6 +826,8 @@ def make_robot_env(cfg: EnvConfig) -> tuple[gym.Env, Any]:
         use_gripper=use_gripper,
         display_cameras=display_cameras,
         reset_pose=reset_pose,
+        pipeline_io=isinstance(cfg, RealRobotEnvConfig) and cfg.pipeline_io,
+        async_cameras=isinstance(cfg, RealRobotEnvConfig) and cfg.async_cameras,
     )
 
     return env, teleop_device
@@ -788,6 +903,16 @@ def make_processors(
         )
 
     # Full processor pipeline for real robot environment
+    from lerobot.model.kinematics import RobotKinematics
+    from lerobot.rl.joint_observations_processor import JointVelocityProcessorStep, MotorCurrentProcessorStep
+    from lerobot.robots.so_follower.robot_kinematic_processor import (
+        EEBoundsAndSafety,
+        EEReferenceAndDelta,
+        ForwardKinematicsJointsToEEObservation,
+        GripperVelocityToJoint,
+        InverseKinematicsRLStep,
+    )
+
     # Get robot and motor information for kinematics
     motor_names = list(env.robot.bus.motors.keys())
 
@@ -902,47 +1027,20 @@ def make_processors(
     )
 
 
-async def emit_observation_frames(observation: dict) -> None:
+async def emit_observation_frames(observation: dict, step: int = 0) -> None:
     """Emit observation images to connected Socket.IO clients.
 
-    extracts image tensors from the observation dict, encodes them as JPEG,
-    and emits them as base64 via Socket.IO 'video_frame' events.
+    Hands the observation's image tensors to the preview encoder, which
+    JPEG-encodes them on worker threads and emits all cameras of the step as
+    one binary 'video_frames' message (see video_frames.py for the layout).
+    Never waits for encoding; stale frames are dropped instead of queued.
+    Does nothing while no client is connected.
     """
-    image_keys = [key for key in observation if "image" in key]
-    for key in image_keys:
-        value = observation[key]
-        img_np = None
-
-        if isinstance(value, torch.Tensor):
-            # Remove batch dimension if present and move to CPU
-            img = _remove_batch_dim(value).cpu()
-            # Handle CHW -> HWC conversion if needed
-            if img.dim() == 3 and img.shape[0] in (1, 3):
-                img = img.permute(1, 2, 0)
-            
-            img_np = img.numpy()
-        elif isinstance(value, np.ndarray):
-             img_np = value
-             if img_np.ndim == 4:
-                 img_np = img_np[0]
-             # Handle CHW -> HWC? Mujoco gives HWC.
-             if img_np.ndim == 3 and img_np.shape[0] in (1, 3): 
-                 img_np = np.transpose(img_np, (1, 2, 0))
-
-        if img_np is not None:
-            # Convert from float [0, 1] to uint8 [0, 255]
-            if np.issubdtype(img_np.dtype, np.floating) and img_np.max() <= 1.0:
-                img_np = (img_np * 255).clip(0, 255)
-            
-            img_np = img_np.astype(np.uint8)
-
-            # Convert RGB to BGR for cv2 JPEG encoding
-            if img_np.ndim == 3 and img_np.shape[-1] == 3:
-                img_np = cv2.cvtColor(img_np, cv2.COLOR_RGB2BGR)
-            _, buffer = cv2.imencode('.jpg', img_np)
-            jpg_as_text = base64.b64encode(buffer).decode('utf-8')
-            await sio.emit('video_frame', {'image': jpg_as_text, 'camera_name': key})
-    if image_keys:
+    if not preview_encoder.enabled:
+        return
+    images = {key: value for key, value in observation.items() if "image" in key}
+    if images:
+        preview_encoder.submit(step, images)
         await sio.sleep(0)
 
 
@@ -952,6 +1050,8 @@ async def step_env_and_process_transition(
     action: torch.Tensor,
     env_processor: DataProcessorPipeline[EnvTransition, EnvTransition],
     action_processor: DataProcessorPipeline[EnvTransition, EnvTransition],
+    timer: LoopTimer | None = None,
+    observation_tap: Callable[[dict[str, Any]], None] | None = None,
 ) -> EnvTransition:
     """
     Execute one step with processor pipeline.
@@ -962,6 +1062,8 @@ async def step_env_and_process_transition(
         action: Action to execute
         env_processor: Environment processor
         action_processor: Action processor
+        timer: Optional loop timer that records the per-phase durations
+        observation_tap: Optional callback receiving the raw env observation before the env processor
 
     Returns:
         Processed transition with updated state.
@@ -972,12 +1074,16 @@ async def step_env_and_process_transition(
     transition[TransitionKey.OBSERVATION] = (
         env.get_raw_joint_positions() if hasattr(env, "get_raw_joint_positions") else {}
     )
-    processed_action_transition = action_processor(transition)
-    processed_action = processed_action_transition[TransitionKey.ACTION]
-    if hasattr(env, "unwrapped") and isinstance(env.unwrapped, GenericMujocoEnv):
-        processed_action = _fit_action_to_env_space(processed_action, env)
+    with timed(timer, "action_processor"):
+        processed_action_transition = action_processor(transition)
+        processed_action = processed_action_transition[TransitionKey.ACTION]
+        if hasattr(env, "unwrapped") and isinstance(env.unwrapped, GenericMujocoEnv):
+            processed_action = _fit_action_to_env_space(processed_action, env)
 
-    obs, reward, terminated, truncated, info = await env.step(processed_action)
+    with timed(timer, "env_step"):
+        obs, reward, terminated, truncated, info = await env.step(processed_action)
+    if observation_tap is not None:
+        observation_tap(obs)
 
     reward = reward + processed_action_transition[TransitionKey.REWARD]
     terminated = terminated or processed_action_transition[TransitionKey.DONE]
@@ -995,11 +1101,20 @@ async def step_env_and_process_transition(
         info=new_info,
         complementary_data=complementary_data,
     )
-    new_transition = env_processor(new_transition)
+    with timed(timer, "env_processor"):
+        new_transition = env_processor(new_transition)
 
     return new_transition
 
 
+async def publish_loop_stats(timer: LoopTimer, kind: str = "loop-stats", **extra: Any) -> None:
+    """Send control-loop timing to Electron (stderr __CMD__) and to Socket.IO clients."""
+    stats = {**extra, **timer.snapshot()}
+    send_command({"type": kind, **stats})
+    if preview_encoder.enabled:
+        await sio.emit(kind.replace("-", "_"), stats)
+
+
 async def control_loop(
     env: gym.Env,
     env_processor: DataProcessorPipeline[EnvTransition, EnvTransition],
@@ -1017,9 +1132,16 @@ async def control_loop(
      teleop_device: Teleoperator device
      cfg: gym_manipulator configuration
     """
-    dt = 1.0 / cfg.env.fps
-
-    logging.info(f"Starting control loop at {cfg.env.fps} FPS")
+    scheduler = RateScheduler(cfg.env.fps, policy=cfg.pacing_policy, spin_s=cfg.pacing_spin_s)
+    # Headless runs step as fast as the simulation allows and end episodes on
+    # simulated time, since nothing else (teleop, success) ends them.
+    headless = is_headless(cfg)
+    max_episode_steps = _headless_episode_steps(env, cfg) if headless else None
+
+    if headless:
+        logging.info(f"Starting headless control loop ({max_episode_steps} steps per episode, unpaced)")
+    else:
+        logging.info(f"Starting control loop at {cfg.env.fps} FPS")
     logging.info("Controls:")
     logging.info("- Use gamepad/teleop device for intervention")
     logging.info("- When not intervening, robot will stay still")
@@ -1054,128 +1176,189 @@ async def control_loop(
                 )
                 action_features = _custom_mujoco_action_features(env)
 
-        features = {
-            ACTION: action_features,
-            REWARD: {"dtype": "float32", "shape": (1,), "names": None},
-            DONE: {"dtype": "bool", "shape": (1,), "names": None},
+        observation_shapes = {
+            key: tuple(_remove_batch_dim(value).shape) for key, value in transition[TransitionKey.OBSERVATION].items()
         }
-        if use_gripper:
-            features["complementary_info.discrete_penalty"] = {
-                "dtype": "float32",
-                "shape": (1,),
-                "names": ["discrete_penalty"],
-            }
+        features = _recording_features(observation_shapes, action_features, use_gripper)
+        dataset = _init_record_dataset(cfg, features)
 
-        for key, value in transition[TransitionKey.OBSERVATION].items():
-            value_unbatched = _remove_batch_dim(value)
-            if key == OBS_STATE:
-                features[key] = {
-                    "dtype": "float32",
-                    "shape": value_unbatched.shape,
-                    "names": None,
-                }
-            if "image" in key:
-                features[key] = {
-                    "dtype": "video",
-                    "shape": value_unbatched.shape,
-                    "names": ["channels", "height", "width"],
-                }
+    # Dataset writes and episode encoding run on a background thread.
+    writer = AsyncDatasetWriter(dataset) if dataset is not None else None
 
-        dataset = _init_record_dataset(cfg, features)
+    # Record straight from the raw env observation into preallocated columns
+    # when it already matches the recording schema (custom_mujoco does), which
+    # skips the batched-tensor round trip of the env processor output.
+    assembler = EpisodeFrameAssembler(features) if dataset is not None else None
+    observation_keys = [key for key in features if key == OBS_STATE or "image" in key] if dataset is not None else []
+    raw_observation: dict[str, Any] = {}
+
+    def tap_observation(observation: dict[str, Any]) -> None:
+        raw_observation.clear()
+        raw_observation.update(observation)
 
     episode_idx = 0
     episode_step = 0
+    total_steps = 0
     episode_start_time = time.perf_counter()
-
-    while episode_idx < cfg.dataset.num_episodes_to_record:
-        step_start_time = time.perf_counter()
-
-        # Create a neutral action (no movement)
-        # Assuming the environment (or wrapper) exposes action_space.
-        # This fixes a crash where rigid 3/4-DOF assumptions conflict with custom robots (e.g. 7-DOF).
-        action_dim = 4
-        if hasattr(env, "action_space") and hasattr(env.action_space, "shape"):
-            action_dim = env.action_space.shape[0]
-        elif hasattr(env, "unwrapped") and hasattr(env.unwrapped, "action_space") and hasattr(env.unwrapped.action_space, "shape"):
-            action_dim = env.unwrapped.action_space.shape[0]
+    run_start_time = episode_start_time
+    loop_timer = LoopTimer(cfg.env.fps)
+    last_stats_time = episode_start_time
+    io_latency_stats = getattr(env.unwrapped, "io_latency_stats", None)
+    scheduler.start()
+
+    try:
+        while episode_idx < cfg.dataset.num_episodes_to_record:
+            step_start_time = time.perf_counter()
+            loop_timer.step_started(step_start_time)
+
+            # Create a neutral action (no movement)
+            # Assuming the environment (or wrapper) exposes action_space.
+            # This fixes a crash where rigid 3/4-DOF assumptions conflict with custom robots (e.g. 7-DOF).
+            action_dim = 4
+            if hasattr(env, "action_space") and hasattr(env.action_space, "shape"):
+                action_dim = env.action_space.shape[0]
+            elif hasattr(env, "unwrapped") and hasattr(env.unwrapped, "action_space") and hasattr(env.unwrapped.action_space, "shape"):
+                action_dim = env.unwrapped.action_space.shape[0]
             
-        neutral_action = torch.zeros(action_dim, dtype=torch.float32)
-        # If strict gripper logic is needed for neutral matching, it should be derived from env metadata.
-        # effectively: if use_gripper and action_dim == 4: neutral_action[-1] = 1.0 (maybe?)
-        # For now, zeros are safer than a shape mismatch.
-
-        # Use the new step function
-        transition = await step_env_and_process_transition(
-            env=env,
-            transition=transition,
-            action=neutral_action,
-            env_processor=env_processor,
-            action_processor=action_processor,
-        )
-        terminated = transition.get(TransitionKey.DONE, False)
-        truncated = transition.get(TransitionKey.TRUNCATED, False)
-
-        if cfg.mode == "record":
-            observations: dict[str, Any] = {}
-            for key, value in transition[TransitionKey.OBSERVATION].items():
-                value_unbatched = _remove_batch_dim(value)
-                if isinstance(value_unbatched, (torch.Tensor, np.ndarray)):
-                    observations[key] = _to_torch_cpu(value_unbatched)
-            # For custom MuJoCo, always store actions in environment action-space dimensions.
-            if cfg.env.type == "custom_mujoco":
-                action_to_record = _fit_action_to_env_space(transition[TransitionKey.ACTION], env)
-            else:
-                action_to_record = transition[TransitionKey.COMPLEMENTARY_DATA].get(
-                    "teleop_action", transition[TransitionKey.ACTION]
-                )
-            frame = {
-                **observations,
-                ACTION: _to_torch_cpu_float32(action_to_record),
-                REWARD: np.array([transition[TransitionKey.REWARD]], dtype=np.float32),
-                DONE: np.array([terminated or truncated], dtype=bool),
-            }
-            if use_gripper:
-                discrete_penalty = transition[TransitionKey.COMPLEMENTARY_DATA].get("discrete_penalty", 0.0)
-                frame["complementary_info.discrete_penalty"] = np.array([discrete_penalty], dtype=np.float32)
-
-            if dataset is not None:
-                frame["task"] = cfg.dataset.task
-                dataset.add_frame(frame)
-
-        # Emit observation frames to connected Socket.IO clients
-        await emit_observation_frames(transition[TransitionKey.OBSERVATION])
-
-        episode_step += 1
-
-        # Handle episode termination
-        if terminated or truncated:
-            episode_time = time.perf_counter() - episode_start_time
-            logging.info(
-                f"Episode ended after {episode_step} steps in {episode_time:.1f}s with reward {transition[TransitionKey.REWARD]}"
+            neutral_action = torch.zeros(action_dim, dtype=torch.float32)
+            # If strict gripper logic is needed for neutral matching, it should be derived from env metadata.
+            # effectively: if use_gripper and action_dim == 4: neutral_action[-1] = 1.0 (maybe?)
+            # For now, zeros are safer than a shape mismatch.
+
+            # Use the new step function
+            transition = await step_env_and_process_transition(
+                env=env,
+                transition=transition,
+                action=neutral_action,
+                env_processor=env_processor,
+                action_processor=action_processor,
+                timer=loop_timer,
+                observation_tap=tap_observation if assembler is not None else None,
             )
-            episode_step = 0
-            episode_idx += 1
-
-            if dataset is not None:
-                if transition[TransitionKey.INFO].get(TeleopEvents.RERECORD_EPISODE, False):
-                    logging.info(f"Re-recording episode {episode_idx}")
-                    dataset.clear_episode_buffer()
-                    episode_idx -= 1
+            terminated = transition.get(TransitionKey.DONE, False)
+            truncated = transition.get(TransitionKey.TRUNCATED, False)
+            if max_episode_steps is not None and episode_step + 1 >= max_episode_steps:
+                truncated = True
+
+            if cfg.mode == "record" and dataset is not None:
+                record_start_time = time.perf_counter()
+                # For custom MuJoCo, always store actions in environment action-space dimensions.
+                if cfg.env.type == "custom_mujoco":
+                    action_to_record = _fit_action_to_env_space(transition[TransitionKey.ACTION], env)
                 else:
-                    logging.info(f"Saving episode {episode_idx}")
-                    dataset.save_episode()
-
-            # Reset for new episode
-            obs, info = await env.reset()
-            env_processor.reset()
-            action_processor.reset()
-
-            transition = create_transition(observation=obs, info=info)
-            transition = env_processor(transition)
+                    action_to_record = transition[TransitionKey.COMPLEMENTARY_DATA].get(
+                        "teleop_action", transition[TransitionKey.ACTION]
+                    )
+                discrete_penalty = transition[TransitionKey.COMPLEMENTARY_DATA].get("discrete_penalty", 0.0)
 
-        # Maintain fps timing
-        await asyncio.sleep(max(dt - (time.perf_counter() - step_start_time), 0.0))
-        await sio.sleep(0)  # Yield to asyncio loop
+                if assembler.covers(raw_observation, observation_keys):
+                    values = {key: raw_observation[key] for key in observation_keys}
+                    values[ACTION] = action_to_record
+                    values[REWARD] = transition[TransitionKey.REWARD]
+                    values[DONE] = terminated or truncated
+                    if use_gripper:
+                        values["complementary_info.discrete_penalty"] = discrete_penalty
+                    frame = assembler.assemble(values, cfg.dataset.task)
+                else:
+                    observations: dict[str, Any] = {}
+                    for key, value in transition[TransitionKey.OBSERVATION].items():
+                        if key not in dataset.features:
+                            # e.g. depth/segmentation outputs that are not part of the recording schema
+                            continue
+                        value_unbatched = _remove_batch_dim(value)
+                        if isinstance(value_unbatched, (torch.Tensor, np.ndarray)):
+                            observations[key] = _to_torch_cpu(value_unbatched)
+                    frame = {
+                        **observations,
+                        ACTION: _to_torch_cpu_float32(action_to_record),
+                        REWARD: np.array([transition[TransitionKey.REWARD]], dtype=np.float32),
+                        DONE: np.array([terminated or truncated], dtype=bool),
+                    }
+                    if use_gripper:
+                        frame["complementary_info.discrete_penalty"] = np.array([discrete_penalty], dtype=np.float32)
+                    frame["task"] = cfg.dataset.task
+
+                await writer.add_frame(frame)
+                loop_timer.record("add_frame", time.perf_counter() - record_start_time)
+
+            # Emit observation frames to connected Socket.IO clients; skip steps that
+            # only repeat the last rendered frames (see image_every_n_steps).
+            if not headless and transition[TransitionKey.INFO].get("images_updated", True):
+                with loop_timer.phase("emit"):
+                    await emit_observation_frames(transition[TransitionKey.OBSERVATION], step=total_steps)
+
+            episode_step += 1
+            total_steps += 1
+
+            # Handle episode termination
+            if terminated or truncated:
+                episode_time = time.perf_counter() - episode_start_time
+                sim_time = f" ({env.unwrapped.sim_time:.1f}s simulated)" if hasattr(env.unwrapped, "sim_time") else ""
+                logging.info(
+                    f"Episode ended after {episode_step} steps in {episode_time:.1f}s{sim_time} "
+                    f"with reward {transition[TransitionKey.REWARD]}"
+                )
+                episode_start_time = time.perf_counter()
+                episode_step = 0
+                episode_idx += 1
+
+                if dataset is not None:
+                    if transition[TransitionKey.INFO].get(TeleopEvents.RERECORD_EPISODE, False):
+                        logging.info(f"Re-recording episode {episode_idx}")
+                        await writer.clear_episode_buffer()
+                        episode_idx -= 1
+                    else:
+                        logging.info(f"Saving episode {episode_idx} in the background")
+                        await writer.save_episode()
+
+                # Reset for new episode
+                obs, info = await env.reset()
+                env_processor.reset()
+                action_processor.reset()
+
+                transition = create_transition(observation=obs, info=info)
+                transition = env_processor(transition)
+
+            # Maintain fps timing on an absolute deadline grid
+            loop_timer.step_finished(time.perf_counter() - step_start_time)
+            if not headless:
+                with loop_timer.phase("sleep"):
+                    await sio.sleep(0)  # Yield to asyncio loop
+                    await scheduler.wait()
+
+            if terminated or truncated:
+                logging.info(f"Control loop timing for episode {episode_idx}:\n{loop_timer.format_summary()}")
+                await publish_loop_stats(
+                    loop_timer,
+                    kind="loop-summary",
+                    episode=episode_idx,
+                    pacing=None if headless else scheduler.stats(),
+                    io=io_latency_stats() if io_latency_stats else None,
+                    recording=writer.stats() if writer is not None else None,
+                )
+                loop_timer.reset()
+                last_stats_time = time.perf_counter()
+            elif cfg.loop_stats_interval_s > 0 and time.perf_counter() - last_stats_time >= cfg.loop_stats_interval_s:
+                await publish_loop_stats(
+                    loop_timer,
+                    episode=episode_idx,
+                    pacing=None if headless else scheduler.stats(),
+                    io=io_latency_stats() if io_latency_stats else None,
+                    recording=writer.stats() if writer is not None else None,
+                )
+                last_stats_time = time.perf_counter()
+    finally:
+        if writer is not None:
+            # Flush queued frames/episodes and finalize, also when the loop is cancelled.
+            await writer.close()
+
+    if headless:
+        wall_s = time.perf_counter() - run_start_time
+        sim_s = total_steps * env.unwrapped.step_dt
+        logging.info(
+            f"Headless run: {episode_idx} episodes, {total_steps} steps in {wall_s:.2f}s "
+            f"({total_steps / wall_s:.0f} steps/s, {sim_s / wall_s:.1f}x real time)"
+        )
 
     if dataset is not None:
         logging.info("Dataset saved locally at %s", dataset.root)
@@ -1187,78 +1370,380 @@ async def control_loop(
             logging.warning("Skipping push_to_hub due to authentication/repository issue: %s", error)
 
 
-async def replay_trajectory(
-    env: gym.Env, action_processor: DataProcessorPipeline, cfg: GymManipulatorConfig
-) -> None:
-    """Replay recorded trajectory on robot environment."""
-    assert cfg.dataset.replay_episode is not None, "Replay episode must be provided for replay"
+# ---------------------------------------------------------------------------
+# Batched headless rollouts (custom_mujoco with num_envs > 1 or num_workers > 0)
+# ---------------------------------------------------------------------------
+
+
+def is_batched(env_cfg: EnvConfig) -> bool:
+    """Whether env_cfg builds a vector env (VectorGenericMujocoEnv or MujocoEnvPool)."""
+    return env_cfg.type == "custom_mujoco" and (env_cfg.num_workers > 0 or env_cfg.num_envs > 1)
+
+
+async def batched_rollout(env: gym.vector.VectorEnv, cfg: GymManipulatorConfig) -> dict[str, Any]:
+    """Collect episodes from every instance of a vector env at once, headless.
+
+    All instances reset together and run for control_time_s of simulated
+    time, so each round yields num_envs episodes. Observations are read
+    straight from the env's stacked arrays (MujocoEnvPool's shared memory);
+    when recording, a round is copied into one preallocated (steps, num_envs,
+    ...) array per key and its episodes are then written one after another.
+    Actions are neutral (zeros), as in the single-env headless loop.
+    """
+    num_envs = env.num_envs
+    steps = _headless_episode_steps(env, cfg)
+    episodes_wanted = cfg.dataset.num_episodes_to_record
+    use_gripper = cfg.env.processor.gripper.use_gripper if cfg.env.processor.gripper is not None else True
+    actions = np.zeros((num_envs, *env.single_action_space.shape), dtype=env.single_action_space.dtype)
+    logging.info(
+        f"Starting batched headless rollout: {num_envs} envs, {steps} steps per episode, {episodes_wanted} episodes"
+    )
+
+    writer = assembler = None
+    columns: dict[str, np.ndarray] = {}
+    rewards = np.zeros((steps, num_envs), dtype=np.float32)
+    if cfg.mode == "record":
+        spaces = env.single_observation_space.spaces
+        shapes = {key: tuple(space.shape) for key, space in spaces.items() if key == OBS_STATE or "image" in key}
+        features = _recording_features(shapes, _custom_mujoco_action_features(env), use_gripper)
+        writer = AsyncDatasetWriter(_init_record_dataset(cfg, features))
+        assembler = EpisodeFrameAssembler(features)
+        columns = {key: np.empty((steps, num_envs, *shape), dtype=spaces[key].dtype) for key, shape in shapes.items()}
+
+    episodes = 0
+    total_steps = 0
+    start_time = time.perf_counter()
+    try:
+        while episodes < episodes_wanted:
+            await env.reset()
+            for t in range(steps):
+                obs, reward, _, _, _ = await env.step(actions)
+                for key, column in columns.items():
+                    column[t] = obs[key]
+                rewards[t] = reward
+                total_steps += num_envs
+                if t % 64 == 0:
+                    await asyncio.sleep(0)  # let a worker's stop command through
+
+            finished = min(num_envs, episodes_wanted - episodes)
+            if writer is not None:
+                for i in range(finished):
+                    for t in range(steps):
+                        values = {key: column[t, i] for key, column in columns.items()}
+                        values[ACTION] = actions[i]
+                        values[REWARD] = rewards[t, i]
+                        values[DONE] = t == steps - 1
+                        if use_gripper:
+                            values["complementary_info.discrete_penalty"] = 0.0
+                        await writer.add_frame(assembler.assemble(values, cfg.dataset.task))
+                    await writer.save_episode()
+            episodes += finished
+            logging.info(f"Batched rollout: {episodes}/{episodes_wanted} episodes")
+    finally:
+        if writer is not None:
+            await writer.close()
+
+    wall_s = time.perf_counter() - start_time
+    summary = {
+        "episodes": episodes,
+        "env_steps": total_steps,
+        "steps_per_s": round(total_steps / wall_s, 1),
+        "real_time_factor": round(total_steps * env.unwrapped.step_dt / wall_s, 1),
+    }
+    logging.info(f"Batched headless run: {summary}")
+    return summary
+
+
+def _load_episode_actions(cfg: GymManipulatorConfig, episode: int) -> np.ndarray:
+    """Load an episode's action column as one (num_frames, action_dim) array.
+
+    Uses the episode metadata to read only that episode's rows from its data
+    file; falls back to loading the episode through LeRobotDataset (which also
+    downloads it) when the data file is not available locally.
+    """
+    from lerobot.datasets.dataset_metadata import LeRobotDatasetMetadata
+    from lerobot.datasets.lerobot_dataset import LeRobotDataset
+
+    from episode_index import EpisodeIndex
+
+    meta = LeRobotDatasetMetadata(cfg.dataset.repo_id, root=cfg.dataset.root)
+    index = EpisodeIndex(meta)
+    if index[episode].data_path.is_file():
+        return index.load_column(episode, ACTION)
 
     dataset = LeRobotDataset(
         cfg.dataset.repo_id,
         root=cfg.dataset.root,
-        episodes=[cfg.dataset.replay_episode],
+        episodes=[episode],
         download_videos=False,
     )
-    episode_frames = dataset.hf_dataset.filter(lambda x: x["episode_index"] == cfg.dataset.replay_episode)
-    actions = episode_frames.select_columns(ACTION)
+    # hf_dataset only holds the requested episode.
+    return np.asarray(dataset.hf_dataset.with_format("numpy")[ACTION])
 
-    _, info = await env.reset()
 
-    for action_data in actions:
-        start_time = time.perf_counter()
-        transition = create_transition(
-            observation=env.get_raw_joint_positions() if hasattr(env, "get_raw_joint_positions") else {},
-            action=action_data[ACTION],
-        )
-        transition = action_processor(transition)
-        await env.step(transition[TransitionKey.ACTION])
-        await asyncio.sleep(max(1 / cfg.env.fps - (time.perf_counter() - start_time), 0.0))
+# Action steps whose output depends only on the recorded action (no observation,
+# robot state or teleop input), so a whole episode can be processed up front.
+_OBSERVATION_FREE_ACTION_STEPS = (InterventionActionProcessorStep, Torch2NumpyActionProcessorStep)
 
 
-@parser.wrap()
-def main(cfg: GymManipulatorConfig) -> None:
-    """Main entry point for gym manipulator script."""
-    logging.info("Starting gym_manipulator...")
-    
-    async def run_gym_logic():
+def can_precompute_actions(action_processor: DataProcessorPipeline) -> bool:
+    return all(isinstance(step, _OBSERVATION_FREE_ACTION_STEPS) for step in action_processor.steps)
+
+
+def precompute_replay_actions(actions: np.ndarray, action_processor: DataProcessorPipeline) -> np.ndarray:
+    """Run every recorded action through the action pipeline once, ahead of playback."""
+    processed = [
+        action_processor(create_transition(observation={}, action=torch.from_numpy(action)))[TransitionKey.ACTION]
+        for action in actions
+    ]
+    return np.stack([np.asarray(action, dtype=np.float32) for action in processed])
+
+
+def _replay_episodes(cfg: GymManipulatorConfig) -> list[int]:
+    if cfg.dataset.replay_episodes:
+        return list(cfg.dataset.replay_episodes)
+    assert cfg.dataset.replay_episode is not None, "Replay episode must be provided for replay"
+    return [cfg.dataset.replay_episode]
+
+
+async def replay_trajectory(
+    env: gym.Env, action_processor: DataProcessorPipeline, cfg: GymManipulatorConfig
+) -> list[dict[str, Any]]:
+    """Replay recorded trajectories on the robot environment.
+
+    Plays ``dataset.replay_episodes`` (or the single ``replay_episode``) in
+    order, resetting in between.  When the action pipeline only depends on the
+    action, each episode is processed in one pass before playback.  With
+    ``dataset.replay_as_fast_as_possible`` simulated environments are stepped
+    back to back without pacing (always the case for headless runs); real
+    robots always replay at ``env.fps``.
+    Returns one summary dict per episode.
+    """
+    episodes = _replay_episodes(cfg)
+    precompute = can_precompute_actions(action_processor)
+    unpaced = cfg.dataset.replay_as_fast_as_possible or is_headless(cfg)
+    if unpaced and isinstance(env.unwrapped, RobotEnv):
+        logging.warning("Unpaced replay is only supported in simulation; replaying at env fps")
+        unpaced = False
+
+    summaries = []
+    for episode in episodes:
+        actions = _load_episode_actions(cfg, episode)
+        prepare_start = time.perf_counter()
+        if precompute:
+            actions = precompute_replay_actions(actions, action_processor)
+        prepare_s = time.perf_counter() - prepare_start
+
+        await env.reset()
+        scheduler = RateScheduler(cfg.env.fps, policy=cfg.pacing_policy, spin_s=cfg.pacing_spin_s)
+        scheduler.start()
+        replay_start = time.perf_counter()
+        for action in actions:
+            if not precompute:
+                transition = create_transition(
+                    observation=env.get_raw_joint_positions() if hasattr(env, "get_raw_joint_positions") else {},
+                    action=torch.from_numpy(action),
+                )
+                action = action_processor(transition)[TransitionKey.ACTION]
+            await env.step(action)
+            if unpaced:
+                await sio.sleep(0)
+            else:
+                await scheduler.wait()
+
+        replay_s = time.perf_counter() - replay_start
+        summary = {
+            "episode": episode,
+            "steps": len(actions),
+            "precomputed": precompute,
+            "prepare_s": round(prepare_s, 4),
+            "replay_s": round(replay_s, 4),
+            "steps_per_s": round(len(actions) / replay_s, 1) if replay_s > 0 else None,
+        }
+        if not unpaced:
+            summary["pacing"] = scheduler.stats()
+        logging.info(f"Replayed episode {episode}: {summary}")
+        summaries.append(summary)
+
+    return summaries
+
+
+def _import_config_choices(env_type: str | None) -> None:
+    """Import the modules that register robot, teleop and camera config types.
+
+    draccus can only decode ``robot.type``/``teleop.type``/camera entries that
+    were registered, but importing the drivers is slow, so custom_mujoco
+    configs (which use none of them) skip it.
+    """
+    if env_type == "custom_mujoco":
+        return
+    from lerobot.cameras import opencv  # noqa: F401
+    from lerobot.robots import so_follower  # noqa: F401
+    from lerobot.teleoperators import gamepad, keyboard, so_leader  # noqa: F401
+
+
+def _config_from_cli(cfg: GymManipulatorConfig) -> GymManipulatorConfig:
+    return cfg
+
+
+def _config_env_type(args: list[str]) -> str | None:
+    env_type = parser.parse_arg("env.type", args)
+    config_path = parser.parse_arg("config_path", args)
+    if env_type is None and config_path:
         try:
-            env, teleop_device = make_robot_env(cfg.env)
-            env_processor, action_processor = make_processors(env, teleop_device, cfg.env, cfg.device)
+            env_type = json.loads(Path(config_path).read_text()).get("env", {}).get("type")
+        except (OSError, ValueError, AttributeError):
+            env_type = None
+    return env_type
+
 
-            logging.info("Environment observation space:", env.observation_space)
-            # logging.info("Environment action space:", env.action_space)
-            # logging.info("Environment processor:", env_processor)
-            # logging.info("Action processor:", action_processor)
+def parse_config() -> GymManipulatorConfig:
+    """Parse ``sys.argv`` (``--config_path`` and overrides) into a GymManipulatorConfig."""
+    _import_config_choices(_config_env_type(sys.argv[1:]))
+    return parser.wrap()(_config_from_cli)()
 
-            if cfg.mode == "replay":
-                await replay_trajectory(env, action_processor, cfg)
-                return
 
-            await control_loop(env, env_processor, action_processor, teleop_device, cfg)
-        except Exception as e:
-            logging.error(f"Error in gym logic: {e}", exc_info=True)
-            # Send error to Electron
-            print(f"__CMD__:{json.dumps({'type': 'error', 'message': str(e), 'traceback': traceback.format_exc()})}", file=sys.stderr, flush=True)
+def config_from_dict(config: dict[str, Any]) -> GymManipulatorConfig:
+    """Decode a config payload (same layout as the --config_path JSON)."""
+    env = config.get("env")
+    _import_config_choices(env.get("type") if isinstance(env, dict) else None)
+    return draccus.decode(GymManipulatorConfig, config)
 
-    async def on_startup(app):
-        sio.start_background_task(run_gym_logic)
 
-    app.on_startup.append(on_startup)
+@dataclass
+class Session:
+    """A built environment with its processors, ready for run_session.
 
-    # Find a free port
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.bind(('', 0))
-    port = sock.getsockname()[1]
-    sock.close()
+    Batched sessions (a vector env) have no teleop device or processors.
+    """
 
-    # Run the web server
-    # Print to stderr so VideoManager can catch it
-    print(f"__CMD__:{json.dumps({'type': 'server-ready', 'url': f'http://localhost:{port}'})}", file=sys.stderr, flush=True)
-    logging.info(f"Socket.IO server running on http://localhost:{port}")
-    web.run_app(app, port=port)
+    env: gym.Env
+    teleop_device: Teleoperator | None
+    env_processor: DataProcessorPipeline | None
+    action_processor: DataProcessorPipeline | None
+
+    def close(self) -> None:
+        if self.teleop_device is not None and getattr(self.teleop_device, "is_connected", False):
+            self.teleop_device.disconnect()
+        self.env.close()
+
+
+def warm_up() -> None:
+    """Set up process-wide state a long-lived worker keeps between sessions."""
+    from mujoco_rendering import keep_gl_context_warm
+
+    keep_gl_context_warm()
+
+
+def build_session(cfg: GymManipulatorConfig) -> Session:
+    if is_batched(cfg.env):
+        # Checked before building: num_workers would already have started processes.
+        if not is_headless(cfg) or cfg.mode == "replay":
+            raise ValueError(
+                "num_envs > 1 and num_workers > 0 run batched headless rollouts: "
+                "set headless=true (or mode=benchmark), with mode record, benchmark or unset."
+            )
+        env, _ = make_robot_env(cfg.env)
+        return Session(env, None, None, None)
+
+    env, teleop_device = make_robot_env(cfg.env)
+    if cfg.mode == "replay" and cfg.env.type == "custom_mujoco" and teleop_device is not None:
+        # Replay plays back recorded actions, so the sim's teleop (the keyboard by
+        # default) has nothing to add; without its action step whole episodes
+        # can be precomputed.
+        if getattr(teleop_device, "is_connected", False):
+            teleop_device.disconnect()
+        teleop_device = None
+    env_processor, action_processor = make_processors(env, teleop_device, cfg.env, cfg.device)
+    logging.info(f"Environment observation space: {env.observation_space}")
+    return Session(env, teleop_device, env_processor, action_processor)
+
+
+async def run_session(cfg: GymManipulatorConfig, session: Session) -> None:
+    """Run the configured mode on session; the session is closed when it ends or is cancelled."""
+    try:
+        if isinstance(session.env, gym.vector.VectorEnv):
+            await batched_rollout(session.env, cfg)
+            return
+        if cfg.mode == "replay":
+            await replay_trajectory(session.env, session.action_processor, cfg)
+            return
+        await control_loop(
+            session.env, session.env_processor, session.action_processor, session.teleop_device, cfg
+        )
+    finally:
+        session.close()
+
+
+def reconfigure_session(cfg: GymManipulatorConfig, session: Session, changes: dict[str, Any]) -> list[str]:
+    """Apply live env changes (cameras, home_position, control_dt, physics_dt) to a running session.
+
+    Returns the observation keys whose space changed.
+    """
+    env = session.env.unwrapped
+    if not isinstance(env, GenericMujocoEnv):
+        raise ValueError("Live reconfiguration is only supported for custom_mujoco environments")
+    unknown = set(changes) - {"cameras", "home_position", "control_dt", "physics_dt"}
+    if unknown:
+        raise ValueError(f"Cannot change {sorted(unknown)} on a running environment")
+
+    cameras = camera_specs(changes["cameras"]) if changes.get("cameras") is not None else None
+    if cfg.mode == "record":
+        # The dataset features and fps are fixed for the whole recording.
+        current = [(cs.name, cs.height, cs.width) for cs in env._cameras_spec]
+        if cameras is not None and [(cs.name, cs.height, cs.width) for cs in cameras] != current:
+            raise ValueError("Cameras cannot be added, removed or resized while recording")
+        if changes.get("control_dt") is not None:
+            raise ValueError("control_dt cannot change while recording")
+
+    home_position = changes.get("home_position")
+    changed = env.reconfigure(
+        cameras=cameras,
+        home_position=np.asarray(home_position) if home_position is not None else None,
+        control_dt=changes.get("control_dt"),
+        physics_dt=changes.get("physics_dt"),
+    )
+    logging.info(f"Reconfigured environment: {sorted(changes)}; observation changes: {sorted(changed)}")
+    return sorted(changed)
+
+
+def report_error(e: Exception, context: str = "Error in gym logic") -> None:
+    logging.error(f"{context}: {e}", exc_info=True)
+    # Send error to Electron
+    send_command({'type': 'error', 'message': str(e), 'traceback': traceback.format_exc()})
+
+
+async def run(cfg: GymManipulatorConfig, profile: StartupProfile | None = None) -> None:
+    """Build the environment and run the configured mode; errors are reported to Electron."""
+    try:
+        session = build_session(cfg)
+        if profile is not None:
+            profile.mark("env_ready")
+            profile.publish()
+        await run_session(cfg, session)
+    except Exception as e:
+        report_error(e)
+        if is_headless(cfg):
+            raise  # non-zero exit for scripted runs
+
+
+def main() -> None:
+    """Main entry point for gym manipulator script.
+
+    The Electron app launches sim_server.py instead, which announces the
+    server before this module is imported.
+    """
+    logging.info("Starting gym_manipulator...")
+    cfg = parse_config()
+
+    if is_headless(cfg):
+        # No Socket.IO server: nothing to preview to and nothing to pace against.
+        asyncio.run(run(cfg))
+        return
+
+    serve(lambda: run(cfg))
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO, force=True)
-    logging.info("Starting gym_manipulator...")
     main()
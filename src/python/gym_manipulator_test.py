@@ -7,6 +7,7 @@ import asyncio
 
 import gym_manipulator as gm
 from custom_mujoco_env import CustomMujocoEnvConfig, CameraSpec
+from video_frames import unpack_frame_batch
 
 class TestRobotEnv:
     @pytest.mark.asyncio
@@ -51,6 +52,52 @@ class TestRobotEnv:
         assert args["motor1.pos"] == 0.5
         assert args["motor2.pos"] == 0.5
 
+    @pytest.mark.asyncio
+    async def test_pipelined_io_returns_prefetched_observation(self):
+        mock_robot = MagicMock()
+        mock_robot.is_connected = True
+        mock_robot.bus.motors = {"m1": None}
+        mock_robot.cameras = {}
+        reads = iter(range(100))
+        mock_robot.get_observation.side_effect = lambda: {"m1.pos": float(next(reads))}
+
+        env = gm.RobotEnv(robot=mock_robot, reset_time_s=0.0, pipeline_io=True)
+        obs, _ = await env.reset()   # read 0 was taken by _setup_spaces
+        assert obs["m1.pos"] == 1.0
+
+        # The first step reads synchronously, then queues the write and the next read.
+        obs, *_ = await env.step(np.array([0.1, 0.0, 0.0]))
+        assert obs["m1.pos"] == 2.0
+        obs, *_ = await env.step(np.array([0.2, 0.0, 0.0]))
+        assert obs["m1.pos"] == 3.0   # prefetched right after the first write
+
+        env.close()   # waits for the queued write and prefetch
+        assert mock_robot.send_action.call_count == 2
+        stats = env.io_latency_stats()
+        assert stats["send_action"]["count"] == 2
+        assert stats["get_observation"]["count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_display_cameras_reuses_step_observation(self):
+        mock_robot = MagicMock()
+        mock_robot.is_connected = True
+        mock_robot.bus.motors = {"m1": None}
+        mock_robot.cameras = {"front": None}
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        mock_robot.get_observation.return_value = {"m1.pos": 0.0, "front": frame}
+
+        env = gm.RobotEnv(robot=mock_robot, display_cameras=True, reset_time_s=0.0)
+        await env.reset()
+        reads_before = mock_robot.get_observation.call_count
+        with patch.object(gm, "preview_encoder") as encoder:
+            encoder.enabled = True
+            await env.step(np.zeros(3))
+
+        assert mock_robot.get_observation.call_count == reads_before + 1
+        step, images = encoder.submit.call_args[0]
+        assert images == {"observation.images.front": frame}
+        env.close()
+
     def test_robot_env_spaces(self):
         mock_robot = MagicMock()
         mock_robot.is_connected = True
@@ -125,3 +172,287 @@ class TestMakeRobotEnv:
             assert isinstance(env, gm.AsyncGymWrapper)
             assert isinstance(env.unwrapped, DummyMujocoEnv)
             assert teleop is None
+
+
+def _real_robot_config(**env_options):
+    return gm.config_from_dict(
+        {
+            "env": {
+                "type": "real_robot",
+                "robot": {"type": "so101_follower", "port": "/dev/null"},
+                "teleop": {"type": "keyboard"},
+                **env_options,
+            },
+            "dataset": {"repo_id": "local/test", "task": "test"},
+            "mode": "record",
+        }
+    )
+
+
+def _mock_real_robot():
+    robot = MagicMock()
+    robot.is_connected = True
+    robot.bus.motors = {"m1": None}
+    robot.cameras = {}
+    robot.get_observation.return_value = {"m1.pos": 0.0}
+    return robot
+
+
+class TestMakeRealRobotEnv:
+    @pytest.mark.parametrize("pipeline_io", [False, True])
+    def test_pipeline_io_from_config(self, pipeline_io):
+        cfg = _real_robot_config(pipeline_io=pipeline_io)
+        assert isinstance(cfg.env, gm.RealRobotEnvConfig)
+
+        with patch("lerobot.robots.make_robot_from_config", return_value=_mock_real_robot()), patch(
+            "lerobot.teleoperators.make_teleoperator_from_config"
+        ):
+            env, _ = gm.make_robot_env(cfg.env)
+        assert env.pipeline_io is pipeline_io
+
+    def test_async_cameras_from_config(self):
+        cfg = _real_robot_config(async_cameras=True)
+        robot = _mock_real_robot()
+        robot.cameras = {"front": MagicMock(read=MagicMock(return_value=np.zeros((4, 6, 3), dtype=np.uint8)))}
+        robot.bus.sync_read.return_value = {"m1": 0.0}
+
+        with patch("lerobot.robots.make_robot_from_config", return_value=robot), patch(
+            "lerobot.teleoperators.make_teleoperator_from_config"
+        ):
+            env, _ = gm.make_robot_env(cfg.env)
+        try:
+            assert env._camera_capture is not None
+            assert env._get_observation()["pixels"]["front"].shape == (4, 6, 3)
+            robot.get_observation.assert_not_called()
+        finally:
+            env.close()
+
+    def test_async_cameras_fail_without_first_frame(self):
+        robot = _mock_real_robot()
+        robot.cameras = {"front": MagicMock(read=MagicMock(side_effect=OSError("no device")))}
+
+        with patch("gym_manipulator.CameraCapture.wait_for_first_frames", return_value=False):
+            with pytest.raises(RuntimeError, match="front"):
+                gm.RobotEnv(robot=robot, async_cameras=True)
+        robot.disconnect.assert_called_once()
+
+
+class TestEmitObservationFrames:
+    @pytest.mark.asyncio
+    async def test_emits_one_binary_batch_per_step(self):
+        observation = {
+            "observation.state": torch.zeros(1, 2),
+            "observation.images.front": torch.rand(1, 3, 16, 24),
+            "observation.images.wrist": np.zeros((8, 8, 3), dtype=np.uint8),
+        }
+        gm.preview_encoder.client_connected("viewer")
+        try:
+            with patch.object(gm.sio, "emit", new_callable=AsyncMock) as emit:
+                await gm.emit_observation_frames(observation, step=12)
+                await gm.preview_encoder.drain()
+        finally:
+            gm.preview_encoder.client_disconnected("viewer")
+
+        emit.assert_awaited_once()
+        event, payload = emit.call_args[0]
+        assert event == "video_frames"
+        step, _, _, frames = unpack_frame_batch(payload)
+        assert step == 12
+        assert [(f.camera_name, f.width, f.height) for f in frames] == [
+            ("observation.images.front", 24, 16),
+            ("observation.images.wrist", 8, 8),
+        ]
+        assert all(f.payload.startswith(b"\xff\xd8") for f in frames)  # JPEG SOI marker
+
+    @pytest.mark.asyncio
+    async def test_skips_all_work_without_clients(self):
+        observation = {"observation.images.front": torch.rand(1, 3, 16, 24)}
+        submitted = gm.preview_encoder.submitted_frames
+        with patch.object(gm.sio, "emit", new_callable=AsyncMock) as emit, \
+                patch("preview.image_to_uint8_hwc") as convert:
+            await gm.emit_observation_frames(observation, step=0)
+            await gm.preview_encoder.drain()
+
+        emit.assert_not_awaited()
+        convert.assert_not_called()
+        assert gm.preview_encoder.submitted_frames == submitted
+
+
+class TestReplayTrajectory:
+    class RecordingEnv(gym.Env):
+        def __init__(self):
+            self.observation_space = gym.spaces.Dict({})
+            self.action_space = gym.spaces.Box(-1, 1, (2,))
+            self.resets = 0
+            self.actions = []
+        def reset(self, **kwargs):
+            self.resets += 1
+            return {}, {}
+        def step(self, action):
+            self.actions.append(np.asarray(action))
+            return {}, 0.0, False, False, {}
+
+    @staticmethod
+    def _action_processor():
+        env_cfg = MagicMock()
+        env_cfg.name = "custom_mujoco"
+        env_cfg.processor = None
+        return gm.make_processors(None, None, env_cfg)[1]
+
+    def _cfg(self, episodes, as_fast_as_possible, fps=1):
+        cfg = MagicMock()
+        cfg.env.fps = fps
+        cfg.pacing_policy = "skip"
+        cfg.pacing_spin_s = 0.0
+        cfg.dataset.replay_episodes = episodes
+        cfg.dataset.replay_as_fast_as_possible = as_fast_as_possible
+        return cfg
+
+    def test_precompute_matches_per_step_processing(self):
+        action_processor = self._action_processor()
+        assert gm.can_precompute_actions(action_processor)
+        actions = np.random.default_rng(0).uniform(-1, 1, (5, 2)).astype(np.float32)
+
+        batched = gm.precompute_replay_actions(actions, action_processor)
+        stepwise = [
+            action_processor(gm.create_transition(observation={}, action=torch.from_numpy(a)))[gm.TransitionKey.ACTION]
+            for a in actions
+        ]
+        assert batched.shape == (5, 2)
+        np.testing.assert_allclose(batched, np.stack(stepwise))
+
+    @pytest.mark.asyncio
+    async def test_replays_episodes_unpaced_in_sim(self):
+        sim = self.RecordingEnv()
+        env = gm.AsyncGymWrapper(sim)
+        recorded = {3: np.full((4, 2), 0.3, np.float32), 7: np.full((2, 2), 0.7, np.float32)}
+
+        with patch("gym_manipulator._load_episode_actions", side_effect=lambda cfg, ep: recorded[ep]):
+            # At 1 fps a paced replay of 6 steps would take seconds.
+            summaries = await asyncio.wait_for(
+                gm.replay_trajectory(env, self._action_processor(), self._cfg([3, 7], True)), timeout=1.0
+            )
+
+        assert sim.resets == 2
+        np.testing.assert_allclose(np.stack(sim.actions), np.concatenate([recorded[3], recorded[7]]))
+        assert [(s["episode"], s["steps"], s["precomputed"]) for s in summaries] == [(3, 4, True), (7, 2, True)]
+        assert "pacing" not in summaries[0]
+
+    @pytest.mark.parametrize("mode, precomputed", [("replay", True), ("record", False)])
+    def test_default_sim_config_precomputes_in_replay(self, mode, precomputed):
+        from custom_mujoco_env_test import SIMPLE_MJCF
+
+        env_cfg = CustomMujocoEnvConfig(model_xml=SIMPLE_MJCF, image_obs=False, use_model_cache=False)
+        assert env_cfg.processor.control_mode == "keyboard"
+        cfg = gm.GymManipulatorConfig(
+            env=env_cfg, dataset=gm.DatasetConfig(repo_id="local/replay", task="test", replay_episode=0), mode=mode
+        )
+
+        session = gm.build_session(cfg)
+        try:
+            assert gm.can_precompute_actions(session.action_processor) is precomputed
+            assert (session.teleop_device is None) is precomputed
+        finally:
+            session.close()
+
+
+class TestHeadlessControlLoop:
+    @pytest.mark.asyncio
+    async def test_runs_unpaced_with_episodes_in_sim_time(self):
+        from custom_mujoco_env import GenericMujocoEnv
+        from custom_mujoco_env_test import SIMPLE_MJCF
+
+        sim = GenericMujocoEnv(model_xml=SIMPLE_MJCF, image_obs=False, use_model_cache=False)
+        env = gm.AsyncGymWrapper(sim)
+        env_cfg = MagicMock()
+        env_cfg.name = "custom_mujoco"
+        env_cfg.processor = None
+        env_processor, action_processor = gm.make_processors(env, None, env_cfg)
+
+        cfg = MagicMock()
+        cfg.headless = True
+        cfg.mode = "benchmark"
+        cfg.env.fps = 1  # a paced run would take 20 s
+        cfg.env.processor.reset.control_time_s = 0.2  # 10 steps of 0.02 s simulated
+        cfg.env.processor.gripper = None
+        cfg.pacing_policy = "skip"
+        cfg.pacing_spin_s = 0.0
+        cfg.loop_stats_interval_s = 0
+        cfg.dataset.num_episodes_to_record = 2
+
+        steps = []
+        step = sim.step
+        sim.step = lambda action: steps.append(sim.sim_time) or step(action)
+        with patch("gym_manipulator.emit_observation_frames", new=AsyncMock()) as emit:
+            await asyncio.wait_for(
+                gm.control_loop(env, env_processor, action_processor, None, cfg), timeout=5.0
+            )
+
+        assert len(steps) == 20
+        # Each episode restarts the simulated clock.
+        assert steps[10] == 0.0 and steps[9] == pytest.approx(0.18)
+        emit.assert_not_called()
+
+    def test_recording_requires_one_step_per_frame(self):
+        from custom_mujoco_env import GenericMujocoEnv
+        from custom_mujoco_env_test import SIMPLE_MJCF
+
+        env = gm.AsyncGymWrapper(GenericMujocoEnv(model_xml=SIMPLE_MJCF, image_obs=False, use_model_cache=False))
+        cfg = MagicMock()
+        cfg.mode = "record"
+        cfg.env.fps = 10  # env steps 0.02 s
+        with pytest.raises(ValueError, match="one env step per frame"):
+            gm._headless_episode_steps(env, cfg)
+
+
+class TestBatchedRollout:
+
+    def _cfg(self, tmp_path, **env_kwargs):
+        from custom_mujoco_env import CustomMujocoProcessorConfig, ResetConfig
+        from custom_mujoco_env_test import SIMPLE_MJCF
+
+        env = CustomMujocoEnvConfig(
+            model_xml=SIMPLE_MJCF, image_obs=False, use_model_cache=False, fps=10, control_dt=0.1,
+            processor=CustomMujocoProcessorConfig(reset=ResetConfig(control_time_s=0.5)), **env_kwargs,
+        )
+        dataset = gm.DatasetConfig(repo_id="local/batched", task="idle", root=str(tmp_path / "batched"),
+                                   num_episodes_to_record=3)
+        return gm.GymManipulatorConfig(env=env, dataset=dataset, mode="record", headless=True)
+
+    @pytest.mark.asyncio
+    async def test_records_every_instance_as_an_episode(self, tmp_path):
+        from lerobot.datasets.lerobot_dataset import LeRobotDataset
+
+        cfg = self._cfg(tmp_path, num_envs=2)
+        session = gm.build_session(cfg)
+        assert isinstance(session.env.unwrapped, gm.VectorGenericMujocoEnv)
+        await gm.run_session(cfg, session)
+
+        dataset = LeRobotDataset(cfg.dataset.repo_id, root=cfg.dataset.root)
+        assert dataset.num_episodes == 3
+        assert dataset.num_frames == 15
+        assert dataset.features["action"]["names"] == {"motor1": 0}
+
+    @pytest.mark.asyncio
+    async def test_collects_from_pool_shared_memory(self, tmp_path):
+        from mujoco_env_pool import MujocoEnvPool
+
+        cfg = self._cfg(tmp_path, num_workers=2)
+        cfg.mode = "benchmark"
+        # fork keeps the test fast; make_robot_env uses the default spawn.
+        pool = gm.AsyncVectorGymWrapper(MujocoEnvPool(cfg.env, num_workers=2, start_method="fork"))
+        try:
+            summary = await gm.batched_rollout(pool, cfg)
+        finally:
+            pool.close()
+        # 3 episodes from 2 workers take 2 rounds of 5 steps each.
+        assert summary["episodes"] == 3
+        assert summary["env_steps"] == 20
+
+    def test_batched_configs_need_headless(self, tmp_path):
+        cfg = self._cfg(tmp_path, num_workers=2)
+        cfg.headless = False
+        with patch("gym_manipulator.make_robot_env") as make_env:
+            with pytest.raises(ValueError, match="batched headless"):
+                gm.build_session(cfg)
+        make_env.assert_not_called()
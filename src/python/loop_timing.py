@@ -0,0 +1,211 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Iterator
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Control-loop timing instrumentation
+# ---------------------------------------------------------------------------
+#
+# The control loop records how long each phase of a step takes (action
+# processor, env.step, env processor, add_frame, frame emission, sleep) into
+# rolling windows, plus the wall-clock period between step starts.  A step
+# whose work (everything but the sleep) exceeds the period budget counts as
+# an overrun.  ``snapshot`` reduces the windows to p50/p95/p99 in ms.
+
+LOOP_PHASES = ("action_processor", "env_step", "env_processor", "add_frame", "emit", "sleep")
+
+
+class RollingHistogram:
+    """Keeps the most recent ``window`` samples and reports percentiles over them."""
+
+    def __init__(self, window: int = 2048):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def clear(self) -> None:
+        self._samples.clear()
+        self.count = 0
+        self.max = 0.0
+
+    def summary(self, scale: float = 1e3) -> dict[str, float]:
+        """p50/p95/p99/mean/max of the window, multiplied by scale (seconds -> ms by default)."""
+        if not self._samples:
+            return {"count": 0}
+        samples = np.fromiter(self._samples, dtype=np.float64, count=len(self._samples))
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+        return {
+            "count": self.count,
+            "mean_ms": round(float(samples.mean()) * scale, 3),
+            "p50_ms": round(float(p50) * scale, 3),
+            "p95_ms": round(float(p95) * scale, 3),
+            "p99_ms": round(float(p99) * scale, 3),
+            "max_ms": round(self.max * scale, 3),
+        }
+
+
+class LoopTimer:
+    """Per-phase step timing for a loop that targets ``fps``."""
+
+    def __init__(self, fps: float, window: int = 2048):
+        self.fps = fps
+        self.budget_s = 1.0 / fps
+        self._window = window
+        self.phases: dict[str, RollingHistogram] = {name: RollingHistogram(window) for name in LOOP_PHASES}
+        self.period = RollingHistogram(window)
+        self.work = RollingHistogram(window)
+        self.steps = 0
+        self.overruns = 0
+        self._last_step_start: float | None = None
+
+    def record(self, phase: str, seconds: float) -> None:
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = RollingHistogram(self._window)
+        histogram.add(seconds)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def step_started(self, now: float | None = None) -> None:
+        now = time.perf_counter() if now is None else now
+        if self._last_step_start is not None:
+            self.period.add(now - self._last_step_start)
+        self._last_step_start = now
+
+    def step_finished(self, work_seconds: float) -> None:
+        """Close a step; work_seconds is the step's duration excluding the pacing sleep."""
+        self.steps += 1
+        self.work.add(work_seconds)
+        if work_seconds > self.budget_s:
+            self.overruns += 1
+
+    def reset(self) -> None:
+        for histogram in (*self.phases.values(), self.period, self.work):
+            histogram.clear()
+        self.steps = 0
+        self.overruns = 0
+        self._last_step_start = None
+
+    def snapshot(self) -> dict[str, Any]:
+        period = self.period.summary()
+        return {
+            "target_fps": self.fps,
+            "budget_ms": round(self.budget_s * 1e3, 3),
+            "steps": self.steps,
+            "overruns": self.overruns,
+            "overrun_ratio": round(self.overruns / self.steps, 4) if self.steps else 0.0,
+            "achieved_fps": round(1e3 / period["mean_ms"], 2) if period.get("mean_ms") else None,
+            "period": period,
+            "work": self.work.summary(),
+            "phases": {name: histogram.summary() for name, histogram in self.phases.items() if histogram.count},
+        }
+
+    def format_summary(self) -> str:
+        """One-line-per-phase human readable report for the logs."""
+        snap = self.snapshot()
+        lines = [
+            f"{snap['steps']} steps @ target {self.fps:g} Hz (achieved {snap['achieved_fps']}), "
+            f"{snap['overruns']} overruns ({snap['overrun_ratio']:.1%}) of {snap['budget_ms']:.1f} ms budget"
+        ]
+        for name, stats in (("period", snap["period"]), ("work", snap["work"]), *snap["phases"].items()):
+            if stats.get("count"):
+                lines.append(
+                    f"  {name:<17} p50 {stats['p50_ms']:7.2f}  p95 {stats['p95_ms']:7.2f}  "
+                    f"p99 {stats['p99_ms']:7.2f}  max {stats['max_ms']:7.2f} ms"
+                )
+        return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Drift-free loop pacing
+# ---------------------------------------------------------------------------
+
+PACING_POLICIES = ("skip", "catch_up")
+
+
+class RateScheduler:
+    """Paces a loop on an absolute tick grid (``next_tick += period``).
+
+    Unlike sleeping ``period - elapsed`` after every step, an overrun never
+    shifts the schedule.  What happens after one depends on ``policy``:
+
+    * ``"skip"``: missed ticks are dropped and the loop waits for the next
+      tick still in the future, so steps stay on the original phase.
+    * ``"catch_up"``: late steps run back to back until the schedule is met
+      again, keeping the total step count per wall time.  A lag beyond
+      ``max_catch_up`` ticks re-anchors the grid instead.
+
+    The wait uses ``asyncio.sleep`` until ``spin_s`` before the deadline and
+    then busy-waits (like lerobot's ``precise_sleep``).  The spin blocks the
+    event loop, so keep it to a millisecond or two.
+    """
+
+    def __init__(self, fps: float, policy: str = "skip", spin_s: float = 0.0, max_catch_up: int = 5):
+        if fps <= 0:
+            raise ValueError(f"fps must be > 0, got {fps}")
+        if policy not in PACING_POLICIES:
+            raise ValueError(f"Unknown pacing policy {policy!r}, expected one of {PACING_POLICIES}")
+        self.period = 1.0 / fps
+        self.policy = policy
+        self.spin_s = max(spin_s, 0.0)
+        self.max_catch_up = max_catch_up
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self._next_tick: float | None = None
+
+    def start(self, now: float | None = None) -> None:
+        """Anchor the grid so the first ``wait`` returns one period from now."""
+        now = time.perf_counter() if now is None else now
+        self._next_tick = now + self.period
+
+    def _advance(self, now: float) -> float:
+        """Move past an overrun according to the policy; returns the deadline to wait for."""
+        self.overruns += 1
+        late_ticks = math.floor((now - self._next_tick) / self.period)
+        if self.policy == "skip":
+            self.skipped_ticks += late_ticks + 1
+            self._next_tick += (late_ticks + 1) * self.period
+        elif late_ticks >= self.max_catch_up:
+            self.skipped_ticks += late_ticks
+            self._next_tick = now
+        return self._next_tick
+
+    async def wait(self) -> None:
+        """Wait for the next tick of the grid."""
+        now = time.perf_counter()
+        if self._next_tick is None:
+            self.start(now)
+        deadline = self._next_tick
+        if now > deadline:
+            deadline = self._advance(now)
+
+        coarse = deadline - self.spin_s - time.perf_counter()
+        if coarse > 0:
+            await asyncio.sleep(coarse)
+        while time.perf_counter() < deadline:
+            pass
+        self._next_tick = deadline + self.period
+
+    def stats(self) -> dict[str, Any]:
+        return {"policy": self.policy, "overruns": self.overruns, "skipped_ticks": self.skipped_ticks}
+
+
+def timed(timer: LoopTimer | None, phase: str) -> ContextManager[None]:
+    """``timer.phase(phase)``, or a no-op when timing is disabled."""
+    return timer.phase(phase) if timer is not None else nullcontext()
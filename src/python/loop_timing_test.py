@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from loop_timing import LoopTimer, RateScheduler, RollingHistogram, timed
+
+
+class TestRollingHistogram:
+
+    def test_percentiles_over_window(self):
+        histogram = RollingHistogram(window=100)
+        for ms in range(1, 201):
+            histogram.add(ms / 1e3)
+
+        summary = histogram.summary()
+        # Only the last 100 samples (101..200 ms) are in the window, max is all-time.
+        assert summary["count"] == 200
+        assert summary["p50_ms"] == pytest.approx(150.5)
+        assert summary["p99_ms"] == pytest.approx(199.01)
+        assert summary["max_ms"] == pytest.approx(200.0)
+
+    def test_empty(self):
+        assert RollingHistogram().summary() == {"count": 0}
+
+
+class TestLoopTimer:
+
+    def test_overruns_and_phases(self):
+        timer = LoopTimer(fps=10)   # 100 ms budget
+        for i, work in enumerate((0.05, 0.15, 0.05)):
+            timer.step_started(now=i * 0.1)
+            timer.record("env_step", work)
+            timer.step_finished(work)
+
+        snap = timer.snapshot()
+        assert snap["steps"] == 3
+        assert snap["overruns"] == 1
+        assert snap["achieved_fps"] == pytest.approx(10.0)
+        assert snap["phases"]["env_step"]["count"] == 3
+        assert "sleep" not in snap["phases"]
+
+        timer.reset()
+        assert timer.snapshot()["steps"] == 0
+
+    def test_timed_is_noop_without_timer(self):
+        with timed(None, "env_step"):
+            pass
+        timer = LoopTimer(fps=30)
+        with timed(timer, "emit"):
+            pass
+        assert timer.phases["emit"].count == 1
+
+
+class TestRateScheduler:
+
+    @pytest.mark.asyncio
+    async def test_skip_policy_stays_on_grid(self):
+        scheduler = RateScheduler(fps=100, policy="skip", spin_s=0.002)
+        start = time.perf_counter()
+        scheduler.start(start)
+        for step in range(10):
+            if step == 3:
+                time.sleep(0.025)  # misses the ticks at 40 and 50 ms
+            await scheduler.wait()
+        # 10 waits plus the 2 dropped ticks, with no accumulated drift.
+        assert scheduler.overruns == 1
+        assert scheduler.skipped_ticks == 2
+        assert time.perf_counter() - start == pytest.approx(12 * 0.01, abs=0.004)
+
+    @pytest.mark.asyncio
+    async def test_catch_up_policy_keeps_step_count(self):
+        scheduler = RateScheduler(fps=100, policy="catch_up", spin_s=0.002)
+        start = time.perf_counter()
+        scheduler.start(start)
+        for step in range(10):
+            if step == 3:
+                time.sleep(0.025)
+            await scheduler.wait()
+        assert scheduler.skipped_ticks == 0
+        assert time.perf_counter() - start == pytest.approx(10 * 0.01, abs=0.004)
+
+    def test_rejects_unknown_policy(self):
+        with pytest.raises(ValueError):
+            RateScheduler(fps=30, policy="drift")
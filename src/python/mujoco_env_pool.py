@@ -0,0 +1,246 @@
+import logging
+import multiprocessing as mp
+import traceback
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from typing import Any
+
+import gymnasium as gym
+import numpy as np
+
+from custom_mujoco_env import CustomMujocoEnvConfig, GenericMujocoEnv, generic_mujoco_env_kwargs
+
+# ---------------------------------------------------------------------------
+# Multi-process pool of GenericMujocoEnv workers
+# ---------------------------------------------------------------------------
+#
+# Each worker process builds its own GenericMujocoEnv and writes observations
+# straight into shared-memory ring buffers laid out as (ring_size, num_workers,
+# *shape), so slot k of every key is already a stacked (num_workers, ...) array.
+# Actions travel the other way through a shared (num_workers, act_dim) buffer;
+# the pipes only carry small control messages and scalar results.
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    # Workers are children of the pool and share its resource tracker, so the
+    # registration attaching adds is the parent's own; the parent unlinks the
+    # segment on close, which also unregisters it.
+    return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(
+    index: int,
+    cfg: CustomMujocoEnvConfig,
+    buffer_specs: dict[str, tuple[str, tuple[int, ...], str]],
+    conn: Connection,
+) -> None:
+    """Worker loop: build the env, then serve reset/step commands until closed."""
+    segments: list[shared_memory.SharedMemory] = []
+    buffers: dict[str, np.ndarray] = {}
+    actions = None
+    obs = None
+    env = None
+    try:
+        for key, (name, shape, dtype) in buffer_specs.items():
+            shm = _attach_shared_memory(name)
+            segments.append(shm)
+            buffers[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        actions = buffers.pop("action")
+
+        # Frames are copied into shared memory right away, so render in place.
+        env = GenericMujocoEnv(**generic_mujoco_env_kwargs(cfg), reuse_obs_buffers=True)
+        conn.send(("ready", None))
+
+        while True:
+            command, slot, payload = conn.recv()
+            if command == "close":
+                break
+            if command == "reset":
+                obs, _ = env.reset(seed=payload)
+                result = (0.0, False, False, True)
+            elif command == "step":
+                obs, reward, terminated, truncated, info = env.step(actions[index])
+                result = (float(reward), bool(terminated), bool(truncated), bool(info.get("images_updated", True)))
+            else:
+                raise ValueError(f"Unknown pool command: {command}")
+
+            for key, value in obs.items():
+                np.copyto(buffers[key][slot, index], value, casting="unsafe")
+            conn.send(("ok", result))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        if env is not None:
+            env.close()
+        # Drop every view before closing, otherwise the mappings cannot be released.
+        buffers.clear()
+        del actions, obs
+        for shm in segments:
+            shm.close()
+        conn.close()
+
+
+class MujocoEnvPool(gym.vector.VectorEnv):
+    """Vector env that runs one GenericMujocoEnv per worker process.
+
+    Observations returned by ``reset``/``step`` are zero-copy views into a
+    shared-memory ring; a view stays valid for ``ring_size - 1`` further steps,
+    after which its slot is overwritten.  Copy anything that must live longer.
+    """
+
+    metadata = {"render_modes": [], "autoreset_mode": gym.vector.AutoresetMode.NEXT_STEP}
+
+    def __init__(
+        self,
+        cfg: CustomMujocoEnvConfig,
+        num_workers: int,
+        ring_size: int = 4,
+        start_method: str = "spawn",
+    ):
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be >= 1, got {num_workers}")
+        if ring_size < 2:
+            raise ValueError(f"ring_size must be >= 2, got {ring_size}")
+
+        self._segments: list[shared_memory.SharedMemory] = []
+        self._conns: list[Connection] = []
+        self._processes: list[mp.process.BaseProcess] = []
+        self._closed_pool = False
+
+        # Build one env in-process only to learn the observation/action layout.
+        probe = GenericMujocoEnv(**generic_mujoco_env_kwargs(cfg))
+        self.single_observation_space = probe.observation_space
+        self.single_action_space = probe.action_space
+        self.step_dt = probe.step_dt
+        # Names for dataset schemas, as on the single-instance env.
+        self._joint_names = probe._joint_names
+        self._actuator_names = probe._actuator_names
+        probe.close()
+
+        self.num_envs = num_workers
+        self.observation_space = gym.vector.utils.batch_space(self.single_observation_space, num_workers)
+        self.action_space = gym.vector.utils.batch_space(self.single_action_space, num_workers)
+        self._ring_size = ring_size
+        self._slot = -1
+        self._waiting = False
+
+        self._buffers: dict[str, np.ndarray] = {}
+        buffer_specs: dict[str, tuple[str, tuple[int, ...], str]] = {}
+        layouts = {
+            key: ((ring_size, num_workers, *space.shape), space.dtype)
+            for key, space in self.single_observation_space.spaces.items()
+        }
+        layouts["action"] = ((num_workers, *self.single_action_space.shape), self.single_action_space.dtype)
+        for key, (shape, dtype) in layouts.items():
+            nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self._segments.append(shm)
+            self._buffers[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            buffer_specs[key] = (shm.name, shape, np.dtype(dtype).str)
+        self._actions = self._buffers.pop("action")
+
+        ctx = mp.get_context(start_method)
+        try:
+            for index in range(num_workers):
+                parent_conn, child_conn = ctx.Pipe()
+                process = ctx.Process(
+                    target=_worker_main,
+                    args=(index, cfg, buffer_specs, child_conn),
+                    name=f"mujoco-env-{index}",
+                    daemon=True,
+                )
+                process.start()
+                child_conn.close()
+                self._conns.append(parent_conn)
+                self._processes.append(process)
+            self._receive_all()
+        except Exception:
+            self.close()
+            raise
+        logging.info(f"Started MujocoEnvPool with {num_workers} workers")
+
+    # ---- gym vector API ----
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed, options=options)
+        slot = self._next_slot()
+        for index, conn in enumerate(self._conns):
+            worker_seed = None if seed is None else seed + index
+            conn.send(("reset", slot, worker_seed))
+        self._receive_all()
+        return self._observation(slot), {}
+
+    def step_async(self, actions) -> None:
+        """Hand actions to the workers without waiting for the physics to finish."""
+        if self._waiting:
+            raise RuntimeError("step_async called while a step is already in flight")
+        np.copyto(self._actions, np.asarray(actions).reshape(self._actions.shape), casting="unsafe")
+        slot = self._next_slot()
+        for conn in self._conns:
+            conn.send(("step", slot, None))
+        self._waiting = True
+
+    def step_wait(self):
+        if not self._waiting:
+            raise RuntimeError("step_wait called without a pending step_async")
+        results = self._receive_all()
+        self._waiting = False
+        rewards = np.array([r[0] for r in results], dtype=np.float64)
+        terminated = np.array([r[1] for r in results], dtype=bool)
+        truncated = np.array([r[2] for r in results], dtype=bool)
+        # Same info as the single-process envs, so the control loop treats them alike.
+        info = {"images_updated": np.array([r[3] for r in results], dtype=bool)}
+        return self._observation(self._slot), rewards, terminated, truncated, info
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close_extras(self, **kwargs) -> None:
+        if self._closed_pool:
+            return
+        self._closed_pool = True
+        for conn in self._conns:
+            try:
+                conn.send(("close", None, None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._buffers = {}
+        self._actions = None
+        for shm in self._segments:
+            try:
+                shm.close()
+            except BufferError:
+                # Callers still hold observation views; the mapping is released with them.
+                pass
+            shm.unlink()
+        self._segments = []
+
+    # ---- helpers ----
+
+    def _next_slot(self) -> int:
+        self._slot = (self._slot + 1) % self._ring_size
+        return self._slot
+
+    def _observation(self, slot: int) -> dict[str, np.ndarray]:
+        return {key: buffer[slot] for key, buffer in self._buffers.items()}
+
+    def _receive_all(self) -> list[Any]:
+        results = []
+        errors = []
+        for index, conn in enumerate(self._conns):
+            status, payload = conn.recv()
+            if status == "error":
+                errors.append(f"worker {index}:\n{payload}")
+            results.append(payload)
+        if errors:
+            raise RuntimeError("MujocoEnvPool worker failed:\n" + "\n".join(errors))
+        return results
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+from custom_mujoco_env import CustomMujocoEnvConfig
+from mujoco_env_pool import MujocoEnvPool
+
+SIMPLE_MJCF = """
+<mujoco>
+  <worldbody>
+    <body name="body" pos="0 0 1">
+      <joint type="hinge" name="joint1" axis="0 0 1"/>
+      <geom type="capsule" size="0.05 0.2"/>
+    </body>
+  </worldbody>
+  <actuator>
+    <motor joint="joint1" name="motor1"/>
+  </actuator>
+</mujoco>
+"""
+
+
+@pytest.fixture
+def pool():
+    cfg = CustomMujocoEnvConfig(model_xml=SIMPLE_MJCF, image_obs=False)
+    # fork keeps the test fast; the default spawn re-imports lerobot in every worker.
+    pool = MujocoEnvPool(cfg, num_workers=2, ring_size=3, start_method="fork")
+    yield pool
+    pool.close()
+
+
+class TestMujocoEnvPool:
+
+    def test_reset_and_step_shapes(self, pool):
+        obs, _ = pool.reset(seed=0)
+        assert obs["observation.state"].shape == (2, 2)
+
+        obs, rewards, terminated, truncated, _ = pool.step(np.zeros((2, 1)))
+        assert obs["observation.state"].shape == (2, 2)
+        assert rewards.shape == terminated.shape == truncated.shape == (2,)
+
+    def test_observations_are_shared_memory_views(self, pool):
+        pool.reset()
+        obs, *_ = pool.step(np.array([[1.0], [0.0]]))
+
+        state = obs["observation.state"]
+        assert not state.flags.owndata
+        # Only the first worker's motor was driven.
+        assert state[0, 1] != 0.0
+        assert state[1, 1] == 0.0
+
+
+class FakeRenderer:
+    """Deterministic stand-in for mujoco.Renderer (no GL here): frames encode camera, row and qpos."""
+
+    def __init__(self, model, height, width):
+        self._shape = (height, width, 3)
+        self._value = 0
+
+    def update_scene(self, data, camera=-1):
+        self._value = camera * 50 + int(data.qpos[0] * 1e6)
+
+    def render(self, out=None):
+        if out is None:
+            out = np.empty(self._shape, dtype=np.uint8)
+        out[:] = ((np.arange(self._shape[0]) * 3)[:, None, None] + self._value) % 256
+        return out
+
+    def close(self):
+        pass
+
+
+class TestPooledCameraFrames:
+
+    def test_frames_match_single_env(self):
+        from unittest.mock import patch
+
+        from custom_mujoco_env import GenericMujocoEnv, generic_mujoco_env_kwargs
+
+        cfg = CustomMujocoEnvConfig(
+            model_xml=SIMPLE_MJCF,
+            cameras=[{"name": "front", "pos": [0, -1, 1], "width": 8, "height": 6}],
+            image_every_n_steps=2,
+            use_model_cache=False,
+        )
+        rng = np.random.default_rng(0)
+        actions = rng.uniform(-1, 1, (7, 2, 1)).astype(np.float32)  # as the shared action buffer holds them
+        ring_size = 3
+
+        # Patched before the workers fork, so they render with the fake too.
+        with patch("mujoco.Renderer", FakeRenderer):
+            pool = MujocoEnvPool(cfg, num_workers=2, ring_size=ring_size, start_method="fork")
+            singles = [GenericMujocoEnv(**generic_mujoco_env_kwargs(cfg)) for _ in range(2)]
+            try:
+                obs, _ = pool.reset(seed=5)
+                refs = [env.reset(seed=5 + i)[0] for i, env in enumerate(singles)]
+                pooled = [obs]
+                for step_actions in actions:
+                    obs, _, _, _, info = pool.step(step_actions)
+                    steps = [env.step(a) for env, a in zip(singles, step_actions)]
+                    np.testing.assert_array_equal(info["images_updated"], [s[4]["images_updated"] for s in steps])
+                    refs.extend(s[0] for s in steps)
+                    pooled.append(obs)
+
+                    # Ring layout: (ring, workers, h, w, 3), one row per worker.
+                    frames = obs["observation.images.front"]
+                    assert frames.shape == (2, 6, 8, 3)
+                    for i, (ref_obs, *_) in enumerate(steps):
+                        np.testing.assert_array_equal(frames[i], ref_obs["observation.images.front"])
+                        np.testing.assert_array_equal(obs["observation.state"][i], ref_obs["observation.state"])
+
+                    # A view from ring_size - 1 steps ago has not been overwritten yet.
+                    k = len(pooled) - ring_size
+                    if k >= 0:
+                        for i in range(2):
+                            np.testing.assert_array_equal(
+                                pooled[k]["observation.images.front"][i], refs[2 * k + i]["observation.images.front"]
+                            )
+            finally:
+                pool.close()
+                for env in singles:
+                    env.close()
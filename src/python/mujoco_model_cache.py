@@ -0,0 +1,157 @@
+import copy
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+import mujoco
+
+# ---------------------------------------------------------------------------
+# Content-addressed cache of compiled MuJoCo models
+# ---------------------------------------------------------------------------
+#
+# Compiled models are stored as MJB binaries keyed on a hash of the final XML
+# text, the contents of every file it references (includes, meshes, textures,
+# ...) and the MuJoCo version.  An in-process LRU sits on top so repeated env
+# construction in the same process skips even the MJB load.
+
+CACHE_DIR_ENV = "ROBOT_TRAINER_MODEL_CACHE_DIR"
+MEMORY_CACHE_SIZE = 8
+
+_FILE_ATTR_RE = re.compile(r'\bfile\s*=\s*["\']([^"\']+)["\']')
+_COMPILER_DIR_RE = re.compile(r'\b(meshdir|texturedir|assetdir)\s*=\s*["\']([^"\']+)["\']')
+
+_memory_cache: "OrderedDict[str, mujoco.MjModel]" = OrderedDict()
+
+
+def default_cache_dir() -> Path:
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        return Path(override).expanduser()
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(cache_home) / "robot_trainer" / "mujoco_models"
+
+
+def _referenced_files(
+    xml: str, xml_dir: str | None, base_dir: str | None, asset_dirs: list[str]
+) -> tuple[list[Path], list[str]]:
+    """Resolve every file="..." reference in xml; returns (paths found, references not found).
+
+    asset_dirs are the compiler meshdir/texturedir/assetdir values in effect,
+    which MuJoCo applies to references in included files too.
+    """
+    search_dirs = [d for d in (xml_dir, base_dir) if d]
+
+    found: list[Path] = []
+    missing: list[str] = []
+    for ref in _FILE_ATTR_RE.findall(xml):
+        if os.path.isabs(ref):
+            candidates = [Path(ref)]
+        else:
+            candidates = [Path(d) / sub / ref for d in search_dirs for sub in (*asset_dirs, "")]
+        matches = [candidate.resolve() for candidate in candidates if candidate.is_file()]
+        if matches:
+            found.extend(matches)
+        else:
+            missing.append(ref)
+    return found, missing
+
+
+def model_cache_key(xml: str, base_dir: str | None = None) -> str | None:
+    """Hash the XML, the files it references (recursively through includes) and the MuJoCo version.
+
+    base_dir must be the directory the compiler resolves relative paths
+    against (the working directory for XML strings); otherwise edits to those
+    files would not change the key.  Returns None when a referenced file
+    cannot be found, since its contents could not be part of the key.
+    """
+    digest = hashlib.sha256()
+    digest.update(mujoco.mj_versionString().encode())
+    digest.update(xml.encode("utf-8"))
+
+    visited: set[Path] = set()
+    # Compiler dirs declared anywhere apply to the whole model, so they are
+    # carried down to the included files.
+    pending = [(xml, base_dir, [])]
+    while pending:
+        text, text_dir, inherited_dirs = pending.pop()
+        asset_dirs = [*inherited_dirs, *(m.group(2) for m in _COMPILER_DIR_RE.finditer(text))]
+        found, missing = _referenced_files(text, text_dir, base_dir, asset_dirs)
+        if missing:
+            logging.info(f"Not caching model: cannot find referenced file(s) {missing}")
+            return None
+        for path in found:
+            if path in visited:
+                continue
+            visited.add(path)
+            data = path.read_bytes()
+            digest.update(str(path).encode())
+            digest.update(hashlib.sha256(data).digest())
+            if path.suffix.lower() == ".xml":
+                pending.append((data.decode("utf-8", errors="replace"), str(path.parent), asset_dirs))
+    return digest.hexdigest()
+
+
+def load_model_cached(
+    xml: str,
+    compile_fn: Callable[[], mujoco.MjModel],
+    base_dir: str | None = None,
+    cache_dir: Path | None = None,
+) -> mujoco.MjModel:
+    """Return a private copy of the compiled model for xml, compiling with compile_fn on a miss.
+
+    Callers are free to mutate the returned model (timestep, offscreen size, ...)
+    without affecting the cached copy.  Models whose referenced files cannot
+    all be found are compiled every time.
+    """
+    key = model_cache_key(xml, base_dir)
+    if key is None:
+        return compile_fn()
+
+    model = _memory_cache.get(key)
+    if model is not None:
+        _memory_cache.move_to_end(key)
+        return copy.deepcopy(model)
+
+    cache_dir = cache_dir or default_cache_dir()
+    mjb_path = cache_dir / f"{key}.mjb"
+    if mjb_path.is_file():
+        try:
+            model = mujoco.MjModel.from_binary_path(str(mjb_path))
+            logging.info(f"Loaded compiled model from cache: {mjb_path}")
+        except Exception as e:
+            logging.warning(f"Discarding unreadable cached model {mjb_path}: {e}")
+            mjb_path.unlink(missing_ok=True)
+
+    if model is None:
+        model = compile_fn()
+        _save_mjb(model, mjb_path)
+
+    _memory_cache[key] = model
+    while len(_memory_cache) > MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+    return copy.deepcopy(model)
+
+
+def clear_memory_cache() -> None:
+    _memory_cache.clear()
+
+
+def _save_mjb(model: mujoco.MjModel, mjb_path: Path) -> None:
+    try:
+        mjb_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file first so concurrent pool workers never read a partial MJB.
+        fd, temp_path = tempfile.mkstemp(suffix=".mjb.tmp", dir=mjb_path.parent)
+        os.close(fd)
+        try:
+            mujoco.mj_saveModel(model, temp_path, None)
+            os.replace(temp_path, mjb_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+    except OSError as e:
+        logging.warning(f"Could not write model cache entry {mjb_path}: {e}")
@@ -0,0 +1,86 @@
+from unittest.mock import MagicMock
+
+import mujoco
+import pytest
+
+import mujoco_model_cache as mmc
+
+SIMPLE_MJCF = """
+<mujoco>
+  <worldbody>
+    <body name="body" pos="0 0 1">
+      <joint type="hinge" name="joint1" axis="0 0 1"/>
+      <geom type="capsule" size="0.05 0.2"/>
+    </body>
+  </worldbody>
+</mujoco>
+"""
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(mmc.CACHE_DIR_ENV, str(tmp_path / "cache"))
+    mmc.clear_memory_cache()
+    yield tmp_path / "cache"
+    mmc.clear_memory_cache()
+
+
+class TestModelCache:
+
+    def test_compiles_once_and_writes_mjb(self, isolated_cache):
+        compile_fn = MagicMock(side_effect=lambda: mujoco.MjModel.from_xml_string(SIMPLE_MJCF))
+
+        first = mmc.load_model_cached(SIMPLE_MJCF, compile_fn)
+        second = mmc.load_model_cached(SIMPLE_MJCF, compile_fn)
+
+        compile_fn.assert_called_once()
+        assert first.njnt == second.njnt == 1
+        assert len(list(isolated_cache.glob("*.mjb"))) == 1
+
+    def test_returns_private_copies(self):
+        compile_fn = lambda: mujoco.MjModel.from_xml_string(SIMPLE_MJCF)
+        first = mmc.load_model_cached(SIMPLE_MJCF, compile_fn)
+        first.opt.timestep = 0.5
+        second = mmc.load_model_cached(SIMPLE_MJCF, compile_fn)
+        assert second.opt.timestep != 0.5
+
+    def test_disk_hit_skips_compilation(self):
+        mmc.load_model_cached(SIMPLE_MJCF, lambda: mujoco.MjModel.from_xml_string(SIMPLE_MJCF))
+        mmc.clear_memory_cache()
+
+        compile_fn = MagicMock()
+        model = mmc.load_model_cached(SIMPLE_MJCF, compile_fn)
+        compile_fn.assert_not_called()
+        assert model.njnt == 1
+
+    def test_key_tracks_included_files(self, tmp_path):
+        robot = tmp_path / "robot.xml"
+        robot.write_text("<mujoco><worldbody><body><joint/><geom size='0.1'/></body></worldbody></mujoco>")
+        scene = f'<mujoco><include file="{robot}"/></mujoco>'
+
+        before = mmc.model_cache_key(scene, str(tmp_path))
+        robot.write_text("<mujoco><worldbody><body><joint/><geom size='0.2'/></body></worldbody></mujoco>")
+        after = mmc.model_cache_key(scene, str(tmp_path))
+        assert before != after
+
+    def test_key_applies_parent_meshdir_to_included_files(self, tmp_path):
+        (tmp_path / "meshes").mkdir()
+        mesh = tmp_path / "meshes" / "link.obj"
+        mesh.write_text("v 0 0 0\nv 1 0 0\nv 0 1 0\nv 0 0 1\nf 1 2 3\nf 1 2 4\nf 1 3 4\nf 2 3 4\n")
+        (tmp_path / "robot.xml").write_text('<mujoco><asset><mesh file="link.obj"/></asset></mujoco>')
+        scene = '<mujoco><compiler meshdir="meshes"/><include file="robot.xml"/></mujoco>'
+
+        before = mmc.model_cache_key(scene, str(tmp_path))
+        mesh.write_text("v 0 0 0\nv 2 0 0\nv 0 2 0\nv 0 0 2\nf 1 2 3\nf 1 2 4\nf 1 3 4\nf 2 3 4\n")
+        after = mmc.model_cache_key(scene, str(tmp_path))
+        assert before is not None and before != after
+
+    def test_unresolved_reference_is_not_cached(self, tmp_path, isolated_cache):
+        scene = '<mujoco><asset><mesh file="missing.stl"/></asset></mujoco>'
+        assert mmc.model_cache_key(scene, str(tmp_path)) is None
+
+        compile_fn = MagicMock(side_effect=lambda: mujoco.MjModel.from_xml_string(SIMPLE_MJCF))
+        mmc.load_model_cached(scene, compile_fn, base_dir=str(tmp_path))
+        mmc.load_model_cached(scene, compile_fn, base_dir=str(tmp_path))
+        assert compile_fn.call_count == 2
+        assert not isolated_cache.exists() or not any(isolated_cache.iterdir())
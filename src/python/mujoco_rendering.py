@@ -0,0 +1,144 @@
+import logging
+from dataclasses import dataclass
+
+import mujoco
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Multi-camera offscreen rendering
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class CameraView:
+    """A camera to render and the resolution to render it at."""
+    camera_id: int      # MuJoCo camera id, -1 for the free camera
+    height: int
+    width: int
+
+
+class MultiCameraRenderer:
+    """Renders several cameras with one mujoco.Renderer per distinct resolution.
+
+    Every camera owns preallocated RGB (and optionally depth / segmentation)
+    buffers that are rendered into in place.  ``render`` returns those buffers,
+    so their contents are only valid until the next call unless the caller
+    passes its own ``out`` arrays.
+    """
+
+    def __init__(
+        self,
+        model: mujoco.MjModel,
+        views: list[CameraView],
+        depth: bool = False,
+        segmentation: bool = False,
+    ):
+        self._model = model
+        self._views = list(views)
+        self._depth = depth
+        self._segmentation = segmentation
+        self._renderers: dict[tuple[int, int], mujoco.Renderer] = {}
+
+        self._allocate_buffers()
+
+    def _allocate_buffers(self) -> None:
+        views = self._views
+        self.rgb = [np.zeros((v.height, v.width, 3), dtype=np.uint8) for v in views]
+        self.depth = [np.zeros((v.height, v.width), dtype=np.float32) for v in views] if self._depth else []
+        self.segmentation = (
+            [np.zeros((v.height, v.width, 2), dtype=np.int32) for v in views] if self._segmentation else []
+        )
+        # In segmentation mode mujoco.Renderer reads the raw id colours into an
+        # (h, w, 3) uint8 array and returns the decoded (h, w, 2) ids as a new
+        # array, so the colours go through one scratch buffer per resolution.
+        self._segmentation_scratch = (
+            {(v.height, v.width): np.zeros((v.height, v.width, 3), dtype=np.uint8) for v in views}
+            if self._segmentation else {}
+        )
+
+        # The offscreen framebuffer must fit the largest requested camera.
+        if views:
+            model = self._model
+            model.vis.global_.offwidth = max(model.vis.global_.offwidth, max(v.width for v in views))
+            model.vis.global_.offheight = max(model.vis.global_.offheight, max(v.height for v in views))
+
+    @property
+    def views(self) -> list[CameraView]:
+        return self._views
+
+    def set_views(self, views: list[CameraView]) -> None:
+        """Switch to a new camera list, keeping the renderers for resolutions still in use.
+
+        Renderers (each with its own GL context) are the expensive part, so
+        only those for resolutions no longer needed are closed; renderers for
+        new resolutions are created on the next render.
+        """
+        self._views = list(views)
+        self._allocate_buffers()
+        sizes = {(v.height, v.width) for v in self._views}
+        for key in [key for key in self._renderers if key not in sizes]:
+            self._close_renderer(self._renderers.pop(key))
+
+    def _renderer_for(self, view: CameraView) -> mujoco.Renderer:
+        key = (view.height, view.width)
+        renderer = self._renderers.get(key)
+        if renderer is None:
+            renderer = mujoco.Renderer(model=self._model, height=view.height, width=view.width)
+            self._renderers[key] = renderer
+        return renderer
+
+    def render(self, data: mujoco.MjData, out: list[np.ndarray] | None = None) -> list[np.ndarray]:
+        """Render every camera's RGB (plus depth/segmentation if enabled) for data."""
+        rgb_out = out if out is not None else self.rgb
+        for i, view in enumerate(self._views):
+            renderer = self._renderer_for(view)
+            renderer.update_scene(data, camera=view.camera_id)
+            renderer.render(out=rgb_out[i])
+            if self._depth:
+                renderer.enable_depth_rendering()
+                renderer.render(out=self.depth[i])
+                renderer.disable_depth_rendering()
+            if self._segmentation:
+                renderer.enable_segmentation_rendering()
+                scratch = self._segmentation_scratch[(view.height, view.width)]
+                np.copyto(self.segmentation[i], renderer.render(out=scratch))
+                renderer.disable_segmentation_rendering()
+        return rgb_out
+
+    @staticmethod
+    def _close_renderer(renderer: mujoco.Renderer) -> None:
+        if hasattr(renderer, "close") and callable(renderer.close):
+            try:
+                renderer.close()
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        for renderer in self._renderers.values():
+            self._close_renderer(renderer)
+        self._renderers.clear()
+
+
+# ---------------------------------------------------------------------------
+# Process-wide GL context
+# ---------------------------------------------------------------------------
+
+_warm_gl_context = None
+
+
+def keep_gl_context_warm(width: int = 64, height: int = 64) -> bool:
+    """Create and hold one offscreen GL context for the rest of the process.
+
+    Loading the EGL/OSMesa driver and initializing its display is the slow part
+    of creating the first mujoco.Renderer. Holding a context keeps that state
+    alive, so a long-lived worker creates later renderers cheaply. Returns
+    False when no GL backend is available.
+    """
+    global _warm_gl_context
+    if _warm_gl_context is None:
+        try:
+            _warm_gl_context = mujoco.GLContext(width, height)
+        except Exception as e:
+            logging.warning(f"Could not create a GL context to keep warm: {e}")
+            return False
+    return True
@@ -0,0 +1,144 @@
+import functools
+import os
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+import mujoco
+import numpy as np
+import pytest
+
+from custom_mujoco_env import GenericMujocoEnv
+from mujoco_rendering import CameraView, MultiCameraRenderer
+
+SIMPLE_MJCF = """
+<mujoco>
+  <worldbody>
+    <camera name="cam1" pos="1 0 1"/>
+    <camera name="cam2" pos="0 1 1"/>
+    <body name="body" pos="0 0 1">
+      <joint type="hinge" name="joint1" axis="0 0 1"/>
+      <geom type="capsule" size="0.05 0.2"/>
+    </body>
+  </worldbody>
+</mujoco>
+"""
+
+
+@pytest.fixture
+def model():
+    return mujoco.MjModel.from_xml_string(SIMPLE_MJCF)
+
+
+class TestMultiCameraRenderer:
+
+    def test_one_renderer_per_resolution(self, model):
+        views = [CameraView(0, 64, 64), CameraView(1, 64, 64), CameraView(-1, 120, 160)]
+        with patch("mujoco.Renderer") as mock_renderer:
+            renderer = MultiCameraRenderer(model, views)
+            frames = renderer.render(mujoco.MjData(model))
+
+        assert mock_renderer.call_count == 2
+        assert [f.shape for f in frames] == [(64, 64, 3), (64, 64, 3), (120, 160, 3)]
+        # The offscreen buffer is grown to fit the largest camera.
+        assert model.vis.global_.offwidth >= 160
+        assert model.vis.global_.offheight >= 120
+
+    def test_renders_in_place(self, model):
+        with patch("mujoco.Renderer") as mock_renderer:
+            renderer = MultiCameraRenderer(model, [CameraView(0, 32, 32)], depth=True)
+            first = renderer.render(mujoco.MjData(model))
+            second = renderer.render(mujoco.MjData(model))
+
+            instance = mock_renderer.return_value
+            assert instance.render.call_args_list[0].kwargs["out"] is renderer.rgb[0]
+            assert instance.render.call_args_list[1].kwargs["out"] is renderer.depth[0]
+            instance.enable_depth_rendering.assert_called()
+
+        assert first[0] is second[0] is renderer.rgb[0]
+
+    def test_caller_owned_output(self, model):
+        out = [np.empty((32, 32, 3), dtype=np.uint8)]
+        with patch("mujoco.Renderer"):
+            renderer = MultiCameraRenderer(model, [CameraView(0, 32, 32)])
+            frames = renderer.render(mujoco.MjData(model), out=out)
+        assert frames[0] is out[0]
+
+    def test_set_views_keeps_renderers_still_in_use(self, model):
+        with patch("mujoco.Renderer", side_effect=lambda **kwargs: MagicMock()):
+            renderer = MultiCameraRenderer(model, [CameraView(0, 32, 32), CameraView(1, 48, 64)])
+            renderer.render(mujoco.MjData(model))
+            kept, dropped = renderer._renderers[(32, 32)], renderer._renderers[(48, 64)]
+
+            renderer.set_views([CameraView(0, 32, 32), CameraView(1, 96, 128)])
+            frames = renderer.render(mujoco.MjData(model))
+
+        assert renderer._renderers[(32, 32)] is kept
+        dropped.close.assert_called_once()
+        assert set(renderer._renderers) == {(32, 32), (96, 128)}
+        assert [f.shape for f in frames] == [(32, 32, 3), (96, 128, 3)]
+        assert model.vis.global_.offwidth >= 128
+
+    def test_segmentation_decoded_from_returned_ids(self, model):
+        ids = np.full((32, 32, 2), 7, dtype=np.int32)
+        with patch("mujoco.Renderer") as mock_renderer:
+            mock_renderer.return_value.render.return_value = ids
+            renderer = MultiCameraRenderer(model, [CameraView(0, 32, 32)], segmentation=True)
+            renderer.render(mujoco.MjData(model))
+
+            seg_out = mock_renderer.return_value.render.call_args_list[1].kwargs["out"]
+        # The renderer wants an (h, w, 3) uint8 colour buffer and returns the ids separately.
+        assert seg_out.shape == (32, 32, 3) and seg_out.dtype == np.uint8
+        np.testing.assert_array_equal(renderer.segmentation[0], ids)
+
+
+@functools.cache
+def _gl_available() -> bool:
+    # Probed in a subprocess, since a failed GL context creation can abort the
+    # process, using the backend this process loaded (fixed at mujoco import).
+    backend = mujoco.GLContext.__module__.rsplit(".", 1)[-1]
+    probe = (
+        "import mujoco; m = mujoco.MjModel.from_xml_string(%r); r = mujoco.Renderer(m, 32, 32); "
+        "r.update_scene(mujoco.MjData(m)); r.enable_segmentation_rendering(); "
+        "assert (r.render()[..., 0] == 0).any()" % SIMPLE_MJCF
+    )
+    try:
+        result = subprocess.run(
+            [sys.executable, "-c", probe], env={**os.environ, "MUJOCO_GL": backend}, capture_output=True, timeout=120
+        )
+    except subprocess.TimeoutExpired:
+        return False
+    return result.returncode == 0
+
+
+requires_gl = pytest.mark.skipif(not _gl_available(), reason="No OpenGL context available")
+
+
+@requires_gl
+class TestRealRendering:
+
+    def test_segmentation_and_depth(self, model):
+        data = mujoco.MjData(model)
+        mujoco.mj_forward(model, data)
+        renderer = MultiCameraRenderer(model, [CameraView(-1, 48, 64)], depth=True, segmentation=True)
+        try:
+            renderer.render(data)
+        finally:
+            renderer.close()
+
+        seg = renderer.segmentation[0]
+        assert seg.shape == (48, 64, 2) and seg.dtype == np.int32
+        # The free camera frames the whole model: the capsule (geom 0) and background (-1).
+        assert set(np.unique(seg[..., 0])) == {-1, 0}
+        assert renderer.depth[0].shape == (48, 64)
+        assert renderer.rgb[0].any()
+
+    def test_env_reset_with_segmentation(self):
+        env = GenericMujocoEnv(model_xml=SIMPLE_MJCF, render_segmentation=True, use_model_cache=False)
+        try:
+            obs, _ = env.reset()
+        finally:
+            env.close()
+        seg = obs["observation.segmentation.free"]
+        assert seg.shape == env.observation_space["observation.segmentation.free"].shape
+        assert seg.dtype == np.int32
@@ -0,0 +1,170 @@
+from dataclasses import dataclass, field
+
+import mujoco
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Flat simulation state snapshots
+# ---------------------------------------------------------------------------
+#
+# mj_getState/mj_setState pack everything needed to continue a simulation
+# bit-for-bit (time, qpos, qvel, act, warmstart, ctrl, mocap, user data, ...)
+# into one float64 vector, so a snapshot is a single array copy and restoring
+# it does not depend on how the episode got there.
+
+STATE_SPEC = mujoco.mjtState.mjSTATE_INTEGRATION
+
+
+def state_size(model: mujoco.MjModel) -> int:
+    return mujoco.mj_stateSize(model, STATE_SPEC)
+
+
+def get_state(model: mujoco.MjModel, data: mujoco.MjData, out: np.ndarray | None = None) -> np.ndarray:
+    """The full integration state of data as a flat float64 array (written into out if given)."""
+    if out is None:
+        out = np.empty(state_size(model), dtype=np.float64)
+    mujoco.mj_getState(model, data, out, STATE_SPEC)
+    return out
+
+
+def set_state(model: mujoco.MjModel, data: mujoco.MjData, state: np.ndarray) -> None:
+    """Restore a state from get_state and recompute derived quantities (poses, contacts, sensors)."""
+    state = np.asarray(state, dtype=np.float64)
+    if state.shape != (state_size(model),):
+        raise ValueError(f"State has shape {state.shape}, this model needs ({state_size(model)},)")
+    mujoco.mj_setState(model, data, state, STATE_SPEC)
+    mujoco.mj_forward(model, data)
+
+
+class StateRing:
+    """Fixed-capacity ring of recent states, preallocated; index -1 is the newest."""
+
+    def __init__(self, model: mujoco.MjModel, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        self._model = model
+        self._states = np.zeros((capacity, state_size(model)), dtype=np.float64)
+        self._next = 0      # slot the next push writes to
+        self._count = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._states.shape[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def push(self, data: mujoco.MjData) -> None:
+        """Record data's current state, overwriting the oldest once full."""
+        get_state(self._model, data, out=self._states[self._next])
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        """A view of the i-th stored state (0 is the oldest, -1 the newest)."""
+        if not -self._count <= i < self._count:
+            raise IndexError(f"Snapshot {i} out of range ({self._count} stored)")
+        if i < 0:
+            i += self._count
+        return self._states[(self._next - self._count + i) % self.capacity]
+
+    def discard_newest(self, n: int) -> None:
+        """Forget the n newest states, e.g. after rewinding past them."""
+        n = min(max(n, 0), self._count)
+        self._next = (self._next - n) % self.capacity
+        self._count -= n
+
+    def clear(self) -> None:
+        self._next = 0
+        self._count = 0
+
+
+# ---------------------------------------------------------------------------
+# Randomized reset states
+# ---------------------------------------------------------------------------
+#
+# Reset states are sampled up front in large batches with vectorized NumPy,
+# so an individual reset is one set_state copy. The draws come from the
+# env's seeded RandomState, which keeps runs reproducible.
+
+
+@dataclass
+class ResetDistribution:
+    """Randomized initial states; ranges are uniform half-widths and 0 disables a term."""
+    joint_noise: float = 0.0        # added to every controllable joint (rad or m), clipped to its range
+    use_keyframes: bool = False     # start from a uniformly chosen keyframe instead of the home pose
+    # Free-joint (object) perturbations: world-frame position offsets in m, and yaw in rad.
+    object_pos_noise: list[float] = field(default_factory=lambda: [0.0, 0.0, 0.0])
+    object_yaw_noise: float = 0.0
+    batch_size: int = 10000         # states sampled per refill
+
+
+class ResetSampler:
+    """Serves reset states drawn from a ResetDistribution around one or more base states."""
+
+    def __init__(
+        self,
+        model: mujoco.MjModel,
+        base_states: np.ndarray,
+        joint_ids: np.ndarray,
+        distribution: ResetDistribution,
+    ):
+        if distribution.batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {distribution.batch_size}")
+        self._base_states = np.atleast_2d(np.asarray(base_states, dtype=np.float64))
+        self._distribution = distribution
+        # Integration states start with time, then qpos.
+        qpos_start = mujoco.mj_stateSize(model, mujoco.mjtState.mjSTATE_TIME)
+        self._qpos = slice(qpos_start, qpos_start + model.nq)
+
+        joint_ids = np.asarray(joint_ids, dtype=np.int64)
+        self._joint_qposadr = model.jnt_qposadr[joint_ids]
+        limited = model.jnt_limited[joint_ids].astype(bool)
+        self._joint_low = np.where(limited, model.jnt_range[joint_ids, 0], -np.inf)
+        self._joint_high = np.where(limited, model.jnt_range[joint_ids, 1], np.inf)
+        self._free_qposadr = model.jnt_qposadr[model.jnt_type == mujoco.mjtJoint.mjJNT_FREE]
+
+        self._batch: np.ndarray | None = None
+        self._cursor = 0
+
+    def sample(self, n: int, rng: np.random.RandomState) -> np.ndarray:
+        """Draw n states as an (n, state_size) array."""
+        dist = self._distribution
+        states = self._base_states[rng.randint(len(self._base_states), size=n)]
+        qpos = states[:, self._qpos]
+
+        if dist.joint_noise > 0 and len(self._joint_qposadr):
+            noisy = qpos[:, self._joint_qposadr] + rng.uniform(
+                -dist.joint_noise, dist.joint_noise, size=(n, len(self._joint_qposadr))
+            )
+            qpos[:, self._joint_qposadr] = np.clip(noisy, self._joint_low, self._joint_high)
+
+        if len(self._free_qposadr):
+            pos_noise = np.asarray(dist.object_pos_noise, dtype=np.float64)
+            if np.any(pos_noise > 0):
+                pos = self._free_qposadr[:, None] + np.arange(3)
+                qpos[:, pos] += rng.uniform(-1.0, 1.0, size=(n, len(self._free_qposadr), 3)) * pos_noise
+            if dist.object_yaw_noise > 0:
+                quat = self._free_qposadr[:, None] + np.arange(3, 7)
+                half = rng.uniform(-dist.object_yaw_noise, dist.object_yaw_noise, size=(n, len(quat))) / 2
+                qpos[:, quat] = _rotate_about_z(qpos[:, quat], np.cos(half), np.sin(half))
+        return states
+
+    def next(self, rng: np.random.RandomState) -> np.ndarray:
+        """The next reset state, refilling the batch when it runs out."""
+        if self._batch is None or self._cursor == len(self._batch):
+            self._batch = self.sample(self._distribution.batch_size, rng)
+            self._cursor = 0
+        state = self._batch[self._cursor]
+        self._cursor += 1
+        return state
+
+    def clear(self) -> None:
+        """Drop the remaining batch, e.g. after reseeding."""
+        self._batch = None
+
+
+def _rotate_about_z(quat: np.ndarray, c: np.ndarray, s: np.ndarray) -> np.ndarray:
+    """Left-multiply [w, x, y, z] quaternions by the world z-rotations [c, 0, 0, s]."""
+    w, x, y, z = np.moveaxis(quat, -1, 0)
+    return np.stack([c * w - s * z, c * x - s * y, c * y + s * x, c * z + s * w], axis=-1)
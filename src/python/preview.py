@@ -0,0 +1,320 @@
+import asyncio
+import functools
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+import cv2
+import numpy as np
+
+from video_frames import EncodedFrame, pack_frame_batch
+
+# ---------------------------------------------------------------------------
+# Live preview encoding
+# ---------------------------------------------------------------------------
+
+
+def image_to_uint8_hwc(value: Any) -> np.ndarray | None:
+    """Convert an observation image (torch/numpy, CHW/HWC, float/uint8, batched or not) to HWC uint8."""
+    img_np = None
+    # Not imported here: the preview server starts before torch is loaded, and
+    # a tensor can only exist once something else imported it.
+    torch = sys.modules.get("torch")
+
+    if torch is not None and isinstance(value, torch.Tensor):
+        # Remove batch dimension if present and move to CPU
+        img = value.detach()
+        if img.dim() == 4 and img.shape[0] == 1:
+            img = img.squeeze(0)
+        img = img.cpu()
+        # Handle CHW -> HWC conversion if needed
+        if img.dim() == 3 and img.shape[0] in (1, 3):
+            img = img.permute(1, 2, 0)
+
+        img_np = img.numpy()
+    elif isinstance(value, np.ndarray):
+        img_np = value
+        if img_np.ndim == 4:
+            img_np = img_np[0]
+        # Handle CHW -> HWC? Mujoco gives HWC.
+        if img_np.ndim == 3 and img_np.shape[0] in (1, 3):
+            img_np = np.transpose(img_np, (1, 2, 0))
+
+    if img_np is None:
+        return None
+
+    # Convert from float [0, 1] to uint8 [0, 255]
+    if np.issubdtype(img_np.dtype, np.floating) and img_np.max() <= 1.0:
+        img_np = (img_np * 255).clip(0, 255)
+
+    return img_np.astype(np.uint8)
+
+
+def encode_jpeg_frame(
+    camera_name: str, img_rgb: np.ndarray, quality: int = 80, scale: float = 1.0
+) -> EncodedFrame:
+    """JPEG-encode an HWC uint8 RGB image for the preview channel, optionally downscaled."""
+    if scale < 1.0:
+        img_rgb = cv2.resize(img_rgb, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    img_bgr = img_rgb
+    # Convert RGB to BGR for cv2 JPEG encoding
+    if img_rgb.ndim == 3 and img_rgb.shape[-1] == 3:
+        img_bgr = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2BGR)
+    _, buffer = cv2.imencode('.jpg', img_bgr, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    return EncodedFrame(camera_name, img_rgb.shape[1], img_rgb.shape[0], buffer.tobytes())
+
+
+@dataclass
+class PreviewSubscription:
+    """What a single preview client asked for."""
+    cameras: list[str] | None = None    # observation keys or bare camera names; None = all
+    max_fps: float = 30.0
+    scale: float = 1.0                  # downscale factor in (0, 1]
+    quality: int = 80                   # JPEG quality
+
+    def __post_init__(self):
+        self.max_fps = max(float(self.max_fps), 0.5)
+        self.scale = min(max(float(self.scale), 0.05), 1.0)
+        self.quality = min(max(int(self.quality), 10), 100)
+
+
+class _PreviewClient:
+    """Per-client stream state: effective rate/quality and unacknowledged frames."""
+
+    MAX_OUTSTANDING = 2         # batches sent but not yet acknowledged
+    ACK_TIMEOUT_S = 2.0         # an ack that never arrives counts as a lost frame
+    ADJUST_INTERVAL_S = 0.5     # minimum time between quality/fps changes
+    RECOVER_AFTER_ACKS = 30     # clean acks before stepping back up
+    MIN_QUALITY = 30
+    MIN_FPS = 1.0
+
+    def __init__(self, sid: str, subscription: PreviewSubscription):
+        self.sid = sid
+        self.subscription = subscription
+        self.quality = subscription.quality
+        self.fps = subscription.max_fps
+        self.dropped = 0
+        self._in_flight: dict[int, float] = {}     # batch sequence -> send time, oldest first
+        self._next_sequence = 0
+        self._last_sent = float("-inf")
+        self._last_adjust = float("-inf")
+        self._clean_acks = 0
+
+    def wants(self, key: str) -> bool:
+        cameras = self.subscription.cameras
+        return cameras is None or any(key == cam or key.endswith(f".{cam}") for cam in cameras)
+
+    def ready(self, now: float) -> bool:
+        """Whether this client should get the current step, applying backpressure."""
+        for sequence, sent in list(self._in_flight.items()):
+            if now - sent <= self.ACK_TIMEOUT_S:
+                break
+            del self._in_flight[sequence]
+            self._degrade(now)
+        if now - self._last_sent < 1.0 / self.fps:
+            return False
+        if len(self._in_flight) >= self.MAX_OUTSTANDING:
+            self.dropped += 1
+            self._degrade(now)
+            return False
+        return True
+
+    def on_sent(self, now: float) -> int:
+        """Track a batch sent at now; returns the sequence number its ack must carry."""
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        self._in_flight[sequence] = now
+        self._last_sent = now
+        return sequence
+
+    def on_ack(self, sequence: int, *_args) -> None:
+        # A late ack for a batch already counted as lost must not retire a newer one.
+        if self._in_flight.pop(sequence, None) is None:
+            return
+        if self._in_flight:
+            return
+        self._clean_acks += 1
+        if self._clean_acks >= self.RECOVER_AFTER_ACKS:
+            self._clean_acks = 0
+            self._recover()
+
+    def _degrade(self, now: float) -> None:
+        self._clean_acks = 0
+        if now - self._last_adjust < self.ADJUST_INTERVAL_S:
+            return
+        self._last_adjust = now
+        if self.quality > self.MIN_QUALITY:
+            self.quality = max(self.MIN_QUALITY, self.quality - 10)
+        else:
+            self.fps = max(self.MIN_FPS, self.fps / 2)
+
+    def _recover(self) -> None:
+        if self.fps < self.subscription.max_fps:
+            self.fps = min(self.subscription.max_fps, self.fps * 2)
+        elif self.quality < self.subscription.quality:
+            self.quality = min(self.subscription.quality, self.quality + 10)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "fps": self.fps,
+            "quality": self.quality,
+            "scale": self.subscription.scale,
+            "outstanding": len(self._in_flight),
+            "dropped": self.dropped,
+        }
+
+
+class PreviewEncoder:
+    """Encodes preview frames off the event loop with latest-frame-wins semantics.
+
+    ``submit`` never blocks: it parks each camera's newest image in a pending
+    slot and returns.  A single background task converts and JPEG-encodes the
+    pending images on a thread pool (cv2 releases the GIL) and emits them as
+    one batch.  A camera image that is replaced before it was picked up is
+    dropped and counted rather than queued.
+
+    Clients that ``subscribe`` get their own stream (camera subset, max fps,
+    scale, quality) sent only to them with an ack callback; while a client has
+    too many unacknowledged batches it is skipped and its quality, then fps,
+    is lowered, and restored once it keeps up again.  Clients that never
+    subscribed receive the full-resolution broadcast.  Each distinct
+    (camera, scale, quality) is encoded once per step however many clients
+    share it.
+
+    Nothing is converted or encoded while no client is connected (see
+    ``enabled``); ``client_connected`` turns the preview back on immediately.
+
+    Submitted arrays/tensors are read later from a worker thread, so callers
+    must not modify them in place after submitting.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[..., Awaitable[Any]],
+        max_workers: int = 2,
+        quality: int = 80,
+    ):
+        self._emit = emit
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="preview-encode")
+        self.quality = quality
+        self._connected: set[str] = set()
+        self._clients: dict[str, _PreviewClient] = {}
+        self._pending: dict[str, Any] = {}
+        self._pending_step = 0
+        self._pending_timestamp = 0.0
+        self._task: asyncio.Task | None = None
+        self.submitted_frames = 0
+        self.encoded_frames = 0
+        self.dropped_frames = 0
+        self.dropped_per_camera: dict[str, int] = {}
+
+    # ---- clients ----
+
+    @property
+    def enabled(self) -> bool:
+        """Whether anyone is watching; callers skip collecting images when False."""
+        return bool(self._connected)
+
+    def client_connected(self, sid: str) -> None:
+        self._connected.add(sid)
+
+    def client_disconnected(self, sid: str) -> None:
+        self._connected.discard(sid)
+        self._clients.pop(sid, None)
+        if not self._connected:
+            # Frames parked for a viewer that is gone are never worth encoding.
+            self._pending.clear()
+
+    def subscribe(self, sid: str, subscription: PreviewSubscription) -> None:
+        self._connected.add(sid)
+        self._clients[sid] = _PreviewClient(sid, subscription)
+
+    def unsubscribe(self, sid: str) -> None:
+        self._clients.pop(sid, None)
+
+    # ---- frames ----
+
+    def submit(self, step: int, images: dict[str, Any]) -> None:
+        """Queue the newest image of each camera; must be called from the event loop."""
+        if not self.enabled:
+            return
+        for key, value in images.items():
+            if key in self._pending:
+                self.dropped_frames += 1
+                self.dropped_per_camera[key] = self.dropped_per_camera.get(key, 0) + 1
+            self._pending[key] = value
+            self.submitted_frames += 1
+        self._pending_step = step
+        self._pending_timestamp = time.time()
+
+        if self._pending and (self._task is None or self._task.done()):
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            pending, self._pending = self._pending, {}
+            step, timestamp = self._pending_step, self._pending_timestamp
+            try:
+                now = time.monotonic()
+                # (sid or None for the broadcast, [(key, scale, quality), ...])
+                deliveries: list[tuple[str | None, list[tuple[str, float, int]]]] = []
+                if self._connected - self._clients.keys():
+                    deliveries.append((None, [(key, 1.0, self.quality) for key in pending]))
+                for client in list(self._clients.values()):
+                    keys = [key for key in pending if client.wants(key)]
+                    if keys and client.ready(now):
+                        specs = [(key, client.subscription.scale, client.quality) for key in keys]
+                        deliveries.append((client.sid, specs))
+
+                jobs = list({spec for _, specs in deliveries for spec in specs})
+                results = await asyncio.gather(*(
+                    loop.run_in_executor(self._executor, self._encode, key, pending[key], scale, quality)
+                    for key, scale, quality in jobs
+                ))
+                encoded = dict(zip(jobs, results))
+                self.encoded_frames += sum(frame is not None for frame in results)
+
+                for sid, specs in deliveries:
+                    frames = [encoded[spec] for spec in specs if encoded[spec] is not None]
+                    if not frames:
+                        continue
+                    message = pack_frame_batch(step, timestamp, frames)
+                    if sid is None:
+                        await self._emit(message, skip_sid=list(self._clients) or None)
+                        continue
+                    client = self._clients.get(sid)
+                    if client is None:
+                        continue
+                    sequence = client.on_sent(now)
+                    # Socket.IO routes each ack to its own callback, which carries the sequence.
+                    await self._emit(message, to=sid, callback=functools.partial(client.on_ack, sequence))
+            except Exception as e:
+                logging.warning(f"Preview encoding failed: {e}")
+
+    def _encode(self, key: str, value: Any, scale: float = 1.0, quality: int | None = None) -> EncodedFrame | None:
+        img_np = image_to_uint8_hwc(value)
+        if img_np is None:
+            return None
+        return encode_jpeg_frame(key, img_np, self.quality if quality is None else quality, scale)
+
+    async def drain(self) -> None:
+        """Wait until every pending image has been encoded and emitted."""
+        while self._task is not None and not self._task.done():
+            await self._task
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "submitted": self.submitted_frames,
+            "encoded": self.encoded_frames,
+            "dropped": self.dropped_frames,
+            "dropped_per_camera": dict(self.dropped_per_camera),
+            "pending": len(self._pending),
+            "clients": {sid: client.stats() for sid, client in self._clients.items()},
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
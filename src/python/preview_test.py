@@ -0,0 +1,155 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+import torch
+
+from preview import PreviewEncoder, PreviewSubscription, image_to_uint8_hwc
+from video_frames import unpack_frame_batch
+
+
+class TestImageConversion:
+
+    def test_batched_float_chw_tensor(self):
+        img = image_to_uint8_hwc(torch.ones(1, 3, 4, 6))
+        assert img.shape == (4, 6, 3)
+        assert img.dtype == np.uint8
+        assert img.max() == 255
+
+    def test_hwc_uint8_array_passthrough(self):
+        frame = np.full((4, 6, 3), 7, dtype=np.uint8)
+        np.testing.assert_array_equal(image_to_uint8_hwc(frame), frame)
+
+
+class TestPreviewEncoder:
+
+    @pytest.mark.asyncio
+    async def test_latest_frame_wins(self):
+        emit = AsyncMock()
+        encoder = PreviewEncoder(emit=emit)
+        encoder.client_connected("viewer")
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+        # Three submissions before the loop gets a chance to run the encoder:
+        # only the newest survives, the other two are counted as dropped.
+        for step in range(3):
+            encoder.submit(step, {"observation.images.front": frame})
+        await encoder.drain()
+
+        emit.assert_awaited_once()
+        step, _, _, frames = unpack_frame_batch(emit.call_args[0][0])
+        assert step == 2
+        assert len(frames) == 1
+        assert encoder.dropped_frames == 2
+        assert encoder.dropped_per_camera == {"observation.images.front": 2}
+        encoder.close()
+
+    @pytest.mark.asyncio
+    async def test_submit_does_not_block_on_encoding(self):
+        release = asyncio.Event()
+
+        async def slow_emit(message, **kwargs):
+            await release.wait()
+
+        encoder = PreviewEncoder(emit=slow_emit)
+        encoder.client_connected("viewer")
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        encoder.submit(0, {"cam": frame})
+        await asyncio.sleep(0.05)
+        # Emission is stuck, yet submitting returns immediately and parks the frame.
+        encoder.submit(1, {"cam": frame})
+        assert encoder.stats()["pending"] == 1
+
+        release.set()
+        await encoder.drain()
+        assert encoder.encoded_frames == 2
+        encoder.close()
+
+    @pytest.mark.asyncio
+    async def test_subscribed_client_gets_its_own_stream(self):
+        emit = AsyncMock()
+        encoder = PreviewEncoder(emit=emit)
+        encoder.client_connected("viewer")
+        encoder.subscribe("sid-1", PreviewSubscription(cameras=["wrist"], scale=0.5, quality=50))
+        frames = {
+            "observation.images.front": np.zeros((8, 8, 3), dtype=np.uint8),
+            "observation.images.wrist": np.zeros((8, 8, 3), dtype=np.uint8),
+        }
+        encoder.submit(0, frames)
+        await encoder.drain()
+
+        assert emit.await_count == 2
+        broadcast, direct = emit.call_args_list
+        assert broadcast.kwargs["skip_sid"] == ["sid-1"]
+        assert len(unpack_frame_batch(broadcast.args[0])[3]) == 2
+
+        assert direct.kwargs["to"] == "sid-1"
+        (frame,) = unpack_frame_batch(direct.args[0])[3]
+        assert frame.camera_name == "observation.images.wrist"
+        assert (frame.width, frame.height) == (4, 4)
+        encoder.close()
+
+    @pytest.mark.asyncio
+    async def test_backpressure_lowers_quality_until_acked(self):
+        emit = AsyncMock()
+        encoder = PreviewEncoder(emit=emit)
+        encoder.subscribe("slow", PreviewSubscription(max_fps=1000, quality=80))
+        client = encoder._clients["slow"]
+        client.ADJUST_INTERVAL_S = 0.0
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+        # Never ack: after two batches in flight the client is skipped and degraded.
+        for step in range(4):
+            encoder.submit(step, {"cam": frame})
+            await encoder.drain()
+            await asyncio.sleep(0.002)
+        direct = [c for c in emit.call_args_list if c.kwargs.get("to") == "slow"]
+        assert len(direct) == 2
+        assert client.dropped == 2
+        assert client.quality == 60
+
+        # Acks free the slots and the stream resumes.
+        for c in direct:
+            c.kwargs["callback"]()
+        encoder.submit(4, {"cam": frame})
+        await encoder.drain()
+        assert encoder.stats()["clients"]["slow"]["outstanding"] == 1
+        encoder.close()
+
+    def test_late_ack_does_not_retire_a_newer_batch(self):
+        encoder = PreviewEncoder(emit=AsyncMock())
+        encoder.subscribe("viewer", PreviewSubscription())
+        client = encoder._clients["viewer"]
+
+        lost = client.on_sent(0.0)
+        assert client.ready(client.ACK_TIMEOUT_S + 1.0)   # the first batch times out
+        newer = client.on_sent(client.ACK_TIMEOUT_S + 1.0)
+
+        client.on_ack(lost)
+        assert client.stats()["outstanding"] == 1
+        client.on_ack(newer)
+        client.on_ack(newer)
+        assert client.stats()["outstanding"] == 0
+        encoder.close()
+
+    @pytest.mark.asyncio
+    async def test_disabled_until_a_client_connects(self):
+        emit = AsyncMock()
+        encoder = PreviewEncoder(emit=emit)
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+        encoder.submit(0, {"cam": frame})
+        await encoder.drain()
+        assert not encoder.enabled
+        assert encoder.submitted_frames == 0
+        emit.assert_not_awaited()
+
+        encoder.client_connected("viewer")
+        encoder.submit(1, {"cam": frame})
+        await encoder.drain()
+        emit.assert_awaited_once()
+
+        encoder.client_disconnected("viewer")
+        assert not encoder.enabled
+        encoder.close()
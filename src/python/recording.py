@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Any
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Background dataset writer for recording mode
+# ---------------------------------------------------------------------------
+#
+# LeRobotDataset.add_frame / save_episode are blocking (image writes, video
+# encoding, parquet) and not thread-safe, so every dataset call is queued and
+# applied in order by one writer thread.  The control loop only enqueues: a
+# new episode starts recording while the previous one is still being saved,
+# its frames waiting in the queue behind the save.
+
+_CLOSE = object()
+
+
+class AsyncDatasetWriter:
+    """Applies dataset operations on a background thread through a bounded queue.
+
+    ``max_queue`` bounds the memory held by frames waiting behind a slow
+    ``save_episode``; when it is full, enqueueing waits off the event loop
+    and the wait is reported as ``blocked_s``.  ``close`` flushes everything,
+    calls ``dataset.finalize()`` when available and re-raises the first
+    writer error.
+    """
+
+    def __init__(self, dataset, max_queue: int = 512):
+        self.dataset = dataset
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._error: BaseException | None = None
+        self._closed = False
+        self.frames_written = 0
+        self.episodes_saved = 0
+        self.max_queue_depth = 0
+        self.blocked_s = 0.0
+        self.saving = False
+        self._thread = threading.Thread(target=self._run, name="dataset-writer", daemon=True)
+        self._thread.start()
+
+    # ---- producer side (event loop) ----
+
+    async def add_frame(self, frame: dict[str, Any]) -> None:
+        await self._put("add_frame", frame)
+
+    async def save_episode(self) -> None:
+        await self._put("save_episode")
+
+    async def clear_episode_buffer(self) -> None:
+        await self._put("clear_episode_buffer")
+
+    async def _put(self, op: str, *args: Any) -> None:
+        if self._error is not None:
+            raise RuntimeError("Dataset writer failed") from self._error
+        if self._closed:
+            raise RuntimeError("Dataset writer is closed")
+        item = (op, args)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            start = time.perf_counter()
+            await asyncio.get_running_loop().run_in_executor(None, self._queue.put, item)
+            self.blocked_s += time.perf_counter() - start
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "frames_written": self.frames_written,
+            "episodes_saved": self.episodes_saved,
+            "saving": self.saving,
+            "blocked_s": round(self.blocked_s, 3),
+        }
+
+    async def close(self) -> None:
+        """Flush queued operations, finalize the dataset and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._queue.put, (_CLOSE, ()))
+        await loop.run_in_executor(None, self._thread.join)
+        if self._error is not None:
+            raise RuntimeError("Dataset writer failed") from self._error
+
+    # ---- writer thread ----
+
+    def _run(self) -> None:
+        while True:
+            op, args = self._queue.get()
+            if op is _CLOSE:
+                break
+            if self._error is not None:
+                continue    # keep draining so producers never block on a dead writer
+            try:
+                if op == "save_episode":
+                    self.saving = True
+                    start = time.perf_counter()
+                    self.dataset.save_episode()
+                    self.episodes_saved += 1
+                    logging.info(f"Saved episode in {time.perf_counter() - start:.1f}s "
+                                 f"({self._queue.qsize()} operations queued behind it)")
+                else:
+                    getattr(self.dataset, op)(*args)
+                    if op == "add_frame":
+                        self.frames_written += 1
+            except BaseException as e:
+                logging.error(f"Dataset writer failed on {op}: {e}", exc_info=True)
+                self._error = e
+            finally:
+                self.saving = False
+
+        if self._error is None and hasattr(self.dataset, "finalize"):
+            try:
+                self.dataset.finalize()
+            except BaseException as e:
+                logging.error(f"Dataset finalize failed: {e}", exc_info=True)
+                self._error = e
+
+
+# ---------------------------------------------------------------------------
+# Frame assembly into preallocated per-episode columns
+# ---------------------------------------------------------------------------
+#
+# add_frame keeps references to the arrays it is given until save_episode
+# stacks them, so non-image features are written straight into rows of
+# preallocated column chunks and handed over as row views: no per-step
+# allocation beyond the view objects.  Rows are never rewritten, because a
+# finished episode may still be waiting in the writer queue; episodes just
+# continue down the chunk and a full chunk is replaced by a fresh one (the
+# old one lives on through the views).  Images go to the dataset's image
+# writer, which also holds them until written, so each is copied exactly once
+# as uint8 HWC.
+
+_IMAGE_DTYPES = ("image", "video")
+
+
+class EpisodeFrameAssembler:
+    """Builds ``add_frame`` dicts from raw env values using preallocated column chunks."""
+
+    def __init__(self, features: dict[str, dict[str, Any]], chunk_size: int = 256):
+        self.chunk_size = chunk_size
+        self.columns = {
+            key: (tuple(ft["shape"]), np.dtype(ft["dtype"]))
+            for key, ft in features.items()
+            if ft["dtype"] not in (*_IMAGE_DTYPES, "string")
+        }
+        self.image_keys = {key: tuple(ft["shape"]) for key, ft in features.items() if ft["dtype"] in _IMAGE_DTYPES}
+        self._chunk: dict[str, np.ndarray] = {}
+        self._row = chunk_size
+        self.chunks_allocated = 0
+
+    def covers(self, observation: dict[str, Any], observation_keys: list[str]) -> bool:
+        """Whether observation holds every observation feature at its recorded shape."""
+        for key in observation_keys:
+            value = observation.get(key)
+            expected = self.image_keys.get(key) or self.columns.get(key, (None,))[0]
+            if value is None or tuple(np.shape(value)) != expected:
+                return False
+        return True
+
+    def _next_row(self) -> int:
+        if self._row >= self.chunk_size:
+            self._chunk = {
+                key: np.empty((self.chunk_size, *shape), dtype=dtype) for key, (shape, dtype) in self.columns.items()
+            }
+            self._row = 0
+            self.chunks_allocated += 1
+        row = self._row
+        self._row += 1
+        return row
+
+    def assemble(self, values: dict[str, Any], task: str) -> dict[str, Any]:
+        """Write one step's values (numpy/torch/scalars) and return the frame for add_frame."""
+        row = self._next_row()
+        frame: dict[str, Any] = {"task": task}
+        for key, (shape, _) in self.columns.items():
+            dest = self._chunk[key][row]
+            np.copyto(dest, np.asarray(values[key]).reshape(shape), casting="unsafe")
+            frame[key] = dest
+        for key in self.image_keys:
+            frame[key] = np.array(values[key], dtype=np.uint8, copy=True)
+        return frame
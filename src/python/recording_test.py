@@ -0,0 +1,116 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+import torch
+
+from recording import AsyncDatasetWriter, EpisodeFrameAssembler
+
+
+class FakeDataset:
+    def __init__(self, save_delay: float = 0.0):
+        self.save_delay = save_delay
+        self.calls: list[str] = []
+        self.episodes: list[list[int]] = []
+        self.buffer: list[int] = []
+        self.writer_threads: set[str] = set()
+
+    def add_frame(self, frame):
+        self.writer_threads.add(threading.current_thread().name)
+        self.buffer.append(frame["i"])
+
+    def save_episode(self):
+        time.sleep(self.save_delay)
+        self.episodes.append(self.buffer)
+        self.buffer = []
+
+    def clear_episode_buffer(self):
+        self.buffer = []
+
+    def finalize(self):
+        self.calls.append("finalize")
+
+
+class TestAsyncDatasetWriter:
+
+    @pytest.mark.asyncio
+    async def test_next_episode_records_while_previous_saves(self):
+        dataset = FakeDataset(save_delay=0.2)
+        writer = AsyncDatasetWriter(dataset)
+
+        for i in range(3):
+            await writer.add_frame({"i": i})
+        await writer.save_episode()
+        start = time.perf_counter()
+        for i in range(3, 5):
+            await writer.add_frame({"i": i})
+        await writer.clear_episode_buffer()
+        await writer.add_frame({"i": 5})
+        await writer.save_episode()
+        # None of this waited for the 0.2 s encode.
+        assert time.perf_counter() - start < 0.1
+
+        await writer.close()
+        assert dataset.episodes == [[0, 1, 2], [5]]
+        assert dataset.calls == ["finalize"]
+        assert dataset.writer_threads == {"dataset-writer"}
+        assert writer.stats()["queue_depth"] == 0
+        assert writer.stats()["episodes_saved"] == 2
+
+    @pytest.mark.asyncio
+    async def test_writer_error_surfaces(self):
+        dataset = FakeDataset()
+        dataset.add_frame = lambda frame: 1 / 0
+        writer = AsyncDatasetWriter(dataset)
+        await writer.add_frame({"i": 0})
+
+        with pytest.raises(RuntimeError, match="Dataset writer failed"):
+            await writer.close()
+        assert dataset.calls == []   # not finalized after a failure
+
+
+class TestEpisodeFrameAssembler:
+
+    FEATURES = {
+        "observation.state": {"dtype": "float32", "shape": (3,), "names": None},
+        "observation.images.front": {"dtype": "video", "shape": (4, 6, 3), "names": ["channels", "height", "width"]},
+        "action": {"dtype": "float32", "shape": (2,), "names": None},
+        "next.reward": {"dtype": "float32", "shape": (1,), "names": None},
+        "next.done": {"dtype": "bool", "shape": (1,), "names": None},
+    }
+
+    def _values(self, i):
+        return {
+            "observation.state": np.full(3, i, dtype=np.float64),
+            "observation.images.front": np.full((4, 6, 3), i, dtype=np.uint8),
+            "action": torch.tensor([i, -i], dtype=torch.float32),
+            "next.reward": float(i),
+            "next.done": i == 2,
+        }
+
+    def test_rows_are_views_into_preallocated_chunks(self):
+        assembler = EpisodeFrameAssembler(self.FEATURES, chunk_size=2)
+        frames = [assembler.assemble(self._values(i), task="pick") for i in range(3)]
+
+        assert assembler.chunks_allocated == 2
+        assert frames[0]["observation.state"].base is frames[1]["observation.state"].base
+        assert frames[0]["observation.state"].dtype == np.float32
+        # Earlier rows survive the chunk rollover untouched.
+        np.testing.assert_array_equal(np.stack([f["action"] for f in frames]), [[0, 0], [1, -1], [2, -2]])
+        assert [bool(f["next.done"][0]) for f in frames] == [False, False, True]
+        assert frames[2]["task"] == "pick"
+
+    def test_images_copied_once(self):
+        assembler = EpisodeFrameAssembler(self.FEATURES)
+        values = self._values(1)
+        frame = assembler.assemble(values, task="pick")
+        values["observation.images.front"][:] = 9
+        assert frame["observation.images.front"].max() == 1
+
+    def test_covers_checks_recorded_shapes(self):
+        assembler = EpisodeFrameAssembler(self.FEATURES)
+        keys = ["observation.state", "observation.images.front"]
+        assert assembler.covers(self._values(0), keys)
+        batched = {**self._values(0), "observation.state": np.zeros((1, 3))}
+        assert not assembler.covers(batched, keys)
@@ -0,0 +1,318 @@
+import sys
+import time
+
+_PROCESS_START = time.perf_counter()
+_PROCESS_START_MODULES = len(sys.modules)
+
+import asyncio
+import importlib
+import json
+import logging
+import signal
+import socket
+import traceback
+from typing import Any, Awaitable, Callable
+
+import socketio
+from aiohttp import web
+
+from preview import PreviewEncoder, PreviewSubscription
+
+# ---------------------------------------------------------------------------
+# Fast-start entry point for the simulation process
+# ---------------------------------------------------------------------------
+#
+# Electron waits for ``server-ready`` before it connects, and gym_manipulator
+# pulls in torch, mujoco and lerobot (several seconds). This module only needs
+# Socket.IO and aiohttp: it starts the server, announces it, and then imports
+# gym_manipulator off the event loop while the UI is already connecting.
+#
+#   python sim_server.py --config_path cfg.json      (same arguments as gym_manipulator.py)
+#   python sim_server.py --worker                    (long-lived; sessions arrive as load_config)
+#
+# Per-module import times are available with PYTHONPROFILEIMPORTTIME=1.
+
+if __name__ == "__main__":
+    # gym_manipulator does `from sim_server import sio`; make that resolve to
+    # this running module instead of importing a second copy.
+    sys.modules.setdefault("sim_server", sys.modules[__name__])
+
+
+# ---------------------------------------------------------------------------
+# Socket.IO server setup
+# ---------------------------------------------------------------------------
+
+# Initialize the Socket.IO server
+sio = socketio.AsyncServer(async_mode='aiohttp', cors_allowed_origins='*')
+app = web.Application()
+sio.attach(app)
+
+# Preview frames are encoded off the event loop and emitted as binary batches.
+preview_encoder = PreviewEncoder(emit=lambda message, **kwargs: sio.emit('video_frames', message, **kwargs))
+
+@sio.event
+def connect(sid, environ):
+    logging.info(f"Client connected: {sid}")
+    preview_encoder.client_connected(sid)
+
+@sio.event
+def disconnect(sid):
+    logging.info(f"Client disconnected: {sid}")
+    preview_encoder.client_disconnected(sid)
+
+@sio.event
+def subscribe(sid, data):
+    """Per-client preview stream: {cameras, max_fps, scale, quality}, all optional."""
+    data = data or {}
+    params = {key: data[key] for key in ("cameras", "max_fps", "scale", "quality") if data.get(key) is not None}
+    try:
+        subscription = PreviewSubscription(**params)
+    except (TypeError, ValueError) as e:
+        logging.warning(f"Ignoring invalid preview subscription from {sid}: {e}")
+        return
+    preview_encoder.subscribe(sid, subscription)
+    logging.info(f"Client {sid} subscribed to preview: {subscription}")
+
+@sio.event
+async def load_config(sid, data):
+    """Replace the running session (worker mode only); the result is the ack payload."""
+    if worker is None:
+        return {"ok": False, "message": "Not running as a simulation worker"}
+    return await worker.load_config(data)
+
+@sio.event
+async def reconfigure(sid, data):
+    """Tweak the running env in place (worker mode only), e.g. camera placement from the UI."""
+    if worker is None:
+        return {"ok": False, "message": "Not running as a simulation worker"}
+    return await worker.reconfigure(data)
+
+
+def send_command(payload: dict[str, Any]) -> None:
+    """Print a message for Electron's VideoManager (it parses __CMD__ lines on stderr)."""
+    print(f"__CMD__:{json.dumps(payload)}", file=sys.stderr, flush=True)
+
+
+# ---------------------------------------------------------------------------
+# Startup profile
+# ---------------------------------------------------------------------------
+
+class StartupProfile:
+    """Seconds since process start at each startup milestone, plus modules loaded in between."""
+
+    def __init__(self, start: float = _PROCESS_START, start_modules: int = _PROCESS_START_MODULES):
+        self.start = start
+        self.marks: dict[str, float] = {}
+        self.modules: dict[str, int] = {}
+        self._module_count = start_modules
+
+    def mark(self, name: str) -> None:
+        self.marks[name] = round(time.perf_counter() - self.start, 3)
+        self.modules[name] = len(sys.modules) - self._module_count
+        self._module_count = len(sys.modules)
+        logging.info(f"Startup: {name} at {self.marks[name]:.2f}s ({self.modules[name]} modules loaded)")
+
+    def publish(self) -> None:
+        send_command({"type": "startup-profile", "marks": self.marks, "modules": self.modules})
+
+
+def _free_port() -> int:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def serve(start: Callable[[], Awaitable[None]], profile: StartupProfile | None = None) -> None:
+    """Run the Socket.IO server, announce it, and run ``start`` as a background task."""
+
+    async def on_startup(app):
+        sio.start_background_task(start)
+
+    app.on_startup.append(on_startup)
+
+    port = _free_port()
+    # Print to stderr so VideoManager can catch it
+    send_command({'type': 'server-ready', 'url': f'http://localhost:{port}'})
+    if profile is not None:
+        profile.mark("server_ready")
+    logging.info(f"Socket.IO server running on http://localhost:{port}")
+    web.run_app(app, port=port)
+
+
+async def _load_and_run(profile: StartupProfile) -> None:
+    loop = asyncio.get_running_loop()
+    try:
+        # Heavy imports and config parsing run on a worker thread so the server
+        # keeps answering the UI's handshake meanwhile.
+        gym_manipulator = await loop.run_in_executor(None, importlib.import_module, "gym_manipulator")
+        profile.mark("runtime_imported")
+        cfg = await loop.run_in_executor(None, gym_manipulator.parse_config)
+        profile.mark("config_parsed")
+    except Exception as e:
+        logging.error(f"Error starting simulation: {e}", exc_info=True)
+        send_command({'type': 'error', 'message': str(e), 'traceback': traceback.format_exc()})
+        return
+    await gym_manipulator.run(cfg, profile=profile)
+
+
+# ---------------------------------------------------------------------------
+# Warm simulation worker
+# ---------------------------------------------------------------------------
+#
+# Started once by Electron with --worker. The runtime modules, compiled models
+# (mujoco_model_cache's memory cache), a GL context and the Socket.IO server
+# stay alive; each session start only decodes a config and builds the env and
+# processors. Commands arrive as JSON lines on stdin (VideoManager.sendCommand)
+# or as Socket.IO events:
+#
+#   {"command": "load_config", "id": 1, "config": {...}}  -> {"type": "config-loaded", "id": 1, "ok": ...}
+#   {"command": "reconfigure", "id": 2, "changes": {...}}  -> {"type": "reconfigured", "id": 2, "ok": ...}
+#   {"command": "stop", "id": 3}                           -> {"type": "session-stopped", "id": 3}
+
+
+class SimulationWorker:
+    """Runs one gym_manipulator session at a time, replacing it on each load_config."""
+
+    def __init__(self):
+        self._runtime = None    # the gym_manipulator module once imported
+        self._session: asyncio.Task | None = None
+        self._active = None     # (cfg, session) of the running session
+        self._lock = asyncio.Lock()
+
+    async def warm_up(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._runtime = await loop.run_in_executor(None, importlib.import_module, "gym_manipulator")
+        self._runtime.warm_up()
+
+    async def stop(self) -> None:
+        session, self._session = self._session, None
+        self._active = None
+        if session is not None and not session.done():
+            session.cancel()
+            await asyncio.gather(session, return_exceptions=True)
+
+    async def load_config(self, config: dict[str, Any]) -> dict[str, Any]:
+        async with self._lock:
+            timings: dict[str, float] = {}
+            start = time.perf_counter()
+
+            def lap(name: str) -> None:
+                nonlocal start
+                now = time.perf_counter()
+                timings[name] = round((now - start) * 1e3, 1)
+                start = now
+
+            try:
+                if self._runtime is None:
+                    await self.warm_up()
+                    lap("warm_up_ms")
+                # Decode first so a bad config leaves the running session alone;
+                # build only after stopping, the old env may hold the hardware.
+                cfg = self._runtime.config_from_dict(config)
+                lap("config_ms")
+                await self.stop()
+                lap("stop_ms")
+                # Compiling the model or opening hardware can take seconds; a
+                # worker thread keeps the preview, acks and commands responsive.
+                session = await asyncio.get_running_loop().run_in_executor(None, self._runtime.build_session, cfg)
+                lap("build_ms")
+            except Exception as e:
+                logging.error(f"Failed to load simulation config: {e}", exc_info=True)
+                return {"ok": False, "message": str(e), "traceback": traceback.format_exc()}
+
+            self._active = (cfg, session)
+            self._session = asyncio.create_task(self._run(cfg, session))
+            logging.info(f"Simulation session loaded in {sum(timings.values()):.1f}ms: {timings}")
+            return {"ok": True, "timings": timings}
+
+    async def reconfigure(self, changes: dict[str, Any]) -> dict[str, Any]:
+        """Apply live changes to the running env without rebuilding the session."""
+        async with self._lock:
+            if self._active is None:
+                return {"ok": False, "message": "No simulation session is running"}
+            try:
+                changed = self._runtime.reconfigure_session(*self._active, changes)
+            except Exception as e:
+                logging.error(f"Failed to reconfigure simulation: {e}", exc_info=True)
+                return {"ok": False, "message": str(e), "traceback": traceback.format_exc()}
+            return {"ok": True, "changed": changed}
+
+    async def _run(self, cfg, session) -> None:
+        try:
+            await self._runtime.run_session(cfg, session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._runtime.report_error(e)
+        finally:
+            if self._active is not None and self._active[1] is session:
+                self._active = None
+
+    async def handle_command(self, message: dict[str, Any]) -> None:
+        command = message.get("command")
+        if command == "load_config":
+            result = await self.load_config(message.get("config") or {})
+            send_command({"type": "config-loaded", "id": message.get("id"), **result})
+        elif command == "reconfigure":
+            result = await self.reconfigure(message.get("changes") or {})
+            send_command({"type": "reconfigured", "id": message.get("id"), **result})
+        elif command == "stop":
+            async with self._lock:
+                await self.stop()
+            send_command({"type": "session-stopped", "id": message.get("id")})
+        else:
+            logging.warning(f"Ignoring unknown worker command: {command!r}")
+
+
+worker: SimulationWorker | None = None
+
+
+async def _read_commands(handle: Callable[[dict[str, Any]], Awaitable[None]]) -> None:
+    """Dispatch newline-delimited JSON commands from stdin until it closes."""
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            # Electron went away: end the session cleanly, then stop the server.
+            logging.info("Command channel closed; shutting down worker")
+            if worker is not None:
+                await worker.stop()
+            signal.raise_signal(signal.SIGTERM)
+            return
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            message = json.loads(line)
+        except ValueError:
+            logging.warning(f"Ignoring malformed command: {line[:200]}")
+            continue
+        await handle(message)
+
+
+async def _run_worker(profile: StartupProfile) -> None:
+    try:
+        await worker.warm_up()
+        profile.mark("runtime_imported")
+        profile.publish()
+    except Exception as e:
+        logging.error(f"Error warming up simulation worker: {e}", exc_info=True)
+        send_command({'type': 'error', 'message': str(e), 'traceback': traceback.format_exc()})
+    await _read_commands(worker.handle_command)
+
+
+def main() -> None:
+    global worker
+    logging.basicConfig(level=logging.INFO, force=True)
+    profile = StartupProfile()
+    if "--worker" in sys.argv[1:]:
+        worker = SimulationWorker()
+        serve(lambda: _run_worker(profile), profile)
+    else:
+        serve(lambda: _load_and_run(profile), profile)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from sim_server import SimulationWorker, StartupProfile
+
+HERE = Path(__file__).parent
+
+# Runs in a fresh interpreter: the test session itself has imported everything.
+STARTUP_PROBE = """
+import json, sys
+import sim_server
+light = not any(name == "torch" or name.startswith(("lerobot", "mujoco")) for name in sys.modules)
+
+import gym_manipulator
+gym_manipulator._import_config_choices(gym_manipulator._config_env_type(["--config_path", sys.argv[1]]))
+drivers = [name for name in ("lerobot.robots.so_follower", "lerobot.teleoperators.keyboard",
+                             "lerobot.cameras.opencv", "lerobot.datasets.lerobot_dataset") if name in sys.modules]
+print(json.dumps({"light": light, "drivers": drivers, "same_server": gym_manipulator.sio is sim_server.sio}))
+"""
+
+
+class TestStartup:
+
+    def test_server_starts_before_runtime_imports(self, tmp_path):
+        config_path = tmp_path / "config.json"
+        config_path.write_text(json.dumps({"env": {"type": "custom_mujoco"}}))
+        result = subprocess.run(
+            [sys.executable, "-c", STARTUP_PROBE, str(config_path)],
+            cwd=HERE, capture_output=True, text=True, timeout=120,
+        )
+        assert result.returncode == 0, result.stderr
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        assert probe == {"light": True, "drivers": [], "same_server": True}
+
+    def test_profile_marks_are_cumulative(self):
+        profile = StartupProfile(start=0.0, start_modules=len(sys.modules))
+        profile.mark("a")
+        profile.mark("b")
+        assert profile.marks["b"] >= profile.marks["a"] > 0
+        assert profile.modules == {"a": 0, "b": 0}
+
+
+class FakeRuntime:
+    """Stands in for the gym_manipulator module: sessions run until cancelled."""
+
+    def __init__(self):
+        self.running: list[str] = []
+        self.closed: list[str] = []
+
+    def config_from_dict(self, config):
+        if "name" not in config:
+            raise ValueError("missing name")
+        return config["name"]
+
+    def build_session(self, cfg):
+        if cfg == "slow-scene":
+            time.sleep(0.2)
+        return cfg
+
+    async def run_session(self, cfg, session):
+        self.running.append(session)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self.closed.append(session)
+
+    def reconfigure_session(self, cfg, session, changes):
+        return [f"observation.images.{name}" for name in changes]
+
+    def report_error(self, e):
+        raise AssertionError(e)
+
+
+class TestSimulationWorker:
+
+    @pytest.mark.asyncio
+    async def test_load_config_replaces_the_running_session(self):
+        worker = SimulationWorker()
+        worker._runtime = runtime = FakeRuntime()
+
+        assert (await worker.load_config({"name": "scene-a"}))["ok"]
+        await asyncio.sleep(0)
+        result = await worker.load_config({"name": "scene-b"})
+        await asyncio.sleep(0)
+
+        assert result["ok"] and set(result["timings"]) == {"config_ms", "stop_ms", "build_ms"}
+        assert runtime.running == ["scene-a", "scene-b"]
+        assert runtime.closed == ["scene-a"]
+
+        await worker.stop()
+        assert runtime.closed == ["scene-a", "scene-b"]
+
+    @pytest.mark.asyncio
+    async def test_build_does_not_block_the_event_loop(self):
+        worker = SimulationWorker()
+        worker._runtime = FakeRuntime()
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        try:
+            assert (await worker.load_config({"name": "slow-scene"}))["ok"]
+        finally:
+            ticker.cancel()
+            await worker.stop()
+        assert ticks > 5
+
+    @pytest.mark.asyncio
+    async def test_bad_config_keeps_the_running_session(self):
+        worker = SimulationWorker()
+        worker._runtime = runtime = FakeRuntime()
+        await worker.load_config({"name": "scene-a"})
+        await asyncio.sleep(0)
+
+        result = await worker.load_config({})
+        assert not result["ok"] and "missing name" in result["message"]
+        assert runtime.closed == []
+        await worker.stop()
+
+    @pytest.mark.asyncio
+    async def test_reconfigure_targets_the_running_session(self):
+        worker = SimulationWorker()
+        worker._runtime = FakeRuntime()
+        assert not (await worker.reconfigure({"front": {}}))["ok"]
+
+        await worker.load_config({"name": "scene-a"})
+        result = await worker.reconfigure({"front": {}})
+        assert result == {"ok": True, "changed": ["observation.images.front"]}
+        await worker.stop()
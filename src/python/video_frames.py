@@ -0,0 +1,67 @@
+import struct
+from dataclasses import dataclass
+
+# ---------------------------------------------------------------------------
+# Binary video frame batches for the Socket.IO preview channel
+# ---------------------------------------------------------------------------
+#
+# All cameras of one control step travel as a single binary 'video_frames'
+# message (a Socket.IO binary attachment, so no base64).  Layout, little endian:
+#
+#   header:  magic "RTVF" | version u8 | codec u8 | num_frames u16 | step u32 | timestamp f64
+#   frame:   name_len u8 | name utf-8 | width u16 | height u16 | payload_len u32 | payload
+#
+# The matching parser for the renderer lives in src/lib/video_frames.ts.
+
+FRAME_BATCH_MAGIC = b"RTVF"
+FRAME_BATCH_VERSION = 1
+CODEC_JPEG = 0
+
+_HEADER = struct.Struct("<4sBBHId")
+_FRAME = struct.Struct("<HHI")
+
+
+@dataclass
+class EncodedFrame:
+    """One encoded camera image inside a frame batch."""
+    camera_name: str
+    width: int
+    height: int
+    payload: bytes
+
+
+def pack_frame_batch(
+    step: int, timestamp: float, frames: list[EncodedFrame], codec: int = CODEC_JPEG
+) -> bytes:
+    """Pack all encoded frames of one step into a single binary message."""
+    parts = [_HEADER.pack(FRAME_BATCH_MAGIC, FRAME_BATCH_VERSION, codec, len(frames), step & 0xFFFFFFFF, timestamp)]
+    for frame in frames:
+        name = frame.camera_name.encode("utf-8")[:255]
+        parts.append(bytes((len(name),)))
+        parts.append(name)
+        parts.append(_FRAME.pack(frame.width, frame.height, len(frame.payload)))
+        parts.append(frame.payload)
+    return b"".join(parts)
+
+
+def unpack_frame_batch(message: bytes) -> tuple[int, float, int, list[EncodedFrame]]:
+    """Inverse of pack_frame_batch; returns (step, timestamp, codec, frames)."""
+    view = memoryview(message)
+    magic, version, codec, count, step, timestamp = _HEADER.unpack_from(view, 0)
+    if magic != FRAME_BATCH_MAGIC:
+        raise ValueError("Not a video frame batch (bad magic)")
+    if version != FRAME_BATCH_VERSION:
+        raise ValueError(f"Unsupported video frame batch version {version}")
+
+    offset = _HEADER.size
+    frames = []
+    for _ in range(count):
+        name_len = view[offset]
+        offset += 1
+        name = bytes(view[offset:offset + name_len]).decode("utf-8")
+        offset += name_len
+        width, height, payload_len = _FRAME.unpack_from(view, offset)
+        offset += _FRAME.size
+        frames.append(EncodedFrame(name, width, height, bytes(view[offset:offset + payload_len])))
+        offset += payload_len
+    return step, timestamp, codec, frames
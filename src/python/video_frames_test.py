@@ -0,0 +1,27 @@
+import pytest
+
+from video_frames import EncodedFrame, pack_frame_batch, unpack_frame_batch
+
+
+class TestFrameBatch:
+
+    def test_round_trip(self):
+        frames = [
+            EncodedFrame("observation.images.front", 4, 2, b"\x01\x02\x03"),
+            EncodedFrame("wrist", 8, 6, b"\x09"),
+        ]
+        step, timestamp, codec, decoded = unpack_frame_batch(pack_frame_batch(7, 1.5, frames))
+
+        assert step == 7
+        assert timestamp == 1.5
+        assert codec == 0
+        assert decoded == frames
+
+    def test_header_is_compact(self):
+        message = pack_frame_batch(0, 0.0, [EncodedFrame("cam", 1, 1, b"x")])
+        # 20 byte header + 1 name length + 3 name + 8 frame header + 1 payload
+        assert len(message) == 33
+
+    def test_rejects_foreign_payload(self):
+        with pytest.raises(ValueError):
+            unpack_frame_batch(b"\x00" * 32)
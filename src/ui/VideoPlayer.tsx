@@ -3,11 +3,16 @@ import { io, Socket } from 'socket.io-client';
 // import the asset URL so Vite replaces it with the correct dev/prod path
 // eslint-disable-next-line import/no-unresolved
 import jsmpegUrl from '../lib/jsmpeg.min.js?url';
+import { FrameBatch, parseFrameBatch } from '../lib/video_frames';
 
 interface VideoPlayerProps {
   url: string;
   className?: string;
   channel?: string;
+  /** Preview stream subscription; the server may lower fps/quality further if this client falls behind. */
+  maxFps?: number;
+  scale?: number;
+  quality?: number;
 }
 
 async function ensureJSMpegLoaded(): Promise<void> {
@@ -47,7 +52,7 @@ async function ensureJSMpegLoaded(): Promise<void> {
   return p.finally(() => { (window as any).__JSMpegLoading = undefined; });
 }
 
-export const VideoPlayer: React.FC<VideoPlayerProps> = ({ url, className, channel }) => {
+export const VideoPlayer: React.FC<VideoPlayerProps> = ({ url, className, channel, maxFps = 30, scale = 1, quality = 80 }) => {
   const canvasRef = useRef<HTMLCanvasElement>(null);
   const playerRef = useRef<any>(null);
   const socketRef = useRef<Socket | null>(null);
@@ -74,31 +79,59 @@ export const VideoPlayer: React.FC<VideoPlayerProps> = ({ url, className, channe
 
         socket.on('connect', () => {
           console.log('VideoPlayer connected to Socket.IO:', url);
+          socket.emit('subscribe', {
+            cameras: channel ? [channel] : null,
+            max_fps: maxFps,
+            scale,
+            quality,
+          });
         });
 
-        socket.on('video_frame', (data: { image: string, camera_name: string }) => {
-          console.log('Received video frame for camera:', data.camera_name);
+        const drawFrameBatch = async (payload: ArrayBuffer) => {
           if (!canvasRef.current || !mounted) return;
-          if (channel && data.camera_name !== channel && data.camera_name !== `observation.images.${channel}`) {
-            return; // Skip frames if channel filter is set and doesn't match
+          let batch: FrameBatch;
+          try {
+            batch = parseFrameBatch(payload);
+          } catch (e) {
+            console.error('VideoPlayer: Failed to parse frame batch', e);
+            return;
           }
 
-          const img = new Image();
-          img.onerror = () => {
-            console.error('VideoPlayer: Failed to decode frame for', data.camera_name);
-          };
-          img.onload = () => {
-            if (!canvasRef.current || !mounted) return;
-
-            if (canvasRef.current.width !== img.width || canvasRef.current.height !== img.height) {
-              canvasRef.current.width = img.width;
-              canvasRef.current.height = img.height;
-            }
-            const ctx = canvasRef.current.getContext('2d');
-            console.log(canvasRef.current);
-            ctx?.drawImage(img, 0, 0);
-          };
-          img.src = 'data:image/jpeg;base64,' + data.image;
+          // Skip frames if channel filter is set and doesn't match
+          const frame = channel
+            ? batch.frames.find((f) => f.cameraName === channel || f.cameraName === `observation.images.${channel}`)
+            : batch.frames[0];
+          if (!frame) return;
+
+          let bitmap: ImageBitmap;
+          try {
+            bitmap = await createImageBitmap(new Blob([frame.data], { type: 'image/jpeg' }));
+          } catch (e) {
+            console.error('VideoPlayer: Failed to decode frame for', frame.cameraName, e);
+            return;
+          }
+          if (!canvasRef.current || !mounted) {
+            bitmap.close();
+            return;
+          }
+
+          if (canvasRef.current.width !== bitmap.width || canvasRef.current.height !== bitmap.height) {
+            canvasRef.current.width = bitmap.width;
+            canvasRef.current.height = bitmap.height;
+          }
+          const ctx = canvasRef.current.getContext('2d');
+          ctx?.drawImage(bitmap, 0, 0);
+          bitmap.close();
+        };
+
+        // The server counts unacknowledged batches per client and backs off when
+        // we fall behind, so ack only once the frame has actually been drawn.
+        socket.on('video_frames', async (payload: ArrayBuffer, ack?: () => void) => {
+          try {
+            await drawFrameBatch(payload);
+          } finally {
+            ack?.();
+          }
         });
 
       } catch (e) {
@@ -140,7 +173,7 @@ export const VideoPlayer: React.FC<VideoPlayerProps> = ({ url, className, channe
         socketRef.current = null;
       }
     };
-  }, [url, channel]);
+  }, [url, channel, maxFps, scale, quality]);
 
   return (
     <canvas ref={canvasRef} className={className} />